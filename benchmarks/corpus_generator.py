@@ -0,0 +1,295 @@
+# This module generates a seeded synthetic defence-news corpus for benchmarks and load tests
+
+import argparse
+import gzip
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+
+BUYERS = (
+    "Polish Army", "Indian Air Force", "Royal Navy", "Bundeswehr", "Japan Ground Self-Defense Force",
+    "Australian Defence Force", "US Army", "Royal Netherlands Navy", "Swedish Armed Forces",
+    "Hellenic Air Force", "Ministry of Defence of Romania", "Brazilian Navy", "Philippine Army",
+    "Ukrainian Armed Forces", "Norwegian Armed Forces", "Israeli Defense Forces", "Canadian Army"
+)
+
+SELLERS = (
+    "Kongsberg", "Rheinmetall", "Lockheed Martin", "Saab", "BAE Systems", "Leonardo", "Thales",
+    "Elbit Systems", "Hanwha Aerospace", "Northrop Grumman", "Anduril", "General Atomics",
+    "Baykar", "Rafael Advanced Defense Systems", "Hindustan Aeronautics", "MBDA", "AeroVironment"
+)
+
+PRODUCTS = (
+    "counter-drone systems", "remote weapon stations", "Switchblade loitering munitions",
+    "MQ-9B Reaper drones", "air defence radars", "armoured personnel carriers",
+    "CUAS jammers", "unmanned surface vessels", "155mm howitzers", "Bayraktar TB2 UAVs",
+    "anti-tank missiles", "tactical radios", "training aircraft", "naval patrol vessels"
+)
+
+MONEY_FORMATS = (
+    "${amount} million", "${amount} billion", "€{amount} million", "£{amount}m", "USD {amount} million",
+    "{amount} billion dollars", "Rs {amount} crore", "${amount}bn", "EUR {amount} million", "${amount},000"
+)
+
+QUANTITY_FORMATS = (
+    "{count} units", "{count} systems", "{count} drones", "up to {count} vehicles", "{count} aircraft",
+    "a batch of {count}", "{count}"
+)
+
+DEAL_TEMPLATES = (
+    "{seller} has been awarded a {money} contract to supply {quantity} {product} to the {buyer}.",
+    "The {buyer} signed a deal worth {money} with {seller} for {quantity} {product}.",
+    "{seller} won a {money} order from the {buyer} covering {product}, with deliveries of {quantity} starting next year.",
+    "Procurement officials confirmed the {buyer} will buy {quantity} {product} from {seller} in a deal valued at {money}.",
+    "{seller} secured a follow-on contract from the {buyer}: {quantity} additional {product} for {money}."
+)
+
+NOISE_TEMPLATES = (
+    "The {buyer} held a joint exercise with allied forces this week, testing {product} in harsh conditions.",
+    "Analysts at a defence conference discussed how {product} are changing modern warfare.",
+    "{seller} reported quarterly earnings slightly above expectations, citing strong demand.",
+    "Officials from the {buyer} visited a {seller} facility to review production progress.",
+    "A parliamentary committee debated next year's military budget without reaching agreement."
+)
+
+FILLER_SENTENCES = (
+    "The programme is part of a wider modernisation effort announced last year.",
+    "Deliveries are expected to be completed within three years.",
+    "The company did not disclose further financial details.",
+    "Local industry will take part in maintenance and support.",
+    "The decision follows a competitive tender that drew several bidders.",
+    "Officials said the systems would strengthen border security.",
+    "Training for operators will begin once the first units arrive.",
+    "The contract includes spare parts, logistics and technical support."
+)
+
+NEWS_SOURCES = (
+    ("Defense News", "https://www.defensenews.com"), ("Reuters", "https://www.reuters.com"),
+    ("Army Technology", "https://www.army-technology.com"), ("Breaking Defense", "https://breakingdefense.com"),
+    ("Janes", "https://www.janes.com"), ("The Defense Post", "https://www.thedefensepost.com"),
+    ("Devdiscourse", "https://www.devdiscourse.com"), ("Naval News", "https://www.navalnews.com")
+)
+
+
+class SyntheticCorpusGenerator:
+    """
+    Seeded generator of GNews-shaped articles.
+
+    The same seed always produces the same corpus. deal_ratio of the
+    original articles describe a deal (buyer, seller, product, money and
+    quantity expressions in varied phrasing); the rest are defence news
+    noise. duplicate_ratio of all articles are syndicated copies of an
+    earlier article: same body, another outlet, URL and slightly changed
+    title, as wire stories appear in practice.
+    """
+
+    def __init__(self, seed: int = 42, deal_ratio: float = 0.4, duplicate_ratio: float = 0.15):
+        """
+        :param seed: random seed
+        :param deal_ratio: share of original articles describing a deal
+        :param duplicate_ratio: share of articles that are syndicated copies
+        """
+        self.seed = seed
+        self.deal_ratio = deal_ratio
+        self.duplicate_ratio = duplicate_ratio
+
+    # -------------------- Expressions --------------------
+
+    def _money(self, rng: random.Random) -> str:
+        """
+        Random money expression, e.g. "€140 million".
+        """
+
+        money_format = rng.choice(MONEY_FORMATS)
+
+        if "billion" in money_format or "bn" in money_format:
+            amount = round(rng.uniform(0.5, 12), 1)
+        elif ",000" in money_format:
+            amount = rng.randint(100, 999)
+        else:
+            amount = rng.choice((rng.randint(5, 950), round(rng.uniform(1, 99), 1)))
+
+        return money_format.format(amount=amount)
+
+    def _quantity(self, rng: random.Random) -> str:
+        """
+        Random quantity expression, e.g. "24 drones".
+        """
+
+        return rng.choice(QUANTITY_FORMATS).format(count=rng.choice((2, 4, 6, 8, 12, 16, 24, 36, 48, 100, 250)))
+
+    # -------------------- Articles --------------------
+
+    def _original_article(self, rng: random.Random, index: int, published_at: datetime) -> dict:
+        """
+        Build one original (non-syndicated) article.
+        """
+
+        fields = {
+            "buyer": rng.choice(BUYERS),
+            "seller": rng.choice(SELLERS),
+            "product": rng.choice(PRODUCTS),
+            "money": self._money(rng),
+            "quantity": self._quantity(rng)
+        }
+
+        is_deal = rng.random() < self.deal_ratio
+
+        lead = rng.choice(DEAL_TEMPLATES if is_deal else NOISE_TEMPLATES).format(**fields)
+        body = " ".join([lead] + rng.sample(FILLER_SENTENCES, rng.randint(3, 7)))
+
+        if is_deal:
+            title = f"{fields['seller']} wins {fields['money']} {fields['buyer']} contract for {fields['product']}"
+        else:
+            title = lead.split(",")[0].rstrip(".")
+
+        source_name, source_url = rng.choice(NEWS_SOURCES)
+
+        return {
+            "title": title,
+            "description": lead,
+            "content": body,
+            "url": f"{source_url}/news/{published_at:%Y/%m/%d}/article-{self.seed}-{index}",
+            "image": f"{source_url}/images/{index}.jpg",
+            "publishedAt": published_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "source": {"name": source_name, "url": source_url}
+        }
+
+    def _syndicated_copy(self, rng: random.Random, original: dict, index: int) -> dict:
+        """
+        Copy of an earlier article as republished by another outlet.
+        """
+
+        source_name, source_url = rng.choice(NEWS_SOURCES)
+
+        copy = dict(original)
+        copy["title"] = rng.choice((original["title"], f"{original['title']} - {source_name}", original["title"].upper()))
+        copy["url"] = f"{source_url}/syndicated/{self.seed}-{index}"
+        copy["source"] = {"name": source_name, "url": source_url}
+
+        return copy
+
+    def iter_articles(self, count: int):
+        """
+        Stream count articles (memory stays flat for 1M+).
+
+        :param count: number of articles
+        :return: generator of article dictionaries
+        """
+
+        rng = random.Random(self.seed)
+        published_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+        # Bounded pool of recent originals to syndicate from
+        recent_originals = []
+
+        for index in range(count):
+            published_at += timedelta(seconds=rng.randint(1, 120))
+
+            if recent_originals and rng.random() < self.duplicate_ratio:
+                yield self._syndicated_copy(rng, rng.choice(recent_originals), index)
+                continue
+
+            article = self._original_article(rng, index, published_at)
+
+            recent_originals.append(article)
+
+            if len(recent_originals) > 500:
+                recent_originals.pop(0)
+
+            yield article
+
+    # -------------------- Derived data --------------------
+
+    def iter_raw_llm_outputs(self, count: int):
+        """
+        Stream raw LLM-style outputs: JSON wrapped in chatter, as Ollama returns it.
+
+        :param count: number of outputs
+        :return: generator of strings
+        """
+
+        rng = random.Random(self.seed + 1)
+
+        for index in range(count):
+            deal = self._deal_fields(rng, index)
+
+            prefix = rng.choice(("", "Here is the extracted JSON:\n", "```json\n", "Sure! "))
+            suffix = rng.choice(("", "\n```", "\nLet me know if you need anything else."))
+
+            yield prefix + json.dumps(deal, indent=rng.choice((None, 2))) + suffix
+
+    def iter_deals(self, count: int):
+        """
+        Stream deal dictionaries as the LLM extracts them (before normalization),
+        including repeated deals reported by several sources.
+
+        :param count: number of deals
+        :return: generator of deal dictionaries
+        """
+
+        rng = random.Random(self.seed + 2)
+        recent_deals = []
+
+        for index in range(count):
+            if recent_deals and rng.random() < self.duplicate_ratio:
+                deal = dict(rng.choice(recent_deals))
+                deal["source_url"] = f"https://syndicated.example/{self.seed}/{index}"
+            else:
+                deal = self._deal_fields(rng, index)
+                deal["source_url"] = f"https://news.example/{self.seed}/{index}"
+
+                recent_deals.append(deal)
+
+                if len(recent_deals) > 500:
+                    recent_deals.pop(0)
+
+            deal["ingestion_timestamp"] = "2026-01-01T00:00:00"
+
+            yield deal
+
+    def _deal_fields(self, rng: random.Random, index: int) -> dict:
+        """
+        Deal fields as an LLM would return them.
+        """
+
+        money = self._money(rng)
+        buyer = rng.choice(BUYERS)
+        seller = rng.choice(SELLERS)
+        product = rng.choice(PRODUCTS)
+
+        return {
+            "buyer": buyer,
+            "seller": seller,
+            "product": product,
+            "quantity": rng.choice((self._quantity(rng), None)),
+            "deal_value": money,
+            "currency": rng.choice(("USD", "EUR", "GBP", "INR", "dollars", None)),
+            "deal_date": rng.choice((None, f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")),
+            "summary": f"{seller} to supply {product} to {buyer} for {money}"
+        }
+
+
+# -------------------- Entry Point --------------------
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Write a synthetic GNews-shaped corpus as JSON lines."
+    )
+
+    argument_parser.add_argument("--count", type=int, default=1000)
+    argument_parser.add_argument("--seed", type=int, default=42)
+    argument_parser.add_argument("--output", default="benchmarks/corpus.jsonl.gz", help=".jsonl or .jsonl.gz")
+
+    arguments = argument_parser.parse_args()
+
+    corpus_generator = SyntheticCorpusGenerator(seed=arguments.seed)
+
+    open_output = gzip.open if arguments.output.endswith(".gz") else open
+
+    with open_output(arguments.output, "wt", encoding="utf-8") as corpus_file:
+        for article in corpus_generator.iter_articles(arguments.count):
+            corpus_file.write(json.dumps(article) + "\n")
+
+    print(f"Wrote {arguments.count} articles to {arguments.output}")
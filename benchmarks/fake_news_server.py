@@ -0,0 +1,311 @@
+# This module serves a synthetic corpus through fake GNews and GDELT APIs with injectable faults
+
+import argparse
+import collections
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.corpus_generator import SyntheticCorpusGenerator
+
+
+GNEWS_PATH = "/api/v4/search"
+GDELT_PATH = "/api/v2/doc/doc"
+
+
+class FaultProfile:
+    """
+    Faults injected into responses, each drawn independently per request.
+    """
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after_seconds: int = 1,
+        server_error_rate: float = 0.0,
+        malformed_rate: float = 0.0
+    ):
+        """
+        :param latency_seconds: base delay before every response
+        :param latency_jitter_seconds: extra random delay, uniform in [0, jitter]
+        :param throttle_rate: share of requests answered 429 with Retry-After
+        :param retry_after_seconds: Retry-After value sent with 429s
+        :param server_error_rate: share of requests answered 500/502/503
+        :param malformed_rate: share of 200 responses with a truncated JSON body
+        """
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.throttle_rate = throttle_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.server_error_rate = server_error_rate
+        self.malformed_rate = malformed_rate
+
+
+class FakeNewsServer:
+    """
+    Local stand-in for the GNews search API and the GDELT doc API.
+
+    Serves articles of a SyntheticCorpusGenerator corpus. Each query pages
+    through the corpus from its own starting point, so repeated polls of a
+    query return new articles, as a live news API does. Runs in a
+    background thread; port 0 picks a free port.
+    """
+
+    def __init__(
+        self,
+        corpus_size: int = 10000,
+        seed: int = 42,
+        faults: FaultProfile = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        :param corpus_size: articles served
+        :param seed: corpus and fault seed
+        :param faults: injected faults (default: none)
+        :param host: listen address
+        :param port: listen port (0: any free port)
+        """
+
+        self.articles = list(SyntheticCorpusGenerator(seed=seed).iter_articles(corpus_size))
+        self.faults = faults or FaultProfile()
+
+        self.served_counts = collections.Counter()
+
+        # query -> next corpus position
+        self._cursors = {}
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self._http_server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._http_server.daemon_threads = True
+        self._server_thread = None
+
+    # -------------------- Lifecycle --------------------
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._http_server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def gnews_url(self) -> str:
+        return self.base_url + GNEWS_PATH
+
+    @property
+    def gdelt_url(self) -> str:
+        return self.base_url + GDELT_PATH
+
+    def start(self):
+        """
+        Serve requests in a background thread.
+        """
+
+        self._server_thread = threading.Thread(target=self._http_server.serve_forever, name="fake-news-server", daemon=True)
+        self._server_thread.start()
+
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the socket.
+        """
+
+        self._http_server.shutdown()
+        self._http_server.server_close()
+
+        if self._server_thread is not None:
+            self._server_thread.join()
+
+    # -------------------- Responses --------------------
+
+    def _next_articles(self, query: str, max_records: int) -> list:
+        """
+        Next page of articles for a query.
+
+        :param query: search query
+        :param max_records: page size
+        :return: corpus articles
+        """
+
+        with self._lock:
+            position = self._cursors.get(query, zlib.crc32(query.encode("utf-8")) % len(self.articles))
+            self._cursors[query] = position + max_records
+
+        return [self.articles[(position + offset) % len(self.articles)] for offset in range(max_records)]
+
+    def _draw_fault(self) -> tuple:
+        """
+        Decide the outcome and delay of one request.
+
+        :return: (outcome, delay seconds); outcome is "ok", "throttled", "server_error" or "malformed"
+        """
+
+        with self._lock:
+            delay = self.faults.latency_seconds + self._random.uniform(0, self.faults.latency_jitter_seconds)
+            draw = self._random.random()
+
+        if draw < self.faults.throttle_rate:
+            return "throttled", delay
+
+        draw -= self.faults.throttle_rate
+
+        if draw < self.faults.server_error_rate:
+            return "server_error", delay
+
+        draw -= self.faults.server_error_rate
+
+        if draw < self.faults.malformed_rate:
+            return "malformed", delay
+
+        return "ok", delay
+
+    def gnews_response(self, parameters: dict) -> dict:
+        """
+        GNews /api/v4/search body.
+
+        :param parameters: query parameters (q, max)
+        :return: response document
+        """
+
+        articles = self._next_articles(parameters.get("q", ""), min(int(parameters.get("max", 10)), 100))
+
+        return {"totalArticles": len(self.articles), "articles": articles}
+
+    def gdelt_response(self, parameters: dict) -> dict:
+        """
+        GDELT doc API artlist body.
+
+        :param parameters: query parameters (query, maxrecords)
+        :return: response document
+        """
+
+        articles = self._next_articles(parameters.get("query", ""), min(int(parameters.get("maxrecords", 50)), 250))
+
+        return {
+            "articles": [
+                {
+                    "url": article["url"],
+                    "url_mobile": "",
+                    "title": article["title"],
+                    "seendate": article["publishedAt"].replace("-", "").replace(":", ""),
+                    "socialimage": article["image"],
+                    "domain": urlparse(article["source"]["url"]).netloc,
+                    "language": "English",
+                    "sourcecountry": "United States",
+                    "seendescription": article["description"]
+                }
+                for article in articles
+            ]
+        }
+
+    def _handler_class(self):
+        """
+        Request handler bound to this server.
+        """
+
+        fake_server = self
+
+        class FakeNewsRequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                request_url = urlparse(self.path)
+                parameters = {name: values[0] for name, values in parse_qs(request_url.query).items()}
+
+                if request_url.path == GNEWS_PATH:
+                    build_response = fake_server.gnews_response
+                elif request_url.path == GDELT_PATH:
+                    build_response = fake_server.gdelt_response
+                else:
+                    self._send(404, b'{"errors": ["not found"]}')
+                    return
+
+                outcome, delay = fake_server._draw_fault()
+
+                with fake_server._lock:
+                    fake_server.served_counts[outcome] += 1
+
+                if delay:
+                    time.sleep(delay)
+
+                if outcome == "throttled":
+                    self._send(429, b'{"errors": ["Too many requests"]}', {"Retry-After": str(fake_server.faults.retry_after_seconds)})
+                elif outcome == "server_error":
+                    self._send(fake_server._random.choice((500, 502, 503)), b"<html>upstream error</html>", content_type="text/html")
+                else:
+                    body = json.dumps(build_response(parameters)).encode("utf-8")
+
+                    # Truncated mid-document, like a dropped connection behind a proxy
+                    if outcome == "malformed":
+                        body = body[:len(body) // 2]
+
+                    self._send(200, body)
+
+            def _send(self, status: int, body: bytes, headers: dict = None, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Per-request access logs would swamp load-test output
+                pass
+
+        return FakeNewsRequestHandler
+
+
+# -------------------- Entry Point --------------------
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Serve a synthetic corpus through fake GNews and GDELT APIs."
+    )
+
+    argument_parser.add_argument("--port", type=int, default=8765)
+    argument_parser.add_argument("--corpus-size", type=int, default=10000)
+    argument_parser.add_argument("--seed", type=int, default=42)
+    argument_parser.add_argument("--latency", type=float, default=0.0, help="base response delay in seconds")
+    argument_parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay in seconds")
+    argument_parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429 responses")
+    argument_parser.add_argument("--retry-after", type=int, default=1)
+    argument_parser.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx responses")
+    argument_parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of truncated JSON bodies")
+
+    arguments = argument_parser.parse_args()
+
+    fake_news_server = FakeNewsServer(
+        corpus_size=arguments.corpus_size,
+        seed=arguments.seed,
+        faults=FaultProfile(
+            latency_seconds=arguments.latency,
+            latency_jitter_seconds=arguments.jitter,
+            throttle_rate=arguments.throttle_rate,
+            retry_after_seconds=arguments.retry_after,
+            server_error_rate=arguments.error_rate,
+            malformed_rate=arguments.malformed_rate
+        ),
+        port=arguments.port
+    ).start()
+
+    print(f"GNews: {fake_news_server.gnews_url}")
+    print(f"GDELT: {fake_news_server.gdelt_url}")
+
+    try:
+        while True:
+            time.sleep(1)
+
+    except KeyboardInterrupt:
+        fake_news_server.stop()
+        print(f"Served: {dict(fake_news_server.served_counts)}")
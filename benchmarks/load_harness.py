@@ -0,0 +1,322 @@
+# This module load-tests the fetch-to-store pipeline against the fake news server
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.corpus_generator import SyntheticCorpusGenerator
+from benchmarks.fake_news_server import FakeNewsServer, FaultProfile
+from benchmarks.run_benchmarks import CONTEXT_KEYWORDS, DEAL_KEYWORDS, PRODUCT_KEYWORDS
+from services.api_rate_limiter import ApiRateLimiter
+from services.database_storage_writer import DatabaseStorageWriter
+from services.deal_classifier import DealClassifier
+from services.gnews_fetcher import GNewsFetcher
+from services.keyword_engine import KeywordEngine
+from services.news_fetcher import NewsFetcher
+from utils.batch_deal_processor import BatchDealProcessor
+from utils.deal_deduplicator import DealDeduplicator
+from utils.json_parser import parse_llm_json
+from utils.metrics import metrics_registry
+from utils.pipeline import Pipeline, Stage
+
+
+QUERIES = [
+    "defense company secured contract",
+    "military procurement order awarded",
+    "arms manufacturer won deal",
+    "drone company signed agreement army",
+    "defense firm to supply systems",
+    "military modernization contract",
+    "government defense contract awarded",
+]
+
+
+def percentiles(values: list) -> dict:
+    """
+    p50/p95/p99/max of a list of seconds (nearest rank).
+
+    :param values: latencies
+    :return: dictionary of rounded percentiles
+    """
+
+    if not values:
+        return {"count": 0}
+
+    ordered = sorted(values)
+
+    def nearest_rank(percentile):
+        return ordered[min(len(ordered) - 1, max(0, int(round(percentile / 100 * len(ordered))) - 1))]
+
+    return {
+        "count": len(ordered),
+        "p50": round(nearest_rank(50), 4),
+        "p95": round(nearest_rank(95), 4),
+        "p99": round(nearest_rank(99), 4),
+        "max": round(ordered[-1], 4)
+    }
+
+
+def run_load_test(
+    api: str = "gnews",
+    requests: int = 200,
+    page_size: int = 10,
+    fetch_workers: int = 4,
+    extract_workers: int = 4,
+    llm_latency_seconds: float = 0.05,
+    requests_per_second: float = None,
+    retry_wait_seconds: float = 0.5,
+    faults: FaultProfile = None,
+    corpus_size: int = 10000,
+    seed: int = 42,
+    verbose: bool = False
+) -> dict:
+    """
+    Run fetch -> filter -> classify -> extract -> normalize -> store
+    against a local fake news server and measure it.
+
+    The LLM is simulated by a stage that sleeps llm_latency_seconds and
+    returns a synthetic raw output, so the run measures the pipeline's
+    concurrency, retries and storage rather than a model server.
+
+    :param api: "gnews" or "gdelt" fetcher
+    :param requests: fetch calls issued (queries cycle)
+    :param page_size: articles requested per call
+    :param fetch_workers: concurrent fetch calls
+    :param extract_workers: concurrent simulated LLM calls
+    :param llm_latency_seconds: simulated LLM call duration
+    :param requests_per_second: shared rate limiter rate (None: unthrottled)
+    :param retry_wait_seconds: fetcher pause after 429s without limiter / between GDELT retries
+    :param faults: injected server faults
+    :param corpus_size: articles served by the fake server
+    :param seed: corpus and fault seed
+    :param verbose: keep the fetchers' console output
+    :return: load test report
+    """
+
+    metrics_registry.reset()
+
+    fake_news_server = FakeNewsServer(corpus_size=corpus_size, seed=seed, faults=faults).start()
+
+    temporary_directory = tempfile.TemporaryDirectory()
+
+    rate_limiter = None
+
+    if requests_per_second:
+        rate_limiter = ApiRateLimiter(
+            os.path.join(temporary_directory.name, "rate_limits.db"),
+            api,
+            requests_per_second=requests_per_second,
+            burst=fetch_workers
+        )
+
+    if api == "gnews":
+        news_fetcher = GNewsFetcher(
+            api_key="load-test",
+            rate_limiter=rate_limiter,
+            throttle_pause_seconds=retry_wait_seconds,
+            base_url=fake_news_server.gnews_url
+        )
+    else:
+        news_fetcher = NewsFetcher(
+            base_url=fake_news_server.gdelt_url,
+            wait_seconds=retry_wait_seconds,
+            rate_limiter=rate_limiter
+        )
+
+    # Fetchers and migrations print per call; keep the report readable
+    null_output = open(os.devnull, "w")
+    console_output = sys.stdout if verbose else null_output
+
+    with contextlib.redirect_stdout(console_output):
+        database_storage_writer = DatabaseStorageWriter(os.path.join(temporary_directory.name, "deals.db"))
+
+    keyword_engine = KeywordEngine(PRODUCT_KEYWORDS, DEAL_KEYWORDS, CONTEXT_KEYWORDS)
+    deal_classifier = DealClassifier(score_threshold=3)
+    batch_deal_processor = BatchDealProcessor()
+    deal_deduplicator = DealDeduplicator()
+
+    raw_llm_outputs = itertools.cycle(list(SyntheticCorpusGenerator(seed=seed).iter_raw_llm_outputs(1000)))
+    raw_llm_lock = threading.Lock()
+
+    fetch_latencies = []
+    end_to_end_latencies = []
+    latency_lock = threading.Lock()
+
+    # ---------- Stages ----------
+
+    def fetch_query(query):
+        started_at = time.perf_counter()
+        articles = news_fetcher.fetch_articles(query, max_records=page_size)
+        finished_at = time.perf_counter()
+
+        with latency_lock:
+            fetch_latencies.append(finished_at - started_at)
+
+        for article in articles:
+            article["_fetched_at"] = finished_at
+
+        return articles
+
+    def extract_deal(article):
+        time.sleep(llm_latency_seconds)
+
+        with raw_llm_lock:
+            raw_llm_output = next(raw_llm_outputs)
+
+        structured_deal = parse_llm_json(raw_llm_output)
+
+        if not structured_deal:
+            return None
+
+        structured_deal["source_url"] = article["url"]
+        structured_deal["ingestion_timestamp"] = datetime.utcnow().isoformat()
+        structured_deal["_fetched_at"] = article["_fetched_at"]
+
+        return structured_deal
+
+    def normalize_deal(structured_deal):
+        fetched_at = structured_deal.pop("_fetched_at")
+
+        new_deals = deal_deduplicator.filter_new_deals([batch_deal_processor.process_deal(structured_deal)])
+
+        return [(deal, fetched_at) for deal in new_deals]
+
+    def store_deal(item):
+        deal, fetched_at = item
+
+        database_storage_writer.save_structured_deals([deal])
+
+        with latency_lock:
+            end_to_end_latencies.append(time.perf_counter() - fetched_at)
+
+        return deal
+
+    load_pipeline = Pipeline(
+        stages=[
+            Stage("fetch", fetch_query, workers=fetch_workers, queue_size=fetch_workers * 2, kind="flat_map"),
+            Stage("filter", lambda article: keyword_engine.filter_articles([article]), kind="flat_map"),
+            Stage("classify", lambda article: deal_classifier.filter_deal_articles([article]), kind="flat_map"),
+            Stage("extract", extract_deal, workers=extract_workers),
+            Stage("normalize", normalize_deal, kind="flat_map"),
+            Stage("store", store_deal)
+        ]
+    )
+
+    query_stream = itertools.islice(itertools.cycle(QUERIES), requests)
+
+    started_at = time.perf_counter()
+
+    try:
+        with contextlib.redirect_stdout(console_output):
+            pipeline_stats = load_pipeline.run(query_stream)
+
+    finally:
+        wall_seconds = time.perf_counter() - started_at
+
+        fake_news_server.stop()
+        database_storage_writer.close()
+
+        if rate_limiter:
+            rate_limiter.close()
+
+        temporary_directory.cleanup()
+        null_output.close()
+
+    articles_fetched = metrics_registry.counter_value("fetch_articles_total")
+    deals_stored = len(end_to_end_latencies)
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "api": api,
+            "requests": requests,
+            "page_size": page_size,
+            "fetch_workers": fetch_workers,
+            "extract_workers": extract_workers,
+            "llm_latency_seconds": llm_latency_seconds,
+            "requests_per_second": requests_per_second,
+            "faults": vars(faults or FaultProfile())
+        },
+        "wall_seconds": round(wall_seconds, 3),
+        "requests_per_second": round(requests / wall_seconds, 2),
+        "articles_per_second": round(articles_fetched / wall_seconds, 2),
+        "deals_per_second": round(deals_stored / wall_seconds, 2),
+        "articles_fetched": articles_fetched,
+        "deals_stored": deals_stored,
+        "fetch_latency_seconds": percentiles(fetch_latencies),
+        "end_to_end_latency_seconds": percentiles(end_to_end_latencies),
+        "server_responses": dict(fake_news_server.served_counts),
+        "client": {
+            "fetch_errors": metrics_registry.counter_value("fetch_errors_total"),
+            "rate_limiter_wait_seconds": metrics_registry.histogram_totals("rate_limiter_wait_seconds")
+        },
+        "stages": pipeline_stats
+    }
+
+
+# -------------------- Entry Point --------------------
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Load-test the fetch-to-store pipeline against a local fake news API."
+    )
+
+    argument_parser.add_argument("--api", choices=["gnews", "gdelt"], default="gnews")
+    argument_parser.add_argument("--requests", type=int, default=200, help="fetch calls issued")
+    argument_parser.add_argument("--page-size", type=int, default=10)
+    argument_parser.add_argument("--fetch-workers", type=int, default=4)
+    argument_parser.add_argument("--extract-workers", type=int, default=4)
+    argument_parser.add_argument("--llm-latency", type=float, default=0.05, help="simulated LLM call seconds")
+    argument_parser.add_argument("--rate", type=float, default=None, help="rate limiter requests/second (default: off)")
+    argument_parser.add_argument("--retry-wait", type=float, default=0.5)
+    argument_parser.add_argument("--latency", type=float, default=0.02, help="server base delay in seconds")
+    argument_parser.add_argument("--jitter", type=float, default=0.05, help="server extra random delay in seconds")
+    argument_parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429 responses")
+    argument_parser.add_argument("--retry-after", type=int, default=1)
+    argument_parser.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx responses")
+    argument_parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of truncated JSON bodies")
+    argument_parser.add_argument("--corpus-size", type=int, default=10000)
+    argument_parser.add_argument("--seed", type=int, default=42)
+    argument_parser.add_argument("--output", default=None, help="write the report as JSON")
+    argument_parser.add_argument("--verbose", action="store_true", help="show fetcher output")
+
+    arguments = argument_parser.parse_args()
+
+    load_report = run_load_test(
+        api=arguments.api,
+        requests=arguments.requests,
+        page_size=arguments.page_size,
+        fetch_workers=arguments.fetch_workers,
+        extract_workers=arguments.extract_workers,
+        llm_latency_seconds=arguments.llm_latency,
+        requests_per_second=arguments.rate,
+        retry_wait_seconds=arguments.retry_wait,
+        faults=FaultProfile(
+            latency_seconds=arguments.latency,
+            latency_jitter_seconds=arguments.jitter,
+            throttle_rate=arguments.throttle_rate,
+            retry_after_seconds=arguments.retry_after,
+            server_error_rate=arguments.error_rate,
+            malformed_rate=arguments.malformed_rate
+        ),
+        corpus_size=arguments.corpus_size,
+        seed=arguments.seed,
+        verbose=arguments.verbose
+    )
+
+    print(json.dumps({key: value for key, value in load_report.items() if key != "stages"}, indent=2))
+
+    if arguments.output:
+        os.makedirs(os.path.dirname(arguments.output) or ".", exist_ok=True)
+
+        with open(arguments.output, "w", encoding="utf-8") as report_file:
+            json.dump(load_report, report_file, indent=2, default=str)
+
+        print(f"Report written to {arguments.output}")
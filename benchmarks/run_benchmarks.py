@@ -0,0 +1,339 @@
+# This module runs repeatable micro-benchmarks of the processing components on a synthetic corpus
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.corpus_generator import SyntheticCorpusGenerator
+from services.csv_storage_writer import CSVStorageWriter
+from services.database_storage_writer import DatabaseStorageWriter
+from services.deal_classifier import DealClassifier
+from services.keyword_engine import KeywordEngine
+from utils.batch_deal_processor import BatchDealProcessor
+from utils.deal_deduplicator import DealDeduplicator
+from utils.llm_json_cleaner import LLMJsonCleaner
+from utils.metrics import metrics_registry
+from utils.value_quantity_normalizer import ValueQuantityNormalizer
+
+
+# Same keyword groups as the production pipeline in main.py
+PRODUCT_KEYWORDS = ["drone", "uav", "counter drone", "unmanned vehicle", "CUAS"]
+DEAL_KEYWORDS = ["contract", "deal", "procurement", "order", "awarded", "signed"]
+CONTEXT_KEYWORDS = ["military", "army", "defense", "navy", "air force"]
+
+
+class BenchmarkData:
+    """
+    Inputs shared by all benchmarks, generated once per run from the seed.
+    """
+
+    def __init__(self, size: int, seed: int):
+        """
+        :param size: number of articles (and of deals / raw LLM outputs)
+        :param seed: corpus seed
+        """
+
+        corpus_generator = SyntheticCorpusGenerator(seed=seed)
+
+        self.articles = []
+
+        for article in corpus_generator.iter_articles(size):
+            # The keyword engine and classifier read GDELT's seendescription
+            article["seendescription"] = article["description"]
+            self.articles.append(article)
+
+        self.raw_llm_outputs = list(corpus_generator.iter_raw_llm_outputs(size))
+        self.raw_deals = list(corpus_generator.iter_deals(size))
+
+        self.value_inputs = [(deal["deal_value"], deal["currency"]) for deal in self.raw_deals]
+        self.quantity_inputs = [deal["quantity"] for deal in self.raw_deals]
+
+        # Normalized deals, as the storage writers and deduplicator receive them
+        self.deals = BatchDealProcessor().process_deals(self.raw_deals)
+        self.deal_dicts = [deal.to_dict() for deal in self.deals]
+
+
+# -------------------- Benchmarks --------------------
+# Each benchmark is called before every repetition with the shared data
+# and a fresh temporary directory; it returns (timed callable, item count).
+
+def benchmark_keyword_engine(data: BenchmarkData, temporary_directory: str):
+    keyword_engine = KeywordEngine(PRODUCT_KEYWORDS, DEAL_KEYWORDS, CONTEXT_KEYWORDS)
+
+    return lambda: keyword_engine.filter_articles(data.articles), len(data.articles)
+
+
+def benchmark_deal_classifier(data: BenchmarkData, temporary_directory: str):
+    deal_classifier = DealClassifier(score_threshold=3)
+
+    def classify_all():
+        for article in data.articles:
+            deal_classifier.classify_article(article)
+
+    return classify_all, len(data.articles)
+
+
+def benchmark_llm_json_cleaner(data: BenchmarkData, temporary_directory: str):
+    llm_json_cleaner = LLMJsonCleaner()
+
+    def clean_all():
+        for raw_llm_output in data.raw_llm_outputs:
+            extracted_json = llm_json_cleaner.extract_json_from_text(raw_llm_output)
+
+            if extracted_json:
+                llm_json_cleaner.normalize_deal_fields(extracted_json)
+
+    return clean_all, len(data.raw_llm_outputs)
+
+
+def benchmark_value_quantity_normalizer(data: BenchmarkData, temporary_directory: str):
+    value_quantity_normalizer = ValueQuantityNormalizer()
+
+    def normalize_all():
+        for deal_value_raw, currency_raw in data.value_inputs:
+            value_quantity_normalizer.normalize_deal_value(deal_value_raw, currency_raw)
+
+        for quantity_raw in data.quantity_inputs:
+            value_quantity_normalizer.normalize_quantity(quantity_raw)
+
+    return normalize_all, len(data.value_inputs)
+
+
+def benchmark_batch_deal_processor(data: BenchmarkData, temporary_directory: str):
+    batch_deal_processor = BatchDealProcessor()
+
+    return lambda: batch_deal_processor.process_deals(data.raw_deals), len(data.raw_deals)
+
+
+def benchmark_streaming_deal_processor(data: BenchmarkData, temporary_directory: str):
+    # One deal per call, as the pipeline's normalize stage sees them
+    batch_deal_processor = BatchDealProcessor()
+
+    def process_one_by_one():
+        for raw_deal in data.raw_deals:
+            batch_deal_processor.process_deal(raw_deal)
+
+    return process_one_by_one, len(data.raw_deals)
+
+
+def benchmark_deal_deduplicator(data: BenchmarkData, temporary_directory: str):
+    # Fresh instance per repetition: filter_new_deals remembers signatures
+    deal_deduplicator = DealDeduplicator()
+
+    def deduplicate():
+        deal_deduplicator.deduplicate_deals(data.deal_dicts)
+        deal_deduplicator.filter_new_deals(data.deal_dicts)
+
+    return deduplicate, len(data.deal_dicts)
+
+
+def benchmark_csv_storage_writer(data: BenchmarkData, temporary_directory: str):
+    csv_storage_writer = CSVStorageWriter(os.path.join(temporary_directory, "deals.csv"))
+
+    def write_all():
+        csv_storage_writer.save_structured_deals(data.deals)
+        csv_storage_writer.close()
+
+    return write_all, len(data.deals)
+
+
+def benchmark_database_storage_writer(data: BenchmarkData, temporary_directory: str):
+    database_storage_writer = DatabaseStorageWriter(os.path.join(temporary_directory, "deals.db"))
+
+    def write_all():
+        database_storage_writer.save_structured_deals(data.deals)
+        database_storage_writer.close()
+
+    return write_all, len(data.deals)
+
+
+BENCHMARKS = {
+    "keyword_engine": benchmark_keyword_engine,
+    "deal_classifier": benchmark_deal_classifier,
+    "llm_json_cleaner": benchmark_llm_json_cleaner,
+    "value_quantity_normalizer": benchmark_value_quantity_normalizer,
+    "batch_deal_processor": benchmark_batch_deal_processor,
+    "streaming_deal_processor": benchmark_streaming_deal_processor,
+    "deal_deduplicator": benchmark_deal_deduplicator,
+    "csv_storage_writer": benchmark_csv_storage_writer,
+    "database_storage_writer": benchmark_database_storage_writer
+}
+
+
+# -------------------- Runner --------------------
+
+def time_benchmark(benchmark, data: BenchmarkData, repeats: int, warmup: int = 1) -> dict:
+    """
+    Time a benchmark over several repetitions (setup excluded).
+
+    :param benchmark: benchmark function from BENCHMARKS
+    :param data: shared inputs
+    :param repeats: timed repetitions
+    :param warmup: untimed repetitions run first
+    :return: timing result
+    """
+
+    durations = []
+    item_count = 0
+
+    for repetition in range(warmup + repeats):
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            # Setup output (e.g. database migrations) would drown the results
+            with contextlib.redirect_stdout(io.StringIO()):
+                timed_call, item_count = benchmark(data, temporary_directory)
+
+            started_at = time.perf_counter()
+            timed_call()
+            duration = time.perf_counter() - started_at
+
+        # Keep the instrumented components' metrics from growing across runs
+        metrics_registry.reset()
+
+        if repetition >= warmup:
+            durations.append(duration)
+
+    median_seconds = statistics.median(durations)
+
+    return {
+        "items": item_count,
+        "repeats": repeats,
+        "min_seconds": round(min(durations), 6),
+        "median_seconds": round(median_seconds, 6),
+        "max_seconds": round(max(durations), 6),
+        "items_per_second": round(item_count / median_seconds, 1) if median_seconds else None
+    }
+
+
+def git_commit() -> str:
+    """
+    Current commit hash (with "-dirty" for uncommitted changes), or None outside git.
+    """
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+        return f"{commit}-dirty" if status else commit
+
+    except Exception:
+        return None
+
+
+def run_benchmarks(size: int = 10000, seed: int = 42, repeats: int = 5, selected: list = None) -> dict:
+    """
+    Generate the corpus and run the selected benchmarks.
+
+    :param size: corpus size
+    :param seed: corpus seed
+    :param repeats: timed repetitions per benchmark
+    :param selected: benchmark names (default: all)
+    :return: result document (metadata and per-benchmark timings)
+    """
+
+    print(f"Generating corpus: {size} articles, seed {seed}")
+
+    data = BenchmarkData(size, seed)
+
+    results = {}
+
+    for name in selected or BENCHMARKS:
+        results[name] = time_benchmark(BENCHMARKS[name], data, repeats)
+
+        print(f"{name:28} median {results[name]['median_seconds']:.4f}s  {results[name]['items_per_second']:>12} items/s")
+
+    return {
+        "metadata": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "size": size,
+            "seed": seed,
+            "repeats": repeats
+        },
+        "results": results
+    }
+
+
+def compare_results(baseline: dict, current: dict) -> list:
+    """
+    Median time change per benchmark between two result documents.
+
+    :param baseline: earlier result document
+    :param current: new result document
+    :return: lines describing each change
+    """
+
+    lines = [f"Compared with {baseline['metadata'].get('git_commit')} (size {baseline['metadata'].get('size')}):"]
+
+    for name, result in current["results"].items():
+        baseline_result = baseline["results"].get(name)
+
+        if not baseline_result:
+            lines.append(f"  {name:28} no baseline")
+            continue
+
+        change = result["median_seconds"] / baseline_result["median_seconds"] - 1 if baseline_result["median_seconds"] else 0
+
+        lines.append(f"  {name:28} {baseline_result['median_seconds']:.4f}s -> {result['median_seconds']:.4f}s ({change:+.1%})")
+
+    return lines
+
+
+# -------------------- Entry Point --------------------
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Run the processing micro-benchmarks and save the timings as JSON."
+    )
+
+    argument_parser.add_argument("--size", type=int, default=10000, help="articles / deals per benchmark (1k to 1M)")
+    argument_parser.add_argument("--seed", type=int, default=42)
+    argument_parser.add_argument("--repeats", type=int, default=5)
+    argument_parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    argument_parser.add_argument("--output-dir", default="benchmarks/results")
+    argument_parser.add_argument("--compare", default=None, help="earlier result file to compare against")
+
+    arguments = argument_parser.parse_args()
+
+    benchmark_results = run_benchmarks(
+        size=arguments.size,
+        seed=arguments.seed,
+        repeats=arguments.repeats,
+        selected=arguments.only
+    )
+
+    os.makedirs(arguments.output_dir, exist_ok=True)
+
+    result_path = os.path.join(
+        arguments.output_dir,
+        f"{datetime.utcnow():%Y%m%dT%H%M%S}_{benchmark_results['metadata']['git_commit'] or 'nogit'}_{arguments.size}.json"
+    )
+
+    with open(result_path, "w", encoding="utf-8") as result_file:
+        json.dump(benchmark_results, result_file, indent=2)
+
+    print(f"Results written to {result_path}")
+
+    if arguments.compare:
+        try:
+            with open(arguments.compare, encoding="utf-8") as baseline_file:
+                print("\n".join(compare_results(json.load(baseline_file), benchmark_results)))
+
+        except Exception as error:
+            print(f"Comparison failed: {error}")
+            sys.exit(1)
@@ -0,0 +1,194 @@
+# This module measures CLI start-up time and checks that heavy backends stay unloaded
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+
+# Modules that cost hundreds of milliseconds to seconds to import
+HEAVY_MODULES = ("langchain_ollama", "transformers", "torch", "trafilatura", "pandas", "numpy", "pyarrow")
+
+# Commands that must start quickly, with the heavy modules they may load
+FAST_COMMANDS = {
+    "cli --help": (["cli.py", "--help"], ()),
+    "cli stats": (["cli.py", "stats"], ()),
+    "cli export": (["cli.py", "export", "--format", "jsonl", "--output", os.devnull], ())
+}
+
+# Module imports that must not pull in an LLM backend or the scraper
+# (pandas 3 itself imports pyarrow)
+LAZY_IMPORTS = {
+    "main": ("pandas", "numpy", "pyarrow"),
+    "worker": ("pandas", "numpy", "pyarrow"),
+    "reprocess": ("pandas", "numpy", "pyarrow"),
+    "services.ollama_llm_extractor": (),
+    "services.llm_extractor": (),
+    "services.local_llm_extractor": (),
+    "services.article_scraper": ()
+}
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_command(arguments: list, repeats: int) -> dict:
+    """
+    Wall time of a fresh interpreter running a command.
+
+    :param arguments: arguments after the python executable
+    :param repeats: runs (the median is reported)
+    :return: timing result in milliseconds
+    """
+
+    durations = []
+
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, cwd=REPOSITORY_ROOT, capture_output=True, check=False)
+        durations.append((time.perf_counter() - started_at) * 1000)
+
+    return {
+        "median_ms": round(statistics.median(durations), 1),
+        "min_ms": round(min(durations), 1)
+    }
+
+
+def loaded_heavy_modules(module_name: str) -> list:
+    """
+    Heavy modules present after importing a module in a fresh interpreter.
+
+    :param module_name: module to import
+    :return: names from HEAVY_MODULES that were loaded
+    """
+
+    probe = (
+        f"import sys, json, {module_name}; "
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    )
+
+    completed = subprocess.run([sys.executable, "-c", probe], cwd=REPOSITORY_ROOT, capture_output=True, text=True)
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module_name} failed: {completed.stderr.strip().splitlines()[-1:]}")
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def command_heavy_modules(arguments: list) -> list:
+    """
+    Heavy modules loaded while running a CLI command.
+
+    :param arguments: arguments after the python executable (script first)
+    :return: names from HEAVY_MODULES that were loaded
+    """
+
+    probe = (
+        "import atexit, json, runpy, sys; "
+        f"sys.argv = {arguments!r}; "
+        f"atexit.register(lambda: sys.stderr.write('HEAVY=' + json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]) + '\\n')); "
+        f"runpy.run_path({arguments[0]!r}, run_name='__main__')"
+    )
+
+    completed = subprocess.run([sys.executable, "-c", probe], cwd=REPOSITORY_ROOT, capture_output=True, text=True)
+
+    for line in completed.stderr.splitlines():
+        if line.startswith("HEAVY="):
+            return json.loads(line[len("HEAVY="):])
+
+    raise RuntimeError(f"{' '.join(arguments)} did not finish: {completed.stderr.strip()[-200:]}")
+
+
+def run_startup_benchmark(repeats: int = 10, budget_ms: float = 200) -> dict:
+    """
+    Time the fast commands and check which heavy modules every entry point loads.
+
+    :param repeats: runs per command
+    :param budget_ms: median start-up budget for fast commands
+    :return: result document; "failures" lists every regression found
+    """
+
+    failures = []
+
+    baseline = time_command(["-c", "pass"], repeats)
+
+    commands = {}
+
+    for command_name, (arguments, allowed_modules) in FAST_COMMANDS.items():
+        commands[command_name] = time_command(arguments, repeats)
+        commands[command_name]["heavy_modules"] = command_heavy_modules(arguments)
+
+        if commands[command_name]["median_ms"] > budget_ms:
+            failures.append(f"{command_name}: {commands[command_name]['median_ms']} ms > {budget_ms} ms")
+
+        unexpected = set(commands[command_name]["heavy_modules"]) - set(allowed_modules)
+
+        if unexpected:
+            failures.append(f"{command_name} loads {sorted(unexpected)}")
+
+    imports = {}
+
+    for module_name, allowed_modules in LAZY_IMPORTS.items():
+        try:
+            imports[module_name] = loaded_heavy_modules(module_name)
+
+        except RuntimeError as error:
+            # A dependency of the module itself is missing here; nothing to measure
+            imports[module_name] = str(error)
+            continue
+
+        unexpected = set(imports[module_name]) - set(allowed_modules)
+
+        if unexpected:
+            failures.append(f"import {module_name} loads {sorted(unexpected)}")
+
+    return {
+        "metadata": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": sys.version.split()[0],
+            "repeats": repeats,
+            "budget_ms": budget_ms
+        },
+        "interpreter_ms": baseline,
+        "commands": commands,
+        "imports": imports,
+        "failures": failures
+    }
+
+
+# -------------------- Entry Point --------------------
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Measure CLI start-up time; exits non-zero on a regression."
+    )
+
+    argument_parser.add_argument("--repeats", type=int, default=10)
+    argument_parser.add_argument("--budget-ms", type=float, default=200)
+    argument_parser.add_argument("--output", default=None, help="write the result as JSON")
+
+    arguments = argument_parser.parse_args()
+
+    startup_results = run_startup_benchmark(repeats=arguments.repeats, budget_ms=arguments.budget_ms)
+
+    print(f"Interpreter alone: {startup_results['interpreter_ms']['median_ms']} ms")
+
+    for command_name, command_result in startup_results["commands"].items():
+        print(f"{command_name:12} median {command_result['median_ms']:7.1f} ms  heavy modules: {command_result['heavy_modules']}")
+
+    for module_name, heavy_modules in startup_results["imports"].items():
+        print(f"import {module_name:32} {heavy_modules}")
+
+    if arguments.output:
+        os.makedirs(os.path.dirname(arguments.output) or ".", exist_ok=True)
+
+        with open(arguments.output, "w", encoding="utf-8") as result_file:
+            json.dump(startup_results, result_file, indent=2)
+
+    for failure in startup_results["failures"]:
+        print(f"REGRESSION: {failure}")
+
+    sys.exit(1 if startup_results["failures"] else 0)
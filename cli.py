@@ -0,0 +1,439 @@
+# -------------------- Imports --------------------
+# Only the standard library is imported here. Each subcommand imports what
+# it needs when it runs, so `export` and `stats` never load pandas, pyarrow
+# or an LLM backend.
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+
+PROFILE_MODES = ("deterministic", "sampling")
+
+
+def _open_read_only(database_path: str):
+    """
+    Open an existing SQLite file read-only (never creates it).
+
+    :param database_path: SQLite file path
+    :return: connection, or None when the file does not exist
+    """
+
+    if not os.path.exists(database_path):
+        return None
+
+    connection = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+
+    return connection
+
+
+def _table_columns(connection, table_name: str) -> set:
+    """
+    Columns of a table (empty when it does not exist). Read-only
+    connections cannot migrate, so older databases may lack columns.
+
+    :param connection: sqlite3 connection
+    :param table_name: table name
+    :return: set of column names
+    """
+
+    return {row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")}
+
+
+# -------------------- run --------------------
+
+def command_run(arguments):
+    """
+    Full pipeline (same as main.py).
+    """
+
+    from main import main
+
+    main(
+        resume=arguments.resume,
+        run_id=arguments.run_id,
+        daemon=arguments.daemon,
+        enqueue=arguments.enqueue,
+        profile_mode=arguments.profile,
+        two_phase=arguments.two_phase
+    )
+
+
+# -------------------- fetch-only --------------------
+
+def command_fetch_only(arguments):
+    """
+    Fetch articles for the search queries and write them as JSON lines,
+    without filtering, LLM extraction or storage. Calls count against the
+    shared GNews rate limit and daily quota.
+    """
+
+    from dotenv import load_dotenv
+
+    from services.api_rate_limiter import ApiRateLimiter
+    from services.gnews_fetcher import GNewsFetcher
+    from services.multi_query_fetcher import MultiQueryFetcher
+    from config.settings import (
+        GNEWS_BURST,
+        GNEWS_DAILY_QUOTA,
+        GNEWS_LOW_PRIORITY_RESERVE,
+        GNEWS_REQUESTS_PER_SECOND,
+        SEARCH_QUERIES
+    )
+
+    load_dotenv()
+
+    gnews_rate_limiter = ApiRateLimiter(
+        "rate_limits.db",
+        "gnews",
+        requests_per_second=GNEWS_REQUESTS_PER_SECOND,
+        burst=GNEWS_BURST,
+        daily_quota=GNEWS_DAILY_QUOTA,
+        low_priority_reserve=GNEWS_LOW_PRIORITY_RESERVE
+    )
+
+    multi_fetcher = MultiQueryFetcher(
+        GNewsFetcher(api_key=os.getenv("GNEWS_API_KEY"), rate_limiter=gnews_rate_limiter)
+    )
+
+    output_file = sys.stdout if arguments.output == "-" else open(arguments.output, "w", encoding="utf-8")
+
+    article_count = 0
+
+    try:
+        for query in arguments.queries or SEARCH_QUERIES:
+            for article in multi_fetcher.fetch_query(query, max_per_query=arguments.max_per_query):
+                article["query"] = query
+                output_file.write(json.dumps(article) + "\n")
+                article_count += 1
+
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+        gnews_rate_limiter.close()
+
+    print(f"Fetched articles: {article_count}", file=sys.stderr)
+
+
+# -------------------- reprocess --------------------
+
+def command_reprocess(arguments):
+    """
+    Re-derive stored deals from raw LLM outputs (same as reprocess.py).
+    """
+
+    from reprocess import reprocess
+
+    reprocess(
+        database_path=arguments.database,
+        chunk_size=arguments.chunk_size,
+        max_workers=arguments.workers,
+        delete_stale=not arguments.keep_stale
+    )
+
+
+# -------------------- export --------------------
+
+def command_export(arguments):
+    """
+    Export stored deals as CSV, JSON lines or a Parquet dataset.
+    """
+
+    from models.deal import DEAL_FIELDS
+
+    connection = _open_read_only(arguments.database)
+
+    if connection is None:
+        print(f"No database at {arguments.database}", file=sys.stderr)
+        return 1
+
+    conditions = ""
+    parameters = []
+
+    if arguments.since:
+        conditions = "WHERE ingestion_timestamp >= ?"
+        parameters.append(arguments.since)
+
+    # Columns added by later migrations export as empty values
+    deal_columns = _table_columns(connection, "deals")
+    selected_columns = [field_name if field_name in deal_columns else f"NULL AS {field_name}" for field_name in DEAL_FIELDS]
+
+    cursor = connection.execute(
+        f"SELECT {', '.join(selected_columns)} FROM deals {conditions} ORDER BY id",
+        parameters
+    )
+
+    exported_count = 0
+
+    try:
+        if arguments.format == "parquet":
+            # pyarrow is only needed for this format
+            from models.deal import Deal
+            from services.parquet_storage_writer import ParquetStorageWriter
+
+            parquet_storage_writer = ParquetStorageWriter(arguments.output)
+
+            while True:
+                rows = cursor.fetchmany(5000)
+
+                if not rows:
+                    break
+
+                save_result = parquet_storage_writer.save_structured_deals([Deal.from_tuple(tuple(row)) for row in rows])
+                exported_count += save_result["inserted"]
+
+            # One file per chunk and date otherwise
+            parquet_storage_writer.compact()
+            parquet_storage_writer.close()
+
+        else:
+            output_file = sys.stdout if arguments.output == "-" else open(arguments.output, "w", newline="", encoding="utf-8")
+
+            try:
+                if arguments.format == "csv":
+                    import csv
+
+                    writer = csv.writer(output_file)
+                    writer.writerow(DEAL_FIELDS)
+
+                    for row in cursor:
+                        writer.writerow(tuple(row))
+                        exported_count += 1
+                else:
+                    for row in cursor:
+                        output_file.write(json.dumps(dict(row)) + "\n")
+                        exported_count += 1
+
+            finally:
+                if output_file is not sys.stdout:
+                    output_file.close()
+
+    finally:
+        connection.close()
+
+    print(f"Exported deals: {exported_count}", file=sys.stderr)
+
+
+# -------------------- compact --------------------
+
+def command_compact(arguments):
+    """
+    Merge the small files that every storage flush adds to the Parquet dataset.
+    """
+
+    if not os.path.isdir(arguments.root):
+        print(f"No Parquet dataset at {arguments.root}", file=sys.stderr)
+        return 1
+
+    # pyarrow is only needed for this command
+    from services.parquet_storage_writer import ParquetStorageWriter
+
+    parquet_storage_writer = ParquetStorageWriter(arguments.root)
+
+    try:
+        removed_files = parquet_storage_writer.compact(
+            ingestion_date=arguments.date,
+            small_file_bytes=arguments.small_file_mb * 1024 * 1024
+        )
+
+    finally:
+        parquet_storage_writer.close()
+
+    print(f"Parquet files removed: {removed_files}", file=sys.stderr)
+
+
+# -------------------- stats --------------------
+
+def command_stats(arguments):
+    """
+    Summarize the deals database, the latest run, the work queue and
+    today's GNews quota. Missing files are skipped, never created.
+    """
+
+    statistics = {}
+
+    connection = _open_read_only(arguments.database)
+
+    if connection is not None:
+        try:
+            deal_columns = _table_columns(connection, "deals")
+
+            valued_column = "deal_value_normalized" if "deal_value_normalized" in deal_columns else "NULL"
+            ingestion_column = "ingestion_timestamp" if "ingestion_timestamp" in deal_columns else "NULL"
+
+            deal_row = connection.execute(f"""
+                SELECT
+                    COUNT(*) AS deals,
+                    COUNT({valued_column}) AS valued_deals,
+                    MAX({ingestion_column}) AS latest_ingestion
+                FROM deals
+            """).fetchone()
+
+            statistics["deals"] = dict(deal_row)
+            statistics["deals"]["raw_llm_outputs"] = connection.execute("SELECT COUNT(*) FROM article_extractions").fetchone()[0]
+
+        except sqlite3.Error as error:
+            print(f"Deal statistics unavailable: {error}", file=sys.stderr)
+
+        try:
+            # Rollups exist from migration 5 on
+            statistics["top_sellers"] = [
+                dict(row) for row in connection.execute("""
+                    SELECT dimension_value AS seller, SUM(deal_count) AS deal_count, SUM(total_value) AS total_value
+                    FROM deal_rollups
+                    WHERE dimension = 'seller'
+                    GROUP BY dimension_value
+                    ORDER BY total_value DESC
+                    LIMIT ?
+                """, (arguments.top,))
+            ]
+
+        except sqlite3.Error as error:
+            print(f"Rollup statistics unavailable: {error}", file=sys.stderr)
+
+        finally:
+            connection.close()
+
+    connection = _open_read_only(arguments.journal)
+
+    if connection is not None:
+        try:
+            run_row = connection.execute(
+                "SELECT run_id, status, started_at, finished_at FROM pipeline_runs ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+
+            if run_row:
+                statistics["latest_run"] = dict(run_row)
+                statistics["latest_run"]["items"] = {
+                    f"{row['stage']}/{row['status']}": row["item_count"]
+                    for row in connection.execute(
+                        "SELECT stage, status, COUNT(*) AS item_count FROM run_items WHERE run_id = ? GROUP BY stage, status",
+                        (run_row["run_id"],)
+                    )
+                }
+
+        except sqlite3.Error as error:
+            print(f"Run statistics unavailable: {error}", file=sys.stderr)
+
+        finally:
+            connection.close()
+
+    connection = _open_read_only(arguments.queue)
+
+    if connection is not None:
+        try:
+            statistics["work_queue"] = {
+                row[0]: row[1] for row in connection.execute("SELECT status, COUNT(*) FROM work_tasks GROUP BY status")
+            }
+
+        except sqlite3.Error as error:
+            print(f"Queue statistics unavailable: {error}", file=sys.stderr)
+
+        finally:
+            connection.close()
+
+    connection = _open_read_only(arguments.rate_limits)
+
+    if connection is not None:
+        try:
+            statistics["api_quota"] = {
+                row["api_name"]: {"quota_day": row["quota_day"], "used": row["used"], "refused": row["refused"]}
+                for row in connection.execute("""
+                    SELECT api_name, quota_day, used, refused
+                    FROM quota_ledger
+                    WHERE quota_day = (SELECT MAX(quota_day) FROM quota_ledger)
+                """)
+            }
+
+        except sqlite3.Error as error:
+            print(f"Quota statistics unavailable: {error}", file=sys.stderr)
+
+        finally:
+            connection.close()
+
+    if arguments.json:
+        print(json.dumps(statistics, indent=2))
+        return
+
+    if not statistics:
+        print("Nothing stored yet.")
+
+    for section_name, section in statistics.items():
+        print(f"{section_name}:")
+
+        for entry in (section if isinstance(section, list) else [section]):
+            print(f"  {entry}")
+
+
+# -------------------- Entry Point --------------------
+
+def build_parser():
+    """
+    Argument parser with one subparser per command.
+
+    :return: argparse.ArgumentParser
+    """
+
+    argument_parser = argparse.ArgumentParser(
+        description="Defence deal intelligence command line."
+    )
+
+    subparsers = argument_parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the full pipeline")
+    run_parser.add_argument("--resume", action="store_true", help="continue the latest unfinished run")
+    run_parser.add_argument("--run-id", default=None, help="run to resume (with --resume)")
+    run_parser.add_argument("--daemon", action="store_true", help="keep polling queries until SIGINT/SIGTERM")
+    run_parser.add_argument("--enqueue", action="store_true", help="queue classified articles for worker.py instead of extracting")
+    run_parser.add_argument("--profile", nargs="?", const="deterministic", choices=PROFILE_MODES, default=None)
+    run_parser.add_argument("--two-phase", action="store_true", help="fetch full text only for articles passing the gates")
+    run_parser.set_defaults(handler=command_run)
+
+    fetch_parser = subparsers.add_parser("fetch-only", help="fetch articles as JSON lines, no extraction")
+    fetch_parser.add_argument("--queries", nargs="+", default=None, help="default: SEARCH_QUERIES from config/settings.py")
+    fetch_parser.add_argument("--max-per-query", type=int, default=5)
+    fetch_parser.add_argument("--output", default="-", help="file path, or - for stdout")
+    fetch_parser.set_defaults(handler=command_fetch_only)
+
+    reprocess_parser = subparsers.add_parser("reprocess", help="re-derive deals from stored raw LLM outputs")
+    reprocess_parser.add_argument("--database", default="deals_database.db")
+    reprocess_parser.add_argument("--chunk-size", type=int, default=500)
+    reprocess_parser.add_argument("--workers", type=int, default=None)
+    reprocess_parser.add_argument("--keep-stale", action="store_true", help="keep deals whose raw output no longer parses")
+    reprocess_parser.set_defaults(handler=command_reprocess)
+
+    export_parser = subparsers.add_parser("export", help="export stored deals")
+    export_parser.add_argument("--database", default="deals_database.db")
+    export_parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], default="csv")
+    export_parser.add_argument("--output", default="-", help="file path, - for stdout, or a directory for parquet")
+    export_parser.add_argument("--since", default=None, help="only deals ingested at or after this ISO timestamp")
+    export_parser.set_defaults(handler=command_export)
+
+    compact_parser = subparsers.add_parser("compact", help="merge small Parquet files")
+    compact_parser.add_argument("--root", default="deals_parquet")
+    compact_parser.add_argument("--date", default=None, help="only this ingestion date (YYYY-MM-DD)")
+    compact_parser.add_argument("--small-file-mb", type=int, default=8, help="files below this size are merged")
+    compact_parser.set_defaults(handler=command_compact)
+
+    stats_parser = subparsers.add_parser("stats", help="summarize stored deals, runs, queue and quota")
+    stats_parser.add_argument("--database", default="deals_database.db")
+    stats_parser.add_argument("--journal", default="pipeline_runs.db")
+    stats_parser.add_argument("--queue", default="work_queue.db")
+    stats_parser.add_argument("--rate-limits", default="rate_limits.db")
+    stats_parser.add_argument("--top", type=int, default=5, help="top sellers shown")
+    stats_parser.add_argument("--json", action="store_true")
+    stats_parser.set_defaults(handler=command_stats)
+
+    return argument_parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+
+    if arguments.command == "export" and arguments.format == "parquet" and arguments.output == "-":
+        build_parser().error("parquet export needs --output <directory>")
+
+    sys.exit(arguments.handler(arguments))
@@ -1,2 +1,80 @@
 # Base URL for GDELT Document API
 GDELT_BASE_URL = "https://api.gdeltproject.org/api/v2/doc/doc"
+
+# Streaming pipeline: worker threads per stage
+# (fetch calls share the GNews rate limiter below, so more fetch workers
+# are safe but gain nothing beyond GNEWS_REQUESTS_PER_SECOND)
+PIPELINE_FETCH_WORKERS = 1
+PIPELINE_CLASSIFY_WORKERS = 1
+PIPELINE_EXTRACT_WORKERS = 2
+PIPELINE_NORMALIZE_WORKERS = 1
+
+# Two-phase mode (--two-phase): concurrent full-text fetches for candidate articles
+PIPELINE_CONTENT_WORKERS = 4
+
+# Two-phase mode: metadata listing source, "gdelt" (no GNews quota) or "gnews"
+TWO_PHASE_LISTING_SOURCE = "gdelt"
+
+# Two-phase mode: full-text scraping politeness, per news site
+SCRAPER_MAX_PER_DOMAIN = 2
+SCRAPER_DOMAIN_DELAY_SECONDS = 1.0
+
+# Two-phase mode: pages are cut at this size before text extraction
+SCRAPER_MAX_RESPONSE_BYTES = 2_000_000
+
+# GNews plan limits, shared by every fetcher process through rate_limits.db
+GNEWS_REQUESTS_PER_SECOND = 1.0
+GNEWS_BURST = 1
+GNEWS_DAILY_QUOTA = 100
+
+# Daily GNews calls kept back from low-priority (quiet, backed-off) queries
+GNEWS_LOW_PRIORITY_RESERVE = 20
+
+# GDELT asks for at most one request every five seconds
+GDELT_REQUESTS_PER_SECOND = 0.2
+
+# Streaming pipeline: maximum items waiting in front of each stage
+PIPELINE_QUEUE_SIZE = 50
+
+# Print stage queue depths this often while running (None disables)
+PIPELINE_REPORT_INTERVAL_SECONDS = 30
+
+# Daemon mode: seconds between polls of a query that keeps finding new articles
+DAEMON_BASE_INTERVAL_SECONDS = 300
+
+# Daemon mode: quiet queries back off up to this interval
+DAEMON_MAX_INTERVAL_SECONDS = 3600
+
+# Daemon mode: interval multiplier after a poll with no new articles
+DAEMON_BACKOFF_FACTOR = 2.0
+
+# Daemon mode: recent article URLs and deal signatures kept in memory for
+# deduplication (older URLs are still caught by the database lookup)
+DAEMON_MAX_SEEN_URLS = 100_000
+DAEMON_MAX_DEAL_SIGNATURES = 100_000
+
+# Deals are marked stored in the run journal once this many are written,
+# or this many seconds after the last mark
+STORED_MARK_BATCH_SIZE = 200
+STORED_MARK_INTERVAL_SECONDS = 60
+
+# Buffered Google Sheet rows are sent at the latest this many seconds after
+# the oldest one arrived, even when fewer than a full batch are waiting
+GOOGLE_SHEET_FLUSH_INTERVAL_SECONDS = 30
+
+# Daemon mode: rewrite metrics/deal_pipeline.prom this often
+METRICS_EXPORT_INTERVAL_SECONDS = 15
+
+# Daemon mode: merge small Parquet files this often (runs also compact when they end)
+PARQUET_COMPACT_INTERVAL_SECONDS = 3600
+
+# GNews search queries polled by main.py and `cli.py fetch-only`
+SEARCH_QUERIES = [
+    "defense company secured contract",
+    "military procurement order awarded",
+    "arms manufacturer won deal",
+    "drone company signed agreement army",
+    "defense firm to supply systems",
+    "military modernization contract",
+    "government defense contract awarded",
+]
@@ -1,10 +1,19 @@
 # -------------------- Imports --------------------
+import argparse
+import itertools
 import os
+import signal
+import threading
+import time
 from dotenv import load_dotenv
 
 from datetime import datetime
 
 from services.gnews_fetcher import GNewsFetcher
+from services.news_fetcher import NewsFetcher
+from services.two_phase_fetcher import TwoPhaseFetcher
+from services.article_scraper import ArticleScraper
+from services.api_rate_limiter import ApiRateLimiter
 from services.keyword_engine import KeywordEngine
 from services.deal_classifier import DealClassifier
 from services.ollama_llm_extractor import OllamaLLMExtractor
@@ -12,12 +21,52 @@ from utils.json_parser import parse_llm_json
 
 from services.csv_storage_writer import CSVStorageWriter
 from services.database_storage_writer import DatabaseStorageWriter
+from services.parquet_storage_writer import ParquetStorageWriter
+from services.google_sheet_storage_writer import GoogleSheetStorageWriter
+from services.storage_fanout import StorageFanOut
 
 from services.multi_query_fetcher import MultiQueryFetcher
-from utils.confidence_scorer import ConfidenceScorer
-from utils.value_quantity_normalizer import ValueQuantityNormalizer
+from services.article_archive import ArticleArchive
+from services.run_journal import RunJournal
+from services.query_scheduler import QueryScheduler
+from services.sqlite_work_queue import SQLiteWorkQueue
+from utils.batch_deal_processor import BatchDealProcessor
 
 from utils.deal_deduplicator import DealDeduplicator
+from utils.pipeline import Pipeline, Stage
+from utils.metrics import metrics_registry
+from utils.profiling import StageProfiler, profiling_mode_from_environment
+
+from config.settings import (
+    PIPELINE_FETCH_WORKERS,
+    PIPELINE_CLASSIFY_WORKERS,
+    PIPELINE_EXTRACT_WORKERS,
+    PIPELINE_NORMALIZE_WORKERS,
+    PIPELINE_CONTENT_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_REPORT_INTERVAL_SECONDS,
+    DAEMON_BASE_INTERVAL_SECONDS,
+    DAEMON_MAX_INTERVAL_SECONDS,
+    DAEMON_BACKOFF_FACTOR,
+    DAEMON_MAX_SEEN_URLS,
+    DAEMON_MAX_DEAL_SIGNATURES,
+    STORED_MARK_BATCH_SIZE,
+    STORED_MARK_INTERVAL_SECONDS,
+    GOOGLE_SHEET_FLUSH_INTERVAL_SECONDS,
+    GNEWS_REQUESTS_PER_SECOND,
+    GNEWS_BURST,
+    GNEWS_DAILY_QUOTA,
+    GNEWS_LOW_PRIORITY_RESERVE,
+    GDELT_BASE_URL,
+    GDELT_REQUESTS_PER_SECOND,
+    TWO_PHASE_LISTING_SOURCE,
+    SCRAPER_MAX_PER_DOMAIN,
+    SCRAPER_DOMAIN_DELAY_SECONDS,
+    SCRAPER_MAX_RESPONSE_BYTES,
+    METRICS_EXPORT_INTERVAL_SECONDS,
+    PARQUET_COMPACT_INTERVAL_SECONDS,
+    SEARCH_QUERIES
+)
 
 
 # Load variables from .env file
@@ -26,25 +75,81 @@ load_dotenv()
 # Read API key securely
 GNEWS_API_KEY = os.getenv("GNEWS_API_KEY")
 
+# Optional Google Sheet export
+GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
+GOOGLE_SHEETS_ACCESS_TOKEN = os.getenv("GOOGLE_SHEETS_ACCESS_TOKEN")
+
 
 
 # -------------------- Main Pipeline --------------------
 
-def main():
+def main(
+    resume: bool = False,
+    run_id: str = None,
+    daemon: bool = False,
+    enqueue: bool = False,
+    profile_mode: str = None,
+    two_phase: bool = False
+):
     """
     Defense deal intelligence pipeline using GNews full article content
     and local Ollama LLM extraction.
+
+    :param resume: continue an unfinished run instead of starting a new one
+    :param run_id: run to resume (default: latest unfinished run)
+    :param daemon: keep polling the queries until SIGINT/SIGTERM instead of running once
+    :param enqueue: queue classified articles for worker.py instead of extracting here
+    :param profile_mode: "deterministic" or "sampling" per-stage profiling (default: DDI_PROFILE)
+    :param two_phase: list article metadata first and fetch full text only for deal candidates
     """
 
     # Capture pipeline run time
     pipeline_run_timestamp = datetime.utcnow().isoformat()
 
+    # Metrics cover this run only
+    metrics_registry.reset()
+
+    # ---------- STEP 0: Run journal ----------
+
+    run_journal = RunJournal(
+        journal_path="pipeline_runs.db"
+    )
+
+    if resume:
+        resumed_run = run_journal.get_run(run_id)
+
+        if not resumed_run or resumed_run["status"] == "completed":
+            print("No unfinished run to resume.")
+            run_journal.close()
+            return
+
+        run_id = resumed_run["run_id"]
+        pipeline_run_timestamp = resumed_run["ingestion_timestamp"]
+        run_journal.resume_run(run_id)
+
+        print(f"Resuming run {run_id}: {run_journal.item_counts(run_id)}")
+    else:
+        run_id = run_journal.start_run(pipeline_run_timestamp)
+
+        print(f"Started run {run_id}")
+
     # ---------- STEP 1: Initialize services ----------
 
 
 
+    # Shared with every other process fetching from GNews
+    gnews_rate_limiter = ApiRateLimiter(
+        state_path="rate_limits.db",
+        api_name="gnews",
+        requests_per_second=GNEWS_REQUESTS_PER_SECOND,
+        burst=GNEWS_BURST,
+        daily_quota=GNEWS_DAILY_QUOTA,
+        low_priority_reserve=GNEWS_LOW_PRIORITY_RESERVE
+    )
+
     news_fetcher = GNewsFetcher(
-        api_key=GNEWS_API_KEY
+        api_key=GNEWS_API_KEY,
+        rate_limiter=gnews_rate_limiter
     )
 
     llm_extractor = OllamaLLMExtractor(
@@ -90,135 +195,491 @@ def main():
         score_threshold=3
     )
 
-    # ---------- STEP 4: Multi-query deal fetch ----------
+    batch_deal_processor = BatchDealProcessor()
 
-    queries = [
-        "defense company secured contract",
-        "military procurement order awarded",
-        "arms manufacturer won deal",
-        "drone company signed agreement army",
-        "defense firm to supply systems",
-        "military modernization contract",
-        "government defense contract awarded",
-    ]
+    # ---------- STEP 4: Queries ----------
+
+    queries = list(SEARCH_QUERIES)
+
+    # Two-phase mode: list metadata, fetch full text only for candidates
+    two_phase_fetcher = None
+    gdelt_rate_limiter = None
+    article_scraper = None
+
+    if two_phase:
+        if TWO_PHASE_LISTING_SOURCE == "gdelt":
+            gdelt_rate_limiter = ApiRateLimiter(
+                state_path="rate_limits.db",
+                api_name="gdelt",
+                requests_per_second=GDELT_REQUESTS_PER_SECOND
+            )
+
+            listing_fetcher = NewsFetcher(
+                base_url=GDELT_BASE_URL,
+                rate_limiter=gdelt_rate_limiter
+            )
+        else:
+            listing_fetcher = news_fetcher
+
+        # Content workers share the scraper, so per-site limits hold across them
+        article_scraper = ArticleScraper(
+            cache_path="scrape_cache.db",
+            max_per_domain=SCRAPER_MAX_PER_DOMAIN,
+            domain_delay_seconds=SCRAPER_DOMAIN_DELAY_SECONDS,
+            max_response_bytes=SCRAPER_MAX_RESPONSE_BYTES
+        )
+
+        two_phase_fetcher = TwoPhaseFetcher(
+            listing_fetcher=listing_fetcher,
+            listing_source=TWO_PHASE_LISTING_SOURCE,
+            article_scraper=article_scraper,
+            keyword_engine=keyword_engine,
+            deal_classifier=deal_classifier
+        )
+
+    # A daemon keeps only recent URLs in memory; older ones are caught by find_extracted_urls
+    multi_fetcher = MultiQueryFetcher(
+        two_phase_fetcher or news_fetcher,
+        max_seen_urls=DAEMON_MAX_SEEN_URLS if daemon else None
+    )
 
-    multi_fetcher = MultiQueryFetcher(news_fetcher)
+    # On resume, skip finished queries and feed unfinished articles back in
+    fetched_queries = run_journal.fetched_queries(run_id)
+    multi_fetcher.seen_urls.update(run_journal.known_urls(run_id))
 
-    raw_articles = multi_fetcher.fetch_from_queries(
+    pending_queries = [query for query in queries if query not in fetched_queries]
+    resumed_articles = list(run_journal.iter_resumable_articles(run_id))
+
+    if resume:
+        print(f"Queries left: {len(pending_queries)}, articles to retry: {len(resumed_articles)}")
+
+    # Daemon mode polls every query on its own adaptive interval until stopped
+    stop_event = threading.Event()
+
+    query_scheduler = QueryScheduler(
         queries=queries,
-        max_per_query=5
+        base_interval_seconds=DAEMON_BASE_INTERVAL_SECONDS,
+        max_interval_seconds=DAEMON_MAX_INTERVAL_SECONDS,
+        backoff_factor=DAEMON_BACKOFF_FACTOR
     )
 
-    print(f"Raw fetched from multi-query: {len(raw_articles)}")
+    # ---------- STEP 5: Storage backends ----------
 
-    # ---------- STEP 5: Keyword filtering ----------
+    # Archive fetched articles so re-extraction never needs a refetch
+    article_archive = ArticleArchive(
+        directory="article_archive"
+    )
 
-    keyword_filtered_articles =  raw_articles
+    csv_storage_writer = CSVStorageWriter(
+        file_path="deals_database.csv"
+    )
 
-    print(f"After keyword filter: {len(keyword_filtered_articles)}")
+    database_storage_writer = DatabaseStorageWriter(
+        database_path="deals_database.db"
+    )
 
-    # ---------- STEP 6: Deal classification ----------
+    parquet_storage_writer = ParquetStorageWriter(
+        root_directory="deals_parquet"
+    )
+
+    storage_writers = [
+        csv_storage_writer,
+        database_storage_writer,
+        parquet_storage_writer
+    ]
 
-    deal_articles = deal_classifier.filter_deal_articles(
-        keyword_filtered_articles
+    if GOOGLE_SHEET_ID:
+        storage_writers.append(
+            GoogleSheetStorageWriter(
+                spreadsheet_id=GOOGLE_SHEET_ID,
+                access_token=GOOGLE_SHEETS_ACCESS_TOKEN,
+                max_buffer_seconds=GOOGLE_SHEET_FLUSH_INTERVAL_SECONDS
+            )
+        )
+
+    # Deals are written in the background as soon as they are extracted
+    storage_fanout = StorageFanOut(
+        storage_writers=storage_writers
     )
 
-    print(f"Confirmed deal articles: {len(deal_articles)}")
+    deal_deduplicator = DealDeduplicator(
+        max_signatures=DAEMON_MAX_DEAL_SIGNATURES if daemon else None
+    )
 
-    if deal_articles:
-        print(deal_articles[0]["title"])
+    # URLs handed to storage since the last mark; marked stored once the fan-out has flushed
+    stored_urls = []
+    stored_urls_lock = threading.Lock()
+    last_stored_mark = [time.monotonic()]
 
-    # ---------- STEP 7: Ollama extraction ----------
+    # Extraction tasks for worker.py processes (enqueue mode)
+    work_queue = SQLiteWorkQueue(queue_path="work_queue.db") if enqueue else None
 
-    structured_deals = []
+    # ---------- STEP 6: Pipeline stages ----------
 
-    for article in deal_articles:
+    def fetch_query(item):
+        # Journaled articles from a resumed run skip fetching
+        if isinstance(item, dict):
+            return [item]
 
-        article_text = article.get("content", "")
+        # Quiet daemon queries are deferred first when the daily quota runs low
+        priority = query_scheduler.priority(item) if daemon else "normal"
 
-        if not article_text:
-            continue
+        new_article_count = 0
 
-        raw_llm_output = llm_extractor.extract_json(
-            article_text
-        )
+        try:
+            articles = multi_fetcher.fetch_query(item, max_per_query=5, priority=priority)
 
-        structured_deal = parse_llm_json(raw_llm_output)
+            # Articles extracted by an earlier run or poll are not sent to the LLM again
+            if articles:
+                extracted_urls = database_storage_writer.find_extracted_urls([article.get("url") for article in articles])
 
-        if structured_deal:
-            # Initialize confidence scorer
-            confidence_scorer = ConfidenceScorer()
+                metrics_registry.increment("cache_requests_total", len(extracted_urls), cache="extracted_urls", result="hit")
+                metrics_registry.increment("cache_requests_total", len(articles) - len(extracted_urls), cache="extracted_urls", result="miss")
 
-            # Calculate confidence score
-            confidence_value = confidence_scorer.calculate_confidence(structured_deal)
+                articles = [article for article in articles if article.get("url") not in extracted_urls]
 
-            # Initialize normalizer
-            value_quantity_normalizer = ValueQuantityNormalizer()
+            # GNewsFetcher returns [] on errors (429, timeout), so an empty
+            # result is not journaled and the query is fetched again on resume
+            if articles:
+                run_journal.record_fetch(run_id, item, articles)
 
-            # Normalize deal value
-            normalized_deal_value = value_quantity_normalizer.normalize_deal_value(
-                structured_deal.get("deal_value"),
-                structured_deal.get("currency")
-            )
+            new_article_count = len(articles)
 
-            # Normalize quantity
-            normalized_quantity = value_quantity_normalizer.normalize_quantity(
-                structured_deal.get("quantity")
-            )
+            return articles
 
-            # Attach normalized fields
-            structured_deal["deal_value_normalized"] = normalized_deal_value
-            structured_deal["quantity_normalized"] = normalized_quantity
+        finally:
+            if daemon:
+                # Always hand the query back, even after an error, or it is never polled again;
+                # quiet queries back off, busy ones are polled at the base interval
+                query_scheduler.report_result(item, new_article_count)
 
-            # Attach confidence and source
-            structured_deal["confidence"] = confidence_value
-            structured_deal["source_url"] = article.get("url")
-            structured_deal["ingestion_timestamp"] = pipeline_run_timestamp
+    def has_content(article):
+        # Keyword filter is intentionally bypassed; only empty articles are dropped
+        if article.get("content"):
+            return True
 
-            # Append to final list
-            structured_deals.append(structured_deal)
+        run_journal.update_item(run_id, article.get("url"), "fetch", "dropped")
+        return False
 
-    # Initialize deduplicator
-    deal_deduplicator = DealDeduplicator()
+    def archive_article(article):
+        article["content_hash"] = article_archive.put(article)
+        return article
 
-    # Remove duplicate deals
-    deduplicated_deals = deal_deduplicator.deduplicate_deals(structured_deals)
+    def classify_article(article):
+        if two_phase_fetcher:
+            # Keyword and classifier gates on metadata, before any page is downloaded
+            is_deal = two_phase_fetcher.is_candidate(article)
+        else:
+            is_deal, deal_score = deal_classifier.classify_article(article)
 
-    print(f"Structured deals extracted: {len(structured_deals)}")
-    print(f"After deduplication: {len(deduplicated_deals)}")
+            # Attach score for transparency/debugging
+            article["deal_score"] = deal_score
 
-    # Use deduplicated list for storage
-    structured_deals = deduplicated_deals
+        run_journal.update_item(run_id, article.get("url"), "classify", "ok" if is_deal else "dropped")
 
-    if structured_deals:
-        print(structured_deals[0])
+        return is_deal
 
-    # ---------- STEP 8: Store CSV ----------
+    def fetch_full_text(article):
+        source_url = article.get("url")
 
-    csv_storage_writer = CSVStorageWriter(
-        file_path="deals_database.csv"
-    )
+        # Complete listing content is kept; otherwise the page is scraped
+        article = two_phase_fetcher.fetch_content(article)
 
-    csv_storage_writer.save_structured_deals(
-        structured_deals
-    )
+        if article is None:
+            run_journal.update_item(run_id, source_url, "content", "dropped")
 
-    print("Stored in CSV successfully.")
+        return article
 
-    # ---------- STEP 9: Store database ----------
+    def extract_deal(article):
+        # A daemon run lasts for days, so its deals carry their own ingestion time
+        ingestion_timestamp = datetime.utcnow().isoformat() if daemon else pipeline_run_timestamp
 
-    database_storage_writer = DatabaseStorageWriter(
-        database_path="deals_database.db"
-    )
+        # A resumed article may already have its LLM output journaled
+        raw_llm_output = run_journal.get_raw_llm_output(run_id, article.get("url"))
+
+        metrics_registry.increment("cache_requests_total", cache="llm_output", result="miss" if raw_llm_output is None else "hit")
+
+        if raw_llm_output is None:
+            run_journal.update_item(run_id, article.get("url"), "extract", "in_progress")
+
+            raw_llm_output = llm_extractor.extract_json(
+                article["content"]
+            )
+
+            run_journal.update_item(run_id, article.get("url"), "extract", "ok", raw_llm_output=raw_llm_output)
+
+            # Keep raw output so deals can be re-derived later without the LLM
+            database_storage_writer.save_raw_llm_outputs([{
+                "source_url": article.get("url"),
+                "article_title": article.get("title"),
+                "article_text": article["content"],
+                "content_hash": article.get("content_hash"),
+                "raw_llm_output": raw_llm_output,
+                "model_name": llm_extractor.model_name,
+                "ingestion_timestamp": ingestion_timestamp
+            }])
+
+        structured_deal = parse_llm_json(raw_llm_output)
+
+        if not structured_deal:
+            run_journal.update_item(run_id, article.get("url"), "extract", "dropped")
+            return None
+
+        # Attach source and run time
+        structured_deal["source_url"] = article.get("url")
+        structured_deal["ingestion_timestamp"] = ingestion_timestamp
+
+        return structured_deal
+
+    def normalize_deal(structured_deal):
+        # Normalize values/quantities and score confidence
+        structured_deals = [batch_deal_processor.process_deal(structured_deal)]
+
+        # Remove deals already seen earlier in this run
+        new_deals = deal_deduplicator.filter_new_deals(structured_deals)
+
+        if not new_deals:
+            run_journal.update_item(run_id, structured_deal["source_url"], "extract", "dropped")
+
+        return new_deals
+
+    def mark_stored(force=False):
+        # A deal counts as stored only once every backend has flushed it without
+        # reporting it failed; the rest are re-stored on resume (writers skip duplicates)
+        with stored_urls_lock:
+            mark_due = len(stored_urls) >= STORED_MARK_BATCH_SIZE or time.monotonic() - last_stored_mark[0] >= STORED_MARK_INTERVAL_SECONDS
+
+            if not stored_urls or not (force or mark_due):
+                return
+
+            pending_urls = list(stored_urls)
+            stored_urls.clear()
+            last_stored_mark[0] = time.monotonic()
+
+        if not force:
+            storage_fanout.flush()
+
+        failed_urls = storage_fanout.failed_urls()
+
+        run_journal.mark_stored(run_id, [source_url for source_url in pending_urls if source_url not in failed_urls])
+
+    def store_deal(deal):
+        storage_fanout.save_structured_deals([deal])
+
+        with stored_urls_lock:
+            stored_urls.append(deal.source_url)
+
+        # Marking as we go keeps a daemon's memory flat and survives a crash
+        mark_stored()
+
+        return deal
+
+    def enqueue_article(article):
+        # The queue owns retries from here; the run journal only records the hand-off
+        work_queue.enqueue([{"task_id": article.get("url"), "payload": article}])
+        run_journal.update_item(run_id, article.get("url"), "enqueue", "ok")
+        return article
+
+    def record_failure(stage_name, item, error):
+        # Failed items stay resumable; query failures are retried by re-fetching
+        if isinstance(item, dict):
+            # Articles carry "url", parsed deals (normalize stage) carry "source_url"
+            source_url = item.get("url") or item.get("source_url")
+            run_journal.update_item(run_id, source_url, stage_name, "failed", error=str(error))
+        elif hasattr(item, "source_url"):
+            run_journal.update_item(run_id, item.source_url, stage_name, "failed", error=str(error))
+
+    if two_phase:
+        pipeline_stages = [
+            Stage("fetch", fetch_query, workers=PIPELINE_FETCH_WORKERS, queue_size=PIPELINE_QUEUE_SIZE, kind="flat_map"),
+            Stage("classify", classify_article, workers=PIPELINE_CLASSIFY_WORKERS, queue_size=PIPELINE_QUEUE_SIZE, kind="filter"),
+            Stage("content", fetch_full_text, workers=PIPELINE_CONTENT_WORKERS, queue_size=PIPELINE_QUEUE_SIZE),
+            Stage("archive", archive_article, queue_size=PIPELINE_QUEUE_SIZE),
+        ]
+    else:
+        pipeline_stages = [
+            Stage("fetch", fetch_query, workers=PIPELINE_FETCH_WORKERS, queue_size=PIPELINE_QUEUE_SIZE, kind="flat_map"),
+            Stage("filter", has_content, queue_size=PIPELINE_QUEUE_SIZE, kind="filter"),
+            Stage("archive", archive_article, queue_size=PIPELINE_QUEUE_SIZE),
+            Stage("classify", classify_article, workers=PIPELINE_CLASSIFY_WORKERS, queue_size=PIPELINE_QUEUE_SIZE, kind="filter"),
+        ]
+
+    if enqueue:
+        pipeline_stages.append(Stage("enqueue", enqueue_article, queue_size=PIPELINE_QUEUE_SIZE))
+    else:
+        pipeline_stages.extend([
+            Stage("extract", extract_deal, workers=PIPELINE_EXTRACT_WORKERS, queue_size=PIPELINE_QUEUE_SIZE),
+            Stage("normalize", normalize_deal, workers=PIPELINE_NORMALIZE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE, kind="flat_map"),
+            Stage("store", store_deal, queue_size=PIPELINE_QUEUE_SIZE),
+        ])
+
+    # Optional per-stage CPU/memory profiling, reports in profiles/<run_id>/
+    profile_mode = profile_mode or profiling_mode_from_environment()
+    stage_profiler = None
+
+    if profile_mode:
+        stage_profiler = StageProfiler(
+            output_directory=f"profiles/{run_id}",
+            mode=profile_mode
+        )
 
-    database_storage_writer.save_structured_deals(
-        structured_deals
+        stage_profiler.instrument(pipeline_stages)
+
+    deal_pipeline = Pipeline(
+        stages=pipeline_stages,
+        report_interval_seconds=PIPELINE_REPORT_INTERVAL_SECONDS,
+        error_handler=record_failure
     )
 
-    print("Stored in SQLite successfully.")
+    # ---------- STEP 7: Run pipeline ----------
+
+    if daemon:
+        # Stop polling on SIGINT/SIGTERM; in-flight articles drain and are stored
+        def request_shutdown(signal_number, frame):
+            if stop_event.is_set():
+                # Second signal: stop without draining
+                raise KeyboardInterrupt
+
+            print(f"Received signal {signal_number}, finishing in-flight work...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, request_shutdown)
+        signal.signal(signal.SIGTERM, request_shutdown)
+
+        pipeline_source = itertools.chain(resumed_articles, query_scheduler.iter_due_queries(stop_event))
+
+        # Keep the Prometheus file fresh while the daemon runs
+        def export_metrics():
+            while not stop_event.wait(METRICS_EXPORT_INTERVAL_SECONDS):
+                try:
+                    metrics_registry.write_prometheus("metrics/deal_pipeline.prom")
+                except Exception as error:
+                    print(f"Metrics export failed: {error}")
+
+        threading.Thread(target=export_metrics, name="metrics-export", daemon=True).start()
+
+        # Every fan-out flush adds a small Parquet file; merge them while the daemon runs
+        def compact_parquet():
+            while not stop_event.wait(PARQUET_COMPACT_INTERVAL_SECONDS):
+                parquet_storage_writer.compact()
+
+        threading.Thread(target=compact_parquet, name="parquet-compaction", daemon=True).start()
+
+        print(f"Daemon polling {len(queries)} queries (Ctrl+C to stop)")
+    else:
+        pipeline_source = itertools.chain(resumed_articles, pending_queries)
+
+    if stage_profiler:
+        stage_profiler.start()
+
+    try:
+        pipeline_stats = deal_pipeline.run(pipeline_source)
+
+    finally:
+        if stage_profiler:
+            try:
+                print(f"Profile reports: {stage_profiler.stop()}")
+            except Exception as error:
+                print(f"Writing profile reports failed: {error}")
+
+        # Flush everything extracted so far, even if the run crashed
+        storage_fanout.close()
+        article_archive.close()
+
+        # Merge the run's small Parquet files (the writer's index is closed; compact does not use it)
+        parquet_storage_writer.compact()
+
+        if work_queue:
+            work_queue.close()
+
+        # Deals stored since the last mark (the fan-out is closed, so flushed)
+        mark_stored(force=True)
+
+        run_status = run_journal.finish_run(run_id)
+        run_journal.close()
+
+        gnews_quota = gnews_rate_limiter.remaining_quota()
+        gnews_rate_limiter.close()
+
+        if gdelt_rate_limiter:
+            gdelt_rate_limiter.close()
+
+        if article_scraper:
+            article_scraper.close()
+
+        # Prometheus textfile plus a JSON summary per run
+        try:
+            metrics_registry.write_prometheus("metrics/deal_pipeline.prom")
+            metrics_registry.write_json_summary(
+                f"metrics/run_{run_id}.json",
+                extra={
+                    "run_id": run_id,
+                    "status": run_status,
+                    "stages": deal_pipeline.stats(),
+                    "storage": storage_fanout.stats(),
+                    "gnews_quota": gnews_quota
+                }
+            )
+
+        except Exception as error:
+            print(f"Metrics export failed: {error}")
+
+    print(f"Run {run_id}: {run_status}")
+
+    print(f"Raw fetched from multi-query: {pipeline_stats['fetch']['emitted']}")
+    if two_phase:
+        print(f"Confirmed deal articles: {pipeline_stats['classify']['emitted']}")
+        print(f"Articles with content: {pipeline_stats['content']['emitted']}")
+    else:
+        print(f"Articles with content: {pipeline_stats['filter']['emitted']}")
+        print(f"Confirmed deal articles: {pipeline_stats['classify']['emitted']}")
+
+    if enqueue:
+        print(f"Queued for extraction workers: {pipeline_stats['enqueue']['emitted']}")
+    else:
+        print(f"Structured deals extracted: {pipeline_stats['extract']['emitted']}")
+        print(f"After deduplication: {pipeline_stats['normalize']['emitted']}")
+
+    # ---------- STEP 8: Run summary ----------
+
+    for stage_name, stage_stats in pipeline_stats.items():
+        print(f"Stage {stage_name}: {stage_stats}")
+
+    for backend_name, backend_stats in storage_fanout.stats().items():
+        print(f"{backend_name}: {backend_stats}")
+
+    print(f"GNews quota: {gnews_quota}")
+    print(f"Throughput: {metrics_registry.derived_rates()}")
 
 
 # -------------------- Entry Point --------------------
 
 if __name__ == "__main__":
-    main()
+    argument_parser = argparse.ArgumentParser(
+        description="Run the defence deal intelligence pipeline."
+    )
+
+    argument_parser.add_argument("--resume", action="store_true", help="continue the latest unfinished run")
+    argument_parser.add_argument("--run-id", default=None, help="run to resume (with --resume)")
+    argument_parser.add_argument("--daemon", action="store_true", help="keep polling queries until SIGINT/SIGTERM")
+    argument_parser.add_argument("--enqueue", action="store_true", help="queue classified articles for worker.py instead of extracting")
+    argument_parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="deterministic",
+        choices=StageProfiler.MODES,
+        default=None,
+        help="profile each stage (default mode: deterministic; env: DDI_PROFILE)"
+    )
+    argument_parser.add_argument("--two-phase", action="store_true", help="fetch full text only for articles passing the keyword and classifier gates")
+
+    arguments = argument_parser.parse_args()
+
+    main(
+        resume=arguments.resume,
+        run_id=arguments.run_id,
+        daemon=arguments.daemon,
+        enqueue=arguments.enqueue,
+        profile_mode=arguments.profile,
+        two_phase=arguments.two_phase
+    )
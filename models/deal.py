@@ -0,0 +1,198 @@
+# This module defines the typed deal record shared by every pipeline stage
+
+import json
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+
+# Field order used for tuples, database rows and columnar batches
+DEAL_FIELDS = (
+    "buyer",
+    "seller",
+    "product",
+    "quantity",
+    "deal_value",
+    "currency",
+    "deal_date",
+    "summary",
+    "deal_value_normalized",
+    "quantity_normalized",
+    "confidence",
+    "source_url",
+    "ingestion_timestamp"
+)
+
+
+@dataclass(slots=True)
+class Deal:
+    """
+    Compact structured deal record.
+
+    Slots keep per-deal memory small and attribute access fast when
+    hundreds of thousands of deals are held during re-processing.
+    """
+
+    buyer: Optional[str] = None
+    seller: Optional[str] = None
+    product: Optional[str] = None
+    quantity: Optional[str] = None
+    deal_value: Optional[str] = None
+    currency: Optional[str] = None
+    deal_date: Optional[str] = None
+    summary: Optional[str] = None
+    deal_value_normalized: Optional[int] = None
+    quantity_normalized: Optional[int] = None
+    confidence: Optional[float] = None
+    source_url: Optional[str] = None
+    ingestion_timestamp: Optional[str] = None
+
+    # -------------------- Construction --------------------
+
+    @classmethod
+    def from_dict(cls, deal_dict: dict) -> "Deal":
+        """
+        Build a deal from a loosely keyed dictionary (e.g. parsed LLM JSON).
+        Unknown keys are ignored, missing keys become None.
+
+        :param deal_dict: deal dictionary
+        :return: Deal record
+        """
+
+        return cls(*[deal_dict.get(field_name) for field_name in DEAL_FIELDS])
+
+    @classmethod
+    def from_tuple(cls, deal_tuple) -> "Deal":
+        """
+        Build a deal from a tuple ordered like DEAL_FIELDS.
+
+        :param deal_tuple: tuple or database row
+        :return: Deal record
+        """
+
+        return cls(*deal_tuple)
+
+    # -------------------- Serialization --------------------
+
+    def to_tuple(self) -> tuple:
+        """
+        Convert deal into a tuple ordered like DEAL_FIELDS.
+
+        :return: tuple of field values
+        """
+
+        return (
+            self.buyer,
+            self.seller,
+            self.product,
+            self.quantity,
+            self.deal_value,
+            self.currency,
+            self.deal_date,
+            self.summary,
+            self.deal_value_normalized,
+            self.quantity_normalized,
+            self.confidence,
+            self.source_url,
+            self.ingestion_timestamp
+        )
+
+    def to_row(self, fieldnames) -> dict:
+        """
+        Convert deal into a row dictionary restricted to given columns.
+
+        :param fieldnames: column names to include (e.g. CSV schema)
+        :return: row dictionary
+        """
+
+        return {field_name: getattr(self, field_name) for field_name in fieldnames}
+
+    def to_dict(self) -> dict:
+        """
+        Convert deal into a plain dictionary.
+
+        :return: dictionary with every field
+        """
+
+        return dict(zip(DEAL_FIELDS, self.to_tuple()))
+
+    def to_json(self) -> str:
+        """
+        Serialize deal as a JSON string.
+
+        :return: JSON text
+        """
+
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    # -------------------- Dict compatibility --------------------
+
+    def get(self, field_name: str, default=None):
+        """
+        Dictionary-style read access so existing consumers
+        (scorer, deduplicator) accept Deal records unchanged.
+
+        :param field_name: field to read
+        :param default: value returned when the field is missing or None
+        :return: field value
+        """
+
+        value = getattr(self, field_name, None)
+
+        return default if value is None else value
+
+
+# -------------------- Batch helpers --------------------
+
+def coerce_deal(deal) -> Deal:
+    """
+    Accept either a Deal or a deal dictionary and return a Deal.
+
+    :param deal: Deal record or dictionary
+    :return: Deal record
+    """
+
+    if isinstance(deal, Deal):
+        return deal
+
+    return Deal.from_dict(deal)
+
+
+def deals_to_columns(deals: Iterable) -> dict:
+    """
+    Convert deals into columnar form: one list per field.
+
+    The result can be passed straight to pandas.DataFrame or
+    converted column-by-column into NumPy arrays.
+
+    :param deals: iterable of Deal records or dictionaries
+    :return: dictionary mapping field name to list of values
+    """
+
+    deal_tuples = [coerce_deal(deal).to_tuple() for deal in deals]
+
+    if not deal_tuples:
+        return {field_name: [] for field_name in DEAL_FIELDS}
+
+    return {
+        field_name: list(column_values)
+        for field_name, column_values in zip(DEAL_FIELDS, zip(*deal_tuples))
+    }
+
+
+def deals_from_columns(columns: dict) -> List[Deal]:
+    """
+    Convert columnar data back into Deal records.
+    Missing columns are filled with None.
+
+    :param columns: dictionary mapping field name to sequence of values
+    :return: list of Deal records
+    """
+
+    row_count = max((len(values) for values in columns.values()), default=0)
+    empty_column = [None] * row_count
+
+    ordered_columns = [
+        list(columns.get(field_name, empty_column)) for field_name in DEAL_FIELDS
+    ]
+
+    return [Deal(*row_values) for row_values in zip(*ordered_columns)]
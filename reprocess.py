@@ -0,0 +1,212 @@
+# -------------------- Imports --------------------
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from services.database_storage_writer import DatabaseStorageWriter
+from utils.json_parser import parse_llm_json
+from utils.batch_deal_processor import BatchDealProcessor
+from utils.deal_deduplicator import DealDeduplicator
+
+
+# Per-process batch processor, created once by the pool initializer
+_worker_deal_processor = None
+
+
+# -------------------- Worker --------------------
+
+def _initialize_worker():
+    """
+    Build the batch processor once per worker process.
+    """
+
+    global _worker_deal_processor
+    _worker_deal_processor = BatchDealProcessor()
+
+
+def _reprocess_chunk(raw_llm_outputs: list):
+    """
+    Re-apply parsing, normalization and scoring to stored raw outputs.
+
+    :param raw_llm_outputs: list of stored raw output dictionaries
+    :return: list of Deal records
+    """
+
+    extracted_deals = []
+
+    for raw_output in raw_llm_outputs:
+
+        structured_deal = parse_llm_json(raw_output.get("raw_llm_output") or "")
+
+        if structured_deal:
+            structured_deal["source_url"] = raw_output.get("source_url")
+            structured_deal["ingestion_timestamp"] = raw_output.get("ingestion_timestamp")
+
+            extracted_deals.append(structured_deal)
+
+    return _worker_deal_processor.process_deals(extracted_deals)
+
+
+# -------------------- Reprocess Pipeline --------------------
+
+def _apply_chunk(
+    database_storage_writer: DatabaseStorageWriter,
+    deal_deduplicator: DealDeduplicator,
+    chunk_urls: list,
+    structured_deals: list,
+    delete_stale: bool
+) -> dict:
+    """
+    Write one reprocessed chunk back to the database.
+
+    Deals that are already stored are always updated in place: they were
+    kept by the run that stored them, so they are never dropped as
+    duplicates here. Deals without a stored row (their raw output did not
+    parse before) are inserted unless they duplicate a deal seen earlier
+    in this run.
+
+    :param database_storage_writer: target database
+    :param deal_deduplicator: signatures seen so far in this run
+    :param chunk_urls: source URLs whose raw output was re-extracted in this chunk
+    :param structured_deals: Deal records produced from this chunk
+    :param delete_stale: delete stored deals whose raw output no longer parses
+    :return: dictionary with upserted, skipped and deleted counts
+    """
+
+    stored_urls = database_storage_writer.find_stored_deal_urls(chunk_urls)
+
+    stored_deals = [deal for deal in structured_deals if deal.source_url in stored_urls]
+    new_deals = [deal for deal in structured_deals if deal.source_url not in stored_urls]
+
+    # Stored deals only register their signatures
+    deal_deduplicator.filter_new_deals(stored_deals)
+    new_deals_to_insert = deal_deduplicator.filter_new_deals(new_deals)
+
+    upsert_result = database_storage_writer.upsert_structured_deals(
+        stored_deals + new_deals_to_insert
+    )
+
+    deleted_count = 0
+
+    if delete_stale:
+        produced_urls = {deal.source_url for deal in structured_deals}
+        stale_urls = sorted(stored_urls - produced_urls)
+
+        deleted_count = database_storage_writer.delete_deals_by_source_url(stale_urls)["deleted"]
+
+    return {
+        "upserted": upsert_result["upserted"],
+        "skipped": len(new_deals) - len(new_deals_to_insert),
+        "deleted": deleted_count
+    }
+
+
+def reprocess(
+    database_path: str = "deals_database.db",
+    chunk_size: int = 500,
+    max_workers: int = None,
+    delete_stale: bool = True
+):
+    """
+    Rebuild stored deals from persisted raw LLM outputs without calling the model.
+
+    Raw outputs are streamed from SQLite in chunks (ordered by source_url)
+    and processed in parallel across CPU cores. Each chunk is written back
+    as soon as its result arrives (in chunk order), so memory stays
+    bounded by the chunks in flight, not the size of the table.
+
+    Stale rows: a stored deal whose raw output was re-extracted in this run
+    but no longer parses is deleted (delete_stale=True). Deals without a
+    stored raw output are never touched, and stored deals are never
+    deleted for being duplicates of each other.
+
+    :param database_path: SQLite database file path
+    :param chunk_size: raw outputs per worker task
+    :param max_workers: worker processes (default: CPU count)
+    :param delete_stale: delete stored deals whose raw output no longer parses
+    :return: number of deals upserted
+    """
+
+    max_workers = max_workers or os.cpu_count() or 1
+
+    database_storage_writer = DatabaseStorageWriter(
+        database_path=database_path
+    )
+
+    deal_deduplicator = DealDeduplicator()
+
+    totals = {"reprocessed": 0, "upserted": 0, "skipped": 0, "deleted": 0}
+
+    def apply_result(chunk_urls: list, future):
+        structured_deals = future.result()
+
+        chunk_result = _apply_chunk(
+            database_storage_writer,
+            deal_deduplicator,
+            chunk_urls,
+            structured_deals,
+            delete_stale
+        )
+
+        totals["reprocessed"] += len(structured_deals)
+
+        for key, value in chunk_result.items():
+            totals[key] += value
+
+    # (chunk URLs, future) in submission order, so results are applied in chunk order
+    pending_futures = deque()
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_worker) as process_pool:
+
+            for raw_chunk in database_storage_writer.iter_raw_llm_outputs(batch_size=chunk_size):
+
+                # Bound in-flight chunks so streaming does not load the whole table
+                if len(pending_futures) >= max_workers * 2:
+                    apply_result(*pending_futures.popleft())
+
+                chunk_urls = [raw_output.get("source_url") for raw_output in raw_chunk]
+
+                pending_futures.append((chunk_urls, process_pool.submit(_reprocess_chunk, raw_chunk)))
+
+            while pending_futures:
+                apply_result(*pending_futures.popleft())
+
+    finally:
+        database_storage_writer.close()
+
+    print(f"Reprocessed deals: {totals['reprocessed']}")
+    print(f"Upserted reprocessed deals: {totals['upserted']}")
+    print(f"Skipped new duplicates: {totals['skipped']}")
+
+    if delete_stale:
+        print(f"Deleted stale deals: {totals['deleted']}")
+
+    return totals["upserted"]
+
+
+# -------------------- Entry Point --------------------
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Re-derive stored deals from raw LLM outputs."
+    )
+
+    argument_parser.add_argument("--database", default="deals_database.db")
+    argument_parser.add_argument("--chunk-size", type=int, default=500)
+    argument_parser.add_argument("--workers", type=int, default=None)
+    argument_parser.add_argument(
+        "--keep-stale",
+        action="store_true",
+        help="keep deals whose raw output no longer parses"
+    )
+
+    arguments = argument_parser.parse_args()
+
+    reprocess(
+        database_path=arguments.database,
+        chunk_size=arguments.chunk_size,
+        max_workers=arguments.workers,
+        delete_stale=not arguments.keep_stale
+    )
@@ -0,0 +1,278 @@
+# This class throttles news API calls across threads and processes, with a daily quota ledger
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from utils.metrics import metrics_registry
+
+
+class QuotaExhaustedError(Exception):
+    """
+    Raised when a call is refused because the daily quota (or the share
+    of it open to the call's priority) is used up.
+    """
+
+
+class ApiRateLimiter:
+    """
+    Token bucket plus daily quota ledger, stored in SQLite.
+
+    Every fetcher process using the same state file shares one bucket
+    per API: tokens refill at requests_per_second up to burst, and a call
+    waits until a token is available. Updates run in BEGIN IMMEDIATE
+    transactions, so concurrent processes never spend the same token.
+
+    The ledger counts calls per UTC day (when GNews quotas reset). Calls
+    are refused once daily_quota is used up; low-priority calls are
+    refused earlier, when only low_priority_reserve calls are left, so the
+    remaining budget goes to normal queries. A 429 answer pauses the
+    bucket for every process (pause()), so the API is not hit again
+    before it is ready.
+
+    Priorities: "normal", "low"
+    """
+
+    PRIORITIES = ("normal", "low")
+
+    def __init__(
+        self,
+        state_path: str,
+        api_name: str,
+        requests_per_second: float,
+        burst: int = 1,
+        daily_quota: int = None,
+        low_priority_reserve: int = 0
+    ):
+        """
+        Open (or create) the shared limiter state.
+
+        :param state_path: SQLite file shared by all fetchers
+        :param api_name: bucket and ledger key, e.g. "gnews"
+        :param requests_per_second: sustained call rate
+        :param burst: calls allowed back-to-back after an idle period
+        :param daily_quota: calls per UTC day (None: unlimited)
+        :param low_priority_reserve: calls per day kept back from low-priority callers
+        """
+        self.state_path = state_path
+        self.api_name = api_name
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.daily_quota = daily_quota
+        self.low_priority_reserve = low_priority_reserve
+
+        self._lock = threading.Lock()
+
+        self.connection = sqlite3.connect(state_path, isolation_level=None, check_same_thread=False, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode = WAL")
+
+        self._create_tables()
+
+    def _create_tables(self):
+        """
+        Create bucket and ledger tables if missing.
+        """
+
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                api_name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                paused_until REAL NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS quota_ledger (
+                api_name TEXT NOT NULL,
+                quota_day TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                refused INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (api_name, quota_day)
+            );
+        """)
+
+    def _today(self) -> str:
+        """
+        Current quota day (UTC date).
+
+        :return: YYYY-MM-DD
+        """
+
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _quota_limit(self, priority: str) -> int:
+        """
+        Calls per day open to a priority.
+
+        :param priority: call priority
+        :return: call limit, or None if unlimited
+        """
+
+        if self.daily_quota is None:
+            return None
+
+        if priority == "low":
+            return self.daily_quota - self.low_priority_reserve
+
+        return self.daily_quota
+
+    def _try_take(self, priority: str) -> float:
+        """
+        Take one token and record the call, in one transaction.
+
+        :param priority: call priority
+        :return: 0 if the call may proceed, otherwise seconds to wait
+        """
+
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                now = time.time()
+                quota_day = self._today()
+
+                ledger_row = self.connection.execute(
+                    "SELECT used FROM quota_ledger WHERE api_name = ? AND quota_day = ?",
+                    (self.api_name, quota_day)
+                ).fetchone()
+
+                used = ledger_row["used"] if ledger_row else 0
+                quota_limit = self._quota_limit(priority)
+
+                if quota_limit is not None and used >= quota_limit:
+                    self.connection.execute("""
+                        INSERT INTO quota_ledger (api_name, quota_day, used, refused) VALUES (?, ?, 0, 1)
+                        ON CONFLICT(api_name, quota_day) DO UPDATE SET refused = refused + 1
+                    """, (self.api_name, quota_day))
+
+                    self.connection.execute("COMMIT")
+
+                    raise QuotaExhaustedError(
+                        f"{self.api_name} daily quota reached for {priority} priority ({used}/{self.daily_quota} used)"
+                    )
+
+                bucket_row = self.connection.execute(
+                    "SELECT tokens, updated_at, paused_until FROM rate_buckets WHERE api_name = ?",
+                    (self.api_name,)
+                ).fetchone()
+
+                if bucket_row:
+                    elapsed_seconds = max(0.0, now - bucket_row["updated_at"])
+                    tokens = min(self.burst, bucket_row["tokens"] + elapsed_seconds * self.requests_per_second)
+                    paused_until = bucket_row["paused_until"]
+                else:
+                    tokens = float(self.burst)
+                    paused_until = 0.0
+
+                if paused_until > now:
+                    wait_seconds = paused_until - now
+                elif tokens >= 1:
+                    tokens -= 1
+                    wait_seconds = 0.0
+
+                    self.connection.execute("""
+                        INSERT INTO quota_ledger (api_name, quota_day, used) VALUES (?, ?, 1)
+                        ON CONFLICT(api_name, quota_day) DO UPDATE SET used = used + 1
+                    """, (self.api_name, quota_day))
+                else:
+                    wait_seconds = (1 - tokens) / self.requests_per_second
+
+                self.connection.execute("""
+                    INSERT INTO rate_buckets (api_name, tokens, updated_at, paused_until) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(api_name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+                """, (self.api_name, tokens, now, paused_until))
+
+                self.connection.execute("COMMIT")
+
+                return wait_seconds
+
+            except QuotaExhaustedError:
+                raise
+
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def acquire(self, priority: str = "normal", timeout_seconds: float = None):
+        """
+        Wait for permission to make one call.
+
+        :param priority: "normal" or "low"
+        :param timeout_seconds: give up after waiting this long (None: wait as needed)
+        :return: True if the call may proceed, False on timeout
+        :raises QuotaExhaustedError: the daily quota open to this priority is used up
+        """
+
+        if priority not in self.PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        started_at = time.monotonic()
+        deadline = None if timeout_seconds is None else started_at + timeout_seconds
+
+        try:
+            while True:
+                wait_seconds = self._try_take(priority)
+
+                if wait_seconds <= 0:
+                    return True
+
+                if deadline is not None:
+                    remaining_seconds = deadline - time.monotonic()
+
+                    if remaining_seconds <= wait_seconds:
+                        return False
+
+                time.sleep(wait_seconds)
+
+        finally:
+            # Time spent waiting for tokens shows whether the API rate is the bottleneck
+            metrics_registry.observe("rate_limiter_wait_seconds", time.monotonic() - started_at, api=self.api_name)
+
+    def pause(self, seconds: float):
+        """
+        Stop all processes from calling the API for a while (e.g. after a 429).
+
+        :param seconds: pause length, typically the Retry-After value
+        """
+
+        paused_until = time.time() + seconds
+
+        with self._lock:
+            self.connection.execute("""
+                INSERT INTO rate_buckets (api_name, tokens, updated_at, paused_until) VALUES (?, 0, ?, ?)
+                ON CONFLICT(api_name) DO UPDATE SET tokens = 0, paused_until = MAX(paused_until, excluded.paused_until)
+            """, (self.api_name, time.time(), paused_until))
+
+    def remaining_quota(self) -> dict:
+        """
+        Today's quota usage.
+
+        :return: dictionary with quota_day, used, refused, daily_quota and remaining
+        """
+
+        quota_day = self._today()
+
+        with self._lock:
+            ledger_row = self.connection.execute(
+                "SELECT used, refused FROM quota_ledger WHERE api_name = ? AND quota_day = ?",
+                (self.api_name, quota_day)
+            ).fetchone()
+
+        used = ledger_row["used"] if ledger_row else 0
+
+        return {
+            "quota_day": quota_day,
+            "used": used,
+            "refused": ledger_row["refused"] if ledger_row else 0,
+            "daily_quota": self.daily_quota,
+            "remaining": None if self.daily_quota is None else max(0, self.daily_quota - used)
+        }
+
+    def close(self):
+        """
+        Close the state connection.
+        """
+
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,530 @@
+# This class stores fetched articles as compressed, content-addressed blobs in pack files
+
+import hashlib
+import json
+import lzma
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+
+# Pack record: magic, sha256 digest, codec id, payload length, then payload
+PACK_RECORD_MAGIC = b"DDA1"
+PACK_RECORD_HEADER = struct.Struct("<4s32sBI")
+
+# Index file: header, then a power-of-two array of hash slots
+INDEX_MAGIC = b"DDAIDX01"
+INDEX_HEADER = struct.Struct("<8sQQ")
+INDEX_SLOT = struct.Struct("<32sIQI")
+
+EMPTY_DIGEST = bytes(32)
+
+CODEC_IDS = {"zlib": 1, "lzma": 2}
+
+
+class ArticleArchive:
+    """
+    Append-only archive of raw articles keyed by SHA-256 of their content.
+
+    Articles are stored as compressed JSON blobs in pack files. A
+    memory-mapped open-addressing hash table maps content hash to
+    (pack, offset, length), so random reads cost one probe and one
+    pread. The same content is stored once however often it is fetched.
+
+    One writer per archive directory is supported. Readers in other
+    processes see entries added after they opened the archive only
+    once they reopen it.
+
+    Opening the archive repairs a crash mid-append. A torn record at the
+    end of the active pack is cut off before anything new is appended.
+    The index is rebuilt when it misses a record that the pack holds.
+    Scans skip damaged bytes and resume at the next record, so one bad
+    record never hides the records behind it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        codec: str = "zlib",
+        max_pack_bytes: int = 256 * 1024 * 1024,
+        initial_slots: int = 1024
+    ):
+        """
+        Open (or create) an archive directory.
+
+        :param directory: archive directory
+        :param codec: "zlib" (fast) or "lzma" (smaller)
+        :param max_pack_bytes: pack file size after which a new pack is started
+        :param initial_slots: initial hash table size (rounded up to a power of two)
+        """
+
+        if codec not in CODEC_IDS:
+            raise ValueError(f"Unknown archive codec: {codec}")
+
+        self.directory = directory
+        self.codec = codec
+        self.max_pack_bytes = max_pack_bytes
+
+        self.index_path = os.path.join(directory, "index.bin")
+
+        self._lock = threading.RLock()
+        self._read_descriptors = {}
+
+        os.makedirs(directory, exist_ok=True)
+
+        pack_ids = self._existing_pack_ids()
+
+        if not os.path.exists(self.index_path):
+            self._create_index_file(self.index_path, self._round_slots(initial_slots))
+
+        self._open_index()
+
+        index_incomplete = self._recover_active_pack(pack_ids[-1]) if pack_ids else False
+
+        # Recover an index lost or left behind after a crash (or deleted on purpose)
+        if pack_ids and (self._entry_count == 0 or index_incomplete):
+            self.rebuild_index()
+
+        self._active_pack_id = pack_ids[-1] if pack_ids else 0
+        self._pack_file = open(self._pack_path(self._active_pack_id), mode="ab")
+
+    # -------------------- Paths --------------------
+
+    def _pack_path(self, pack_id: int) -> str:
+        """
+        :param pack_id: pack number
+        :return: pack file path
+        """
+
+        return os.path.join(self.directory, f"pack-{pack_id:05d}.pack")
+
+    def _existing_pack_ids(self) -> list:
+        """
+        :return: sorted pack numbers present on disk
+        """
+
+        return sorted(
+            int(entry[5:10])
+            for entry in os.listdir(self.directory)
+            if entry.startswith("pack-") and entry.endswith(".pack")
+        )
+
+    # -------------------- Hash index --------------------
+
+    def _round_slots(self, slot_count: int) -> int:
+        """
+        :param slot_count: requested slots
+        :return: next power of two (minimum 16)
+        """
+
+        rounded_count = 16
+
+        while rounded_count < slot_count:
+            rounded_count *= 2
+
+        return rounded_count
+
+    def _create_index_file(self, index_path: str, slot_count: int):
+        """
+        Create an empty index file (slots are zero-filled).
+
+        :param index_path: file to create
+        :param slot_count: number of slots (power of two)
+        """
+
+        with open(index_path, mode="wb") as index_file:
+            index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, slot_count, 0))
+            index_file.truncate(INDEX_HEADER.size + slot_count * INDEX_SLOT.size)
+
+    def _open_index(self):
+        """
+        Memory-map the index file and read its header.
+        """
+
+        self._index_file = open(self.index_path, mode="r+b")
+        self._index_map = mmap.mmap(self._index_file.fileno(), 0)
+
+        magic, self._slot_count, self._entry_count = INDEX_HEADER.unpack_from(self._index_map, 0)
+
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"Not an article archive index: {self.index_path}")
+
+    def _close_index(self):
+        """
+        Flush and unmap the index file.
+        """
+
+        self._index_map.flush()
+        self._index_map.close()
+        self._index_file.close()
+
+    def _find_slot(self, index_map, slot_count: int, digest: bytes):
+        """
+        Linear-probe for digest.
+
+        :return: (slot number, True if digest found / False if empty slot)
+        """
+
+        slot_mask = slot_count - 1
+        slot_number = int.from_bytes(digest[:8], "little") & slot_mask
+
+        while True:
+            slot_offset = INDEX_HEADER.size + slot_number * INDEX_SLOT.size
+            slot_digest = index_map[slot_offset:slot_offset + 32]
+
+            if slot_digest == digest:
+                return slot_number, True
+
+            if slot_digest == EMPTY_DIGEST:
+                return slot_number, False
+
+            slot_number = (slot_number + 1) & slot_mask
+
+    def _insert_entry(self, digest: bytes, pack_id: int, offset: int, length: int):
+        """
+        Add index entry, growing the table above 50% load.
+        """
+
+        if (self._entry_count + 1) * 2 > self._slot_count:
+            self._grow_index()
+
+        slot_number, found = self._find_slot(self._index_map, self._slot_count, digest)
+
+        INDEX_SLOT.pack_into(
+            self._index_map,
+            INDEX_HEADER.size + slot_number * INDEX_SLOT.size,
+            digest, pack_id, offset, length
+        )
+
+        if not found:
+            self._entry_count += 1
+            INDEX_HEADER.pack_into(self._index_map, 0, INDEX_MAGIC, self._slot_count, self._entry_count)
+
+    def _grow_index(self):
+        """
+        Rehash every entry into a table twice as large and swap it in atomically.
+        """
+
+        new_slot_count = self._slot_count * 2
+        temporary_path = f"{self.index_path}.tmp"
+
+        self._create_index_file(temporary_path, new_slot_count)
+
+        with open(temporary_path, mode="r+b") as new_index_file:
+            new_index_map = mmap.mmap(new_index_file.fileno(), 0)
+
+            for slot_number in range(self._slot_count):
+                slot_offset = INDEX_HEADER.size + slot_number * INDEX_SLOT.size
+                slot_values = INDEX_SLOT.unpack_from(self._index_map, slot_offset)
+
+                if slot_values[0] == EMPTY_DIGEST:
+                    continue
+
+                new_slot_number, _ = self._find_slot(new_index_map, new_slot_count, slot_values[0])
+                INDEX_SLOT.pack_into(
+                    new_index_map,
+                    INDEX_HEADER.size + new_slot_number * INDEX_SLOT.size,
+                    *slot_values
+                )
+
+            INDEX_HEADER.pack_into(new_index_map, 0, INDEX_MAGIC, new_slot_count, self._entry_count)
+            new_index_map.flush()
+            new_index_map.close()
+
+        self._close_index()
+        os.replace(temporary_path, self.index_path)
+        self._open_index()
+
+    def _lookup(self, digest: bytes):
+        """
+        :return: (pack_id, offset, length) or None
+        """
+
+        # All-zero digest marks empty slots and is never a valid key
+        if digest == EMPTY_DIGEST:
+            return None
+
+        slot_number, found = self._find_slot(self._index_map, self._slot_count, digest)
+
+        if not found:
+            return None
+
+        _, pack_id, offset, length = INDEX_SLOT.unpack_from(
+            self._index_map,
+            INDEX_HEADER.size + slot_number * INDEX_SLOT.size
+        )
+
+        return pack_id, offset, length
+
+    def rebuild_index(self):
+        """
+        Recreate the index by scanning every pack file.
+        """
+
+        with self._lock:
+            self._close_index()
+            self._create_index_file(self.index_path, self._round_slots(1024))
+            self._open_index()
+
+            for pack_id in self._existing_pack_ids():
+                for digest, offset, _, length, _ in self._scan_pack(pack_id, read_payload=False):
+                    self._insert_entry(digest, pack_id, offset, length)
+
+    # -------------------- Crash recovery --------------------
+
+    def _record_is_valid(self, pack_id: int, digest: bytes, offset: int, codec_id: int, length: int) -> bool:
+        """
+        Whether a record's payload decompresses to an article with its digest.
+
+        :return: True if the record is intact
+        """
+
+        with open(self._pack_path(pack_id), mode="rb") as pack_file:
+            blob = os.pread(pack_file.fileno(), length, offset + PACK_RECORD_HEADER.size)
+
+        try:
+            article = json.loads(self._decompress(codec_id, blob))
+        except Exception:
+            return False
+
+        return isinstance(article, dict) and self.content_hash(article) == digest.hex()
+
+    def _recover_active_pack(self, pack_id: int) -> bool:
+        """
+        Truncate the active pack after its last intact record, and check
+        that the index knows every record left in it.
+
+        Appends are flushed record by record, so only the tail can be torn.
+        Headers are checked for every record, payloads only from the end
+        backwards until an intact record is found.
+
+        :param pack_id: active pack number
+        :return: True if the index misses a record and must be rebuilt
+        """
+
+        records = list(self._scan_pack(pack_id, read_payload=False))
+
+        while records and not self._record_is_valid(pack_id, records[-1][0], records[-1][1], records[-1][2], records[-1][3]):
+            records.pop()
+
+        valid_end = records[-1][1] + PACK_RECORD_HEADER.size + records[-1][3] if records else 0
+
+        pack_path = self._pack_path(pack_id)
+        pack_size = os.path.getsize(pack_path)
+
+        if pack_size > valid_end:
+            print(f"Archive pack {pack_id}: truncating {pack_size - valid_end} bytes of torn data at offset {valid_end}")
+
+            with open(pack_path, mode="r+b") as pack_file:
+                pack_file.truncate(valid_end)
+                os.fsync(pack_file.fileno())
+
+        # Content is stored once, so every record's digest must be in the index
+        return any(self._lookup(digest) is None for digest, _, _, _, _ in records)
+
+    # -------------------- Compression --------------------
+
+    def _compress(self, payload: bytes) -> bytes:
+        """
+        :param payload: raw bytes
+        :return: bytes compressed with the archive codec
+        """
+
+        if self.codec == "lzma":
+            return lzma.compress(payload, preset=6)
+
+        return zlib.compress(payload, 6)
+
+    def _decompress(self, codec_id: int, blob: bytes) -> bytes:
+        """
+        :param codec_id: codec recorded with the blob
+        :param blob: compressed bytes
+        :return: raw bytes
+        """
+
+        if codec_id == CODEC_IDS["lzma"]:
+            return lzma.decompress(blob)
+
+        return zlib.decompress(blob)
+
+    # -------------------- Public API --------------------
+
+    def content_hash(self, article: dict) -> str:
+        """
+        Content hash used as archive key.
+
+        :param article: article dictionary (GNews shape)
+        :return: hex SHA-256 of article content
+        """
+
+        content_text = article.get("content") or ""
+
+        return hashlib.sha256(content_text.encode("utf-8")).hexdigest()
+
+    def put(self, article: dict) -> str:
+        """
+        Store an article unless the same content is already archived.
+
+        :param article: article dictionary (GNews shape)
+        :return: hex content hash
+        """
+
+        content_hash = self.content_hash(article)
+        digest = bytes.fromhex(content_hash)
+
+        with self._lock:
+            if self._lookup(digest) is not None:
+                return content_hash
+
+            blob = self._compress(json.dumps(article, ensure_ascii=False).encode("utf-8"))
+
+            self._pack_file.seek(0, os.SEEK_END)
+
+            # Start a new pack once the active one is full
+            if self._pack_file.tell() >= self.max_pack_bytes:
+                self._pack_file.close()
+                self._active_pack_id += 1
+                self._pack_file = open(self._pack_path(self._active_pack_id), mode="ab")
+
+            record_offset = self._pack_file.tell()
+
+            self._pack_file.write(
+                PACK_RECORD_HEADER.pack(PACK_RECORD_MAGIC, digest, CODEC_IDS[self.codec], len(blob))
+            )
+            self._pack_file.write(blob)
+
+            # Record must be on disk before the index points at it
+            self._pack_file.flush()
+
+            self._insert_entry(digest, self._active_pack_id, record_offset, len(blob))
+
+        return content_hash
+
+    def contains(self, content_hash: str) -> bool:
+        """
+        :param content_hash: hex content hash
+        :return: True if archived
+        """
+
+        with self._lock:
+            return self._lookup(bytes.fromhex(content_hash)) is not None
+
+    def get(self, content_hash: str):
+        """
+        Random read of one archived article.
+
+        :param content_hash: hex content hash
+        :return: article dictionary or None
+        """
+
+        digest = bytes.fromhex(content_hash)
+
+        with self._lock:
+            location = self._lookup(digest)
+
+            if location is None:
+                return None
+
+            pack_id, offset, length = location
+
+            if pack_id not in self._read_descriptors:
+                self._read_descriptors[pack_id] = os.open(self._pack_path(pack_id), os.O_RDONLY)
+
+            record = os.pread(self._read_descriptors[pack_id], PACK_RECORD_HEADER.size + length, offset)
+
+        magic, record_digest, codec_id, _ = PACK_RECORD_HEADER.unpack_from(record, 0)
+
+        if magic != PACK_RECORD_MAGIC or record_digest != digest:
+            print(f"Archive record corrupted for {content_hash}")
+            return None
+
+        try:
+            return json.loads(self._decompress(codec_id, record[PACK_RECORD_HEADER.size:]))
+
+        except Exception as error:
+            print(f"Archive record corrupted for {content_hash}: {error}")
+            return None
+
+    def _scan_pack(self, pack_id: int, read_payload: bool = True):
+        """
+        Sequentially read records of one pack.
+
+        Damaged bytes (a torn write, or records appended after one by an
+        older version) are skipped: the scan resumes at the next record
+        magic, so later records are not lost.
+
+        :return: generator of (digest, offset, codec_id, length, blob or None)
+        """
+
+        with open(self._pack_path(pack_id), mode="rb") as pack_file:
+            pack_size = os.fstat(pack_file.fileno()).st_size
+
+            if pack_size == 0:
+                return
+
+            with mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ) as pack_map:
+                record_offset = 0
+
+                while record_offset + PACK_RECORD_HEADER.size <= pack_size:
+                    magic, digest, codec_id, length = PACK_RECORD_HEADER.unpack_from(pack_map, record_offset)
+                    record_end = record_offset + PACK_RECORD_HEADER.size + length
+
+                    if magic != PACK_RECORD_MAGIC or codec_id not in CODEC_IDS.values() or record_end > pack_size:
+                        print(f"Archive pack {pack_id}: damaged record at offset {record_offset}")
+
+                        record_offset = pack_map.find(PACK_RECORD_MAGIC, record_offset + 1)
+
+                        if record_offset == -1:
+                            return
+
+                        continue
+
+                    blob = pack_map[record_offset + PACK_RECORD_HEADER.size:record_end] if read_payload else None
+
+                    yield digest, record_offset, codec_id, length, blob
+
+                    record_offset = record_end
+
+    def iter_articles(self):
+        """
+        Stream every archived article in write order.
+
+        :return: generator of (content_hash, article dictionary)
+        """
+
+        with self._lock:
+            self._pack_file.flush()
+
+        for pack_id in self._existing_pack_ids():
+            for digest, record_offset, codec_id, _, blob in self._scan_pack(pack_id):
+                try:
+                    article = json.loads(self._decompress(codec_id, blob))
+
+                except Exception as error:
+                    print(f"Archive pack {pack_id}: unreadable record at offset {record_offset}: {error}")
+                    continue
+
+                yield digest.hex(), article
+
+    def __len__(self):
+        """
+        :return: number of archived articles
+        """
+
+        return self._entry_count
+
+    def close(self):
+        """
+        Flush and close pack and index files.
+        """
+
+        with self._lock:
+            self._pack_file.close()
+
+            for descriptor in self._read_descriptors.values():
+                os.close(descriptor)
+
+            self._read_descriptors = {}
+            self._close_index()
@@ -1,30 +1,552 @@
-import trafilatura
+# This class downloads and extracts article text, politely and with a revalidating cache
+
+import contextlib
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from utils.metrics import metrics_registry
+
+
+# Query parameters that only track the click, never select the article
+TRACKING_PARAMETERS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ocid", "cmpid", "ref", "amp", "outputtype"}
+
+CANONICAL_LINK_PATTERN = re.compile(r"<link\b[^>]*\brel\s*=\s*[\"']?canonical\b[^>]*>", re.IGNORECASE)
+HREF_PATTERN = re.compile(r"\bhref\s*=\s*[\"']?([^\"'\s>]+)", re.IGNORECASE)
+
+CHARSET_PARAMETER_PATTERN = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+META_CHARSET_PATTERN = re.compile(rb"<meta\b[^>]*\bcharset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+
+
+def canonical_url(source_url: str) -> str:
+    """
+    Cache key for an article URL: lowercase scheme and host, no default
+    port, fragment, tracking parameters or trailing slash, sorted query.
+
+    :param source_url: article URL as listed
+    :return: canonical URL
+    """
+
+    parts = urlsplit(source_url.strip())
+
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or "/"
+
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in TRACKING_PARAMETERS
+    ))
+
+    return urlunsplit((scheme, host, path, query, ""))
 
 
 class ArticleScraper:
     """
-    Robust article text extractor using trafilatura.
-    Works on JS-heavy and protected news sites.
+    Article text extractor: bounded concurrency, per-domain politeness,
+    response-size cap and a SQLite cache with HTTP revalidation.
+
+    Pages are downloaded with requests (streamed, cut at
+    max_response_bytes) and the text is extracted with trafilatura.
+    fetch_article_texts() scrapes a batch on a thread pool; no domain
+    gets more than max_per_domain requests at once, nor requests closer
+    together than domain_delay_seconds, including calls made from
+    several pipeline workers through fetch_article_text(). robots.txt is
+    read once per domain.
+
+    Extracted text is cached by canonical URL (tracking parameters
+    stripped, plus the page's own rel=canonical link, so syndicated and
+    AMP variants share an entry). A cached text is served as-is for
+    revalidate_after_seconds, then revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged page costs a 304 and no download.
+    Pages that will not yield text (robots disallow, 401/402/403/451
+    paywalls, 404/410, too little text) are cached negatively for
+    negative_ttl_seconds; timeouts, 429s and 5xx answers are not cached.
     """
 
+    NEGATIVE_STATUS_CODES = {401, 402, 403, 404, 410, 451}
+
+    def __init__(
+        self,
+        cache_path: str = None,
+        max_workers: int = 8,
+        max_per_domain: int = 2,
+        domain_delay_seconds: float = 1.0,
+        max_response_bytes: int = 2_000_000,
+        timeout_seconds: float = 15,
+        revalidate_after_seconds: float = 6 * 3600,
+        negative_ttl_seconds: float = 24 * 3600,
+        min_text_chars: int = 200,
+        respect_robots: bool = True,
+        user_agent: str = "DefenceDealIntelligence/1.0",
+        text_extractor=None
+    ):
+        """
+        :param cache_path: SQLite cache file (None: no cache)
+        :param max_workers: threads used by fetch_article_texts
+        :param max_per_domain: concurrent requests per domain
+        :param domain_delay_seconds: minimum gap between request starts on one domain
+        :param max_response_bytes: download cap per page; longer pages are cut
+        :param timeout_seconds: connect and read timeout
+        :param revalidate_after_seconds: age after which cached text is revalidated
+        :param negative_ttl_seconds: how long failures are remembered
+        :param min_text_chars: shorter extracted text counts as no article (paywall stub)
+        :param respect_robots: check robots.txt before fetching
+        :param user_agent: sent with every request and matched against robots.txt
+        :param text_extractor: callable(html) -> text (default: trafilatura.extract)
+        """
+        self.max_workers = max_workers
+        self.max_per_domain = max_per_domain
+        self.domain_delay_seconds = domain_delay_seconds
+        self.max_response_bytes = max_response_bytes
+        self.timeout_seconds = timeout_seconds
+        self.revalidate_after_seconds = revalidate_after_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.min_text_chars = min_text_chars
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.text_extractor = text_extractor
+
+        # domain -> semaphore / next allowed request start / robots parser
+        self._domain_lock = threading.Lock()
+        self._domain_semaphores = {}
+        self._domain_next_request_at = {}
+        self._robots_parsers = {}
+
+        # One requests session (connection pool) per thread
+        self._thread_state = threading.local()
+
+        self._cache_lock = threading.Lock()
+        self.connection = None
+
+        if cache_path:
+            self.connection = sqlite3.connect(cache_path, isolation_level=None, check_same_thread=False, timeout=30)
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scraped_pages (
+                    canonical_url TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    article_text TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    reason TEXT,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+    # -------------------- Public API --------------------
+
     def fetch_article_text(self, source_url: str):
         """
         Download and extract clean article content.
+
+        :param source_url: article URL
+        :return: extracted text, or None
         """
 
         try:
-            downloaded = trafilatura.fetch_url(source_url)
+            return self._scrape(source_url)
 
-            if not downloaded:
-                return None
+        except Exception as error:
+            metrics_registry.increment("scrape_requests_total", outcome="error")
+            print(f"Article extraction failed: {error}")
+            return None
+
+    def fetch_article_texts(self, source_urls: list) -> dict:
+        """
+        Scrape a batch of URLs concurrently (max_workers threads, per-domain
+        limits apply). URLs with the same canonical form are fetched once.
+
+        :param source_urls: article URLs
+        :return: dictionary source_url -> extracted text or None
+        """
+
+        urls_by_key = {}
+
+        for source_url in source_urls:
+            urls_by_key.setdefault(canonical_url(source_url), source_url)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scraper") as executor:
+            texts_by_key = dict(zip(urls_by_key, executor.map(self.fetch_article_text, urls_by_key.values())))
+
+        return {source_url: texts_by_key[canonical_url(source_url)] for source_url in source_urls}
+
+    def close(self):
+        """
+        Close the cache database.
+        """
+
+        if self.connection:
+            self.connection.close()
+            self.connection = None
 
-            extracted_text = trafilatura.extract(downloaded)
+    # -------------------- Scraping --------------------
 
-            if not extracted_text or len(extracted_text) < 200:
+    def _scrape(self, source_url: str):
+        """
+        Cache lookup, robots check, conditional download and extraction.
+
+        :param source_url: article URL
+        :return: extracted text, or None
+        """
+
+        cache_key = canonical_url(source_url)
+        cached_page = self._cache_get(cache_key)
+        now = time.time()
+
+        if cached_page and cached_page["expires_at"] > now:
+            metrics_registry.increment("cache_requests_total", cache="scraped_pages", result="hit")
+            return cached_page["article_text"] if cached_page["status"] == "ok" else None
+
+        domain = urlsplit(source_url).netloc.lower()
+
+        with self._domain_slot(domain):
+            if self.respect_robots and not self._robots_allow(source_url):
+                metrics_registry.increment("cache_requests_total", cache="scraped_pages", result="miss")
+                metrics_registry.increment("scrape_requests_total", outcome="robots_disallowed")
+                self._cache_put_negative([cache_key], "robots_disallowed")
                 return None
 
-            return extracted_text
+            headers = {"User-Agent": self.user_agent}
 
-        except Exception as error:
-            print(f"Article extraction failed: {error}")
+            # Only a cached text can be revalidated; expired failures are retried in full
+            if cached_page and cached_page["status"] == "ok":
+                if cached_page["etag"]:
+                    headers["If-None-Match"] = cached_page["etag"]
+
+                if cached_page["last_modified"]:
+                    headers["If-Modified-Since"] = cached_page["last_modified"]
+
+            with metrics_registry.timer("scrape_request_seconds"):
+                response = self._session().get(source_url, headers=headers, timeout=self.timeout_seconds, stream=True)
+
+                try:
+                    if response.status_code == 200:
+                        body = self._read_capped(response)
+
+                finally:
+                    response.close()
+
+        if response.status_code == 304 and cached_page and cached_page["status"] == "ok":
+            metrics_registry.increment("cache_requests_total", cache="scraped_pages", result="hit")
+            metrics_registry.increment("scrape_requests_total", outcome="not_modified")
+            self._cache_refresh(cache_key)
+            return cached_page["article_text"]
+
+        metrics_registry.increment("cache_requests_total", cache="scraped_pages", result="miss")
+
+        if response.status_code in self.NEGATIVE_STATUS_CODES:
+            metrics_registry.increment("scrape_requests_total", outcome="http_error")
+            self._cache_put_negative([cache_key], f"http_{response.status_code}")
+            return None
+
+        if response.status_code != 200:
+            # 429 / 5xx: transient, not cached; back off this domain if asked to
+            metrics_registry.increment("scrape_requests_total", outcome="transient_error")
+            self._delay_domain(domain, response.headers.get("Retry-After"))
+            return None
+
+        content_type = response.headers.get("Content-Type", "text/html").lower()
+
+        if "html" not in content_type and "xml" not in content_type:
+            metrics_registry.increment("scrape_requests_total", outcome="unsupported_content")
+            self._cache_put_negative([cache_key], "unsupported_content")
+            return None
+
+        html = self._decode(body, content_type)
+
+        cache_keys = [cache_key]
+        canonical_link = self._canonical_link(html, source_url)
+
+        if canonical_link and canonical_link != cache_key:
+            cache_keys.append(canonical_link)
+
+        extracted_text = self._extract(html)
+
+        if not extracted_text or len(extracted_text) < self.min_text_chars:
+            # Paywall teasers and consent walls look like very short articles
+            metrics_registry.increment("scrape_requests_total", outcome="no_text")
+            self._cache_put_negative(cache_keys, "no_text")
+            return None
+
+        metrics_registry.increment("scrape_requests_total", outcome="ok")
+
+        self._cache_put_text(
+            cache_keys,
+            extracted_text,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified")
+        )
+
+        return extracted_text
+
+    def _session(self) -> requests.Session:
+        """
+        This thread's HTTP session.
+        """
+
+        if not hasattr(self._thread_state, "session"):
+            self._thread_state.session = requests.Session()
+
+        return self._thread_state.session
+
+    def _read_capped(self, response) -> bytes:
+        """
+        Read a streamed body up to max_response_bytes.
+
+        :param response: streamed requests response
+        :return: body, cut at the cap
+        """
+
+        chunks = []
+        size = 0
+
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+
+            if size >= self.max_response_bytes:
+                # Article text sits near the top; the rest is comments and footers
+                metrics_registry.increment("scrape_truncated_total")
+                break
+
+        return b"".join(chunks)[:self.max_response_bytes]
+
+    def _decode(self, body: bytes, content_type: str) -> str:
+        """
+        Page bytes to text. The charset comes from the Content-Type header,
+        then <meta charset>, then detection. requests' own fallback
+        (ISO-8859-1 for any text/html without a charset) would garble
+        UTF-8 pages.
+
+        :param body: page bytes
+        :param content_type: Content-Type header value
+        :return: decoded markup
+        """
+
+        for charset_match in (CHARSET_PARAMETER_PATTERN.search(content_type), META_CHARSET_PATTERN.search(body[:4096])):
+            if not charset_match:
+                continue
+
+            charset = charset_match.group(1)
+
+            if isinstance(charset, bytes):
+                charset = charset.decode("ascii", errors="ignore")
+
+            try:
+                return body.decode(charset, errors="replace")
+            except LookupError:
+                # Unknown charset name; try the next source
+                continue
+
+        try:
+            return body.decode("utf-8")
+        except UnicodeDecodeError:
+            # Same detection as requests' apparent_encoding
+            detected_encoding = requests.compat.chardet.detect(body)["encoding"] or "utf-8"
+
+            return body.decode(detected_encoding, errors="replace")
+
+    def _extract(self, html: str):
+        """
+        Article text from a page.
+
+        :param html: page markup
+        :return: extracted text, or None
+        """
+
+        if self.text_extractor:
+            return self.text_extractor(html)
+
+        # Loaded on first use so importing services stays cheap
+        import trafilatura
+
+        return trafilatura.extract(html)
+
+    def _canonical_link(self, html: str, source_url: str):
+        """
+        Canonical form of the page's rel=canonical link, if any.
+
+        :param html: page markup
+        :param source_url: URL the page was fetched from (for relative links)
+        :return: canonical URL, or None
+        """
+
+        link_tag = CANONICAL_LINK_PATTERN.search(html)
+
+        if not link_tag:
+            return None
+
+        href = HREF_PATTERN.search(link_tag.group(0))
+
+        return canonical_url(urljoin(source_url, href.group(1))) if href else None
+
+    # -------------------- Politeness --------------------
+
+    @contextlib.contextmanager
+    def _domain_slot(self, domain: str):
+        """
+        Hold one of a domain's max_per_domain slots, starting no earlier
+        than domain_delay_seconds after the previous request to it.
+
+        :param domain: host (and port) of the request
+        """
+
+        with self._domain_lock:
+            semaphore = self._domain_semaphores.setdefault(domain, threading.Semaphore(self.max_per_domain))
+
+        semaphore.acquire()
+
+        try:
+            with self._domain_lock:
+                now = time.monotonic()
+                request_at = max(now, self._domain_next_request_at.get(domain, now))
+                self._domain_next_request_at[domain] = request_at + self.domain_delay_seconds
+
+            if request_at > now:
+                with metrics_registry.timer("scrape_politeness_wait_seconds"):
+                    time.sleep(request_at - now)
+
+            yield
+
+        finally:
+            semaphore.release()
+
+    def _delay_domain(self, domain: str, retry_after):
+        """
+        Push a domain's next request back after a 429 or 503.
+
+        :param domain: host (and port)
+        :param retry_after: Retry-After header value (seconds), or None
+        """
+
+        try:
+            delay_seconds = float(retry_after)
+        except (TypeError, ValueError):
+            delay_seconds = self.domain_delay_seconds * 10
+
+        with self._domain_lock:
+            self._domain_next_request_at[domain] = max(
+                self._domain_next_request_at.get(domain, 0),
+                time.monotonic() + delay_seconds
+            )
+
+    def _robots_allow(self, source_url: str) -> bool:
+        """
+        Whether robots.txt lets user_agent fetch a URL.
+        Read once per domain; an unreachable robots.txt allows everything.
+
+        :param source_url: article URL
+        :return: True if fetching is allowed
+        """
+
+        parts = urlsplit(source_url)
+        robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+
+        with self._domain_lock:
+            robots_parser = self._robots_parsers.get(robots_url)
+
+        if robots_parser is None:
+            robots_parser = RobotFileParser(robots_url)
+
+            try:
+                response = self._session().get(robots_url, headers={"User-Agent": self.user_agent}, timeout=self.timeout_seconds)
+
+                if response.status_code in (401, 403):
+                    robots_parser.disallow_all = True
+                elif response.status_code == 200:
+                    robots_parser.parse(response.text[:self.max_response_bytes].splitlines())
+                else:
+                    robots_parser.allow_all = True
+
+            except requests.RequestException as error:
+                print(f"robots.txt unavailable ({robots_url}): {error}")
+                robots_parser.allow_all = True
+
+            with self._domain_lock:
+                self._robots_parsers[robots_url] = robots_parser
+
+        return robots_parser.can_fetch(self.user_agent, source_url)
+
+    # -------------------- Cache --------------------
+
+    def _cache_get(self, cache_key: str):
+        """
+        :param cache_key: canonical URL
+        :return: cached row as a dictionary, or None
+        """
+
+        if not self.connection:
+            return None
+
+        with self._cache_lock:
+            cached_row = self.connection.execute(
+                """
+                SELECT status, article_text, etag, last_modified, expires_at
+                FROM scraped_pages WHERE canonical_url = ?
+                """,
+                (cache_key,)
+            ).fetchone()
+
+        if not cached_row:
             return None
+
+        return dict(zip(("status", "article_text", "etag", "last_modified", "expires_at"), cached_row))
+
+    def _cache_write(self, cache_keys: list, status: str, article_text, etag, last_modified, reason, ttl_seconds: float):
+        """
+        Insert or replace cache rows.
+        """
+
+        if not self.connection:
+            return
+
+        now = time.time()
+
+        with self._cache_lock:
+            self.connection.executemany(
+                """
+                INSERT OR REPLACE INTO scraped_pages
+                (canonical_url, status, article_text, etag, last_modified, reason, fetched_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(cache_key, status, article_text, etag, last_modified, reason, now, now + ttl_seconds) for cache_key in cache_keys]
+            )
+
+    def _cache_put_text(self, cache_keys: list, article_text: str, etag, last_modified):
+        self._cache_write(cache_keys, "ok", article_text, etag, last_modified, None, self.revalidate_after_seconds)
+
+    def _cache_put_negative(self, cache_keys: list, reason: str):
+        self._cache_write(cache_keys, "negative", None, None, None, reason, self.negative_ttl_seconds)
+
+    def _cache_refresh(self, cache_key: str):
+        """
+        Restart the freshness period of a revalidated page.
+
+        :param cache_key: canonical URL
+        """
+
+        if not self.connection:
+            return
+
+        now = time.time()
+
+        with self._cache_lock:
+            self.connection.execute(
+                "UPDATE scraped_pages SET fetched_at = ?, expires_at = ? WHERE canonical_url = ?",
+                (now, now + self.revalidate_after_seconds, cache_key)
+            )
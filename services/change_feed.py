@@ -0,0 +1,161 @@
+# This class reads the deal change journal and tracks consumer checkpoints
+
+import json
+import sqlite3
+from datetime import datetime
+
+
+class ChangeFeed:
+    """
+    Pull-based reader over the deal_changes journal.
+
+    Consumers read changes after their checkpoint, process them and then
+    commit the last sequence number they handled (at-least-once delivery).
+    Each pull costs O(changes) instead of a full table read.
+    """
+
+    def __init__(self, database_path: str):
+        """
+        Open connection to a migrated deals database.
+
+        :param database_path: SQLite database file path
+        """
+        self.database_path = database_path
+
+        self.connection = sqlite3.connect(database_path, isolation_level=None, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+
+    def _change_from_row(self, row) -> dict:
+        """
+        Convert journal row into change dictionary with decoded deal.
+
+        :param row: deal_changes row
+        :return: change dictionary
+        """
+
+        change = dict(row)
+        change["deal"] = json.loads(change.pop("payload") or "null")
+
+        return change
+
+    # -------------------- Reading --------------------
+
+    def latest_sequence(self) -> int:
+        """
+        Highest sequence number in the journal.
+
+        :return: sequence number (0 if empty)
+        """
+
+        return self.connection.execute("SELECT COALESCE(MAX(seq), 0) FROM deal_changes").fetchone()[0]
+
+    def changes_since(self, sequence: int, limit: int = 1000) -> list:
+        """
+        Read changes with seq greater than the given sequence.
+
+        :param sequence: last sequence already processed
+        :param limit: maximum changes returned
+        :return: list of change dictionaries in sequence order
+        """
+
+        rows = self.connection.execute("""
+            SELECT seq, operation, deal_id, source_url, changed_at, payload
+            FROM deal_changes
+            WHERE seq > ?
+            ORDER BY seq
+            LIMIT ?
+        """, (sequence, limit)).fetchall()
+
+        return [self._change_from_row(row) for row in rows]
+
+    def iter_changes_since(self, sequence: int, batch_size: int = 1000):
+        """
+        Stream all changes after sequence in batches.
+
+        :param sequence: last sequence already processed
+        :param batch_size: changes fetched per query
+        :return: generator of change dictionaries
+        """
+
+        while True:
+            changes = self.changes_since(sequence, limit=batch_size)
+
+            if not changes:
+                return
+
+            yield from changes
+
+            sequence = changes[-1]["seq"]
+
+    # -------------------- Checkpoints --------------------
+
+    def get_checkpoint(self, consumer: str) -> int:
+        """
+        Last sequence committed by consumer.
+
+        :param consumer: consumer name
+        :return: sequence number (0 for a new consumer)
+        """
+
+        row = self.connection.execute(
+            "SELECT seq FROM change_feed_checkpoints WHERE consumer = ?",
+            (consumer,)
+        ).fetchone()
+
+        return row[0] if row else 0
+
+    def commit_checkpoint(self, consumer: str, sequence: int):
+        """
+        Record that consumer processed everything up to sequence.
+        Checkpoints never move backwards.
+
+        :param consumer: consumer name
+        :param sequence: last processed sequence number
+        """
+
+        self.connection.execute("""
+            INSERT INTO change_feed_checkpoints (consumer, seq, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(consumer) DO UPDATE SET
+                seq = MAX(seq, excluded.seq),
+                updated_at = excluded.updated_at
+        """, (consumer, sequence, datetime.utcnow().isoformat()))
+
+    def poll(self, consumer: str, limit: int = 1000) -> list:
+        """
+        Read the next changes for consumer without committing.
+
+        :param consumer: consumer name
+        :param limit: maximum changes returned
+        :return: list of change dictionaries
+        """
+
+        return self.changes_since(self.get_checkpoint(consumer), limit=limit)
+
+    # -------------------- Retention --------------------
+
+    def prune_consumed(self) -> int:
+        """
+        Delete changes already processed by every registered consumer.
+
+        :return: number of journal rows deleted
+        """
+
+        minimum_checkpoint = self.connection.execute(
+            "SELECT MIN(seq) FROM change_feed_checkpoints"
+        ).fetchone()[0]
+
+        if minimum_checkpoint is None:
+            return 0
+
+        return self.connection.execute(
+            "DELETE FROM deal_changes WHERE seq <= ?",
+            (minimum_checkpoint,)
+        ).rowcount
+
+    def close(self):
+        """
+        Close connection.
+        """
+
+        self.connection.close()
@@ -1,22 +1,54 @@
-# This class saves structured deals into CSV file with deduplication
+# This class saves structured deals into size-rotated CSV segments with deduplication
 
 import csv
+import gzip
+import io
+import json
 import os
+import shutil
+
 from services.storage_base import StorageWriter
+from models.deal import coerce_deal
+from utils.url_index import UrlIndex
 
 
 class CSVStorageWriter(StorageWriter):
     """
     CSV-based storage implementation.
+
+    Rows are appended to the active segment only. A JSON manifest lists
+    every segment, and a sidecar URL index answers "already stored?"
+    without re-reading the CSV, so append cost stays constant as the
+    export grows.
+
+    Each batch is fsynced before its URLs are indexed, and the manifest
+    records how many bytes of the active segment are committed. Rows past
+    that point (a crash between the append and the index update) are
+    indexed on open, and a torn last row is cut off, so they are never
+    written twice.
+
+    Files for file_path="deals_database.csv":
+    - deals_database.csv, deals_database.00001.csv, ... (segments)
+    - deals_database.manifest.json (segment list)
+    - deals_database.urls.sqlite (URL index)
     """
 
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        compress_closed_segments: bool = False
+    ):
         """
-        Initialize CSV file path.
+        Initialize CSV segments, manifest and URL index.
 
-        :param file_path: Path where CSV will be stored
+        :param file_path: Path of the first CSV segment
+        :param max_segment_bytes: Active segment is closed once it reaches this size
+        :param compress_closed_segments: Gzip segments when they are closed
         """
         self.file_path = file_path
+        self.max_segment_bytes = max_segment_bytes
+        self.compress_closed_segments = compress_closed_segments
 
         # Fixed schema for CSV
         self.fieldnames = [
@@ -27,70 +59,343 @@ class CSVStorageWriter(StorageWriter):
             "deal_value",
             "currency",
             "deal_date",
-            "source_url"
+            "source_url",
+            "summary",
+            "deal_value_normalized",
+            "quantity_normalized",
+            "confidence",
+            "ingestion_timestamp"
         ]
 
-    def _get_existing_urls(self):
+        self.directory = os.path.dirname(os.path.abspath(file_path))
+        self.base_name, self.extension = os.path.splitext(os.path.basename(file_path))
+
+        self.manifest_path = os.path.join(self.directory, f"{self.base_name}.manifest.json")
+        self.index_path = os.path.join(self.directory, f"{self.base_name}.urls.sqlite")
+
+        self.manifest = self._load_manifest()
+
+        index_exists = os.path.exists(self.index_path)
+        self.url_index = UrlIndex(self.index_path)
+
+        # One-time backfill when upgrading an existing CSV export
+        if not index_exists:
+            self._rebuild_url_index()
+
+        self._recover_active_segment()
+
+    # -------------------- Manifest --------------------
+
+    def _load_manifest(self) -> dict:
+        """
+        Read the segment manifest, creating it from a legacy single CSV if needed.
+
+        :return: manifest dictionary
+        """
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, mode="r", encoding="utf-8") as manifest_file:
+                return json.load(manifest_file)
+
+        manifest = {"segments": []}
+
+        # Adopt a pre-existing single-file export as the first segment
+        if os.path.exists(self.file_path):
+            with open(self.file_path, mode="r", newline="", encoding="utf-8") as csv_file:
+                reader = csv.reader(csv_file)
+                header = next(reader, [])
+                row_count = sum(1 for _ in reader)
+
+            manifest["segments"].append({
+                "name": os.path.basename(self.file_path),
+                "fieldnames": header,
+                "rows": row_count,
+                "bytes": os.path.getsize(self.file_path),
+                "closed": False,
+                "compressed": False
+            })
+
+        self._write_manifest(manifest)
+
+        return manifest
+
+    def _write_manifest(self, manifest: dict):
+        """
+        Atomically replace the manifest file.
+
+        :param manifest: manifest dictionary
+        """
+
+        temporary_path = f"{self.manifest_path}.tmp"
+
+        with open(temporary_path, mode="w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+        os.replace(temporary_path, self.manifest_path)
+
+    def _segment_path(self, segment: dict) -> str:
+        """
+        Absolute path of a segment.
+
+        :param segment: manifest segment entry
+        :return: file path
+        """
+
+        return os.path.join(self.directory, segment["name"])
+
+    # -------------------- Segments --------------------
+
+    def _active_segment(self) -> dict:
+        """
+        Return the segment to append to, rotating when it is full
+        or was written with an older schema.
+
+        :return: manifest segment entry
+        """
+
+        segments = self.manifest["segments"]
+
+        if segments and not segments[-1]["closed"]:
+            active_segment = segments[-1]
+
+            segment_size = os.path.getsize(self._segment_path(active_segment))
+            schema_matches = active_segment["fieldnames"] == self.fieldnames
+
+            if schema_matches and segment_size < self.max_segment_bytes:
+                return active_segment
+
+            self._close_segment(active_segment)
+
+        return self._open_new_segment()
+
+    def _open_new_segment(self) -> dict:
+        """
+        Create a new segment file with header and register it.
+
+        :return: manifest segment entry
+        """
+
+        segment_number = len(self.manifest["segments"])
+
+        if segment_number == 0:
+            segment_name = f"{self.base_name}{self.extension}"
+        else:
+            segment_name = f"{self.base_name}.{segment_number:05d}{self.extension}"
+
+        segment = {
+            "name": segment_name,
+            "fieldnames": list(self.fieldnames),
+            "rows": 0,
+            "closed": False,
+            "compressed": False
+        }
+
+        with open(self._segment_path(segment), mode="w", newline="", encoding="utf-8") as csv_file:
+            csv.DictWriter(csv_file, fieldnames=self.fieldnames).writeheader()
+
+        segment["bytes"] = os.path.getsize(self._segment_path(segment))
+
+        self.manifest["segments"].append(segment)
+        self._write_manifest(self.manifest)
+
+        return segment
+
+    def _close_segment(self, segment: dict):
         """
-        Load already saved source URLs to prevent duplicates.
+        Mark segment as closed and optionally gzip it.
 
-        :return: Set of existing URLs
+        :param segment: manifest segment entry
         """
 
-        existing_urls = set()
+        if self.compress_closed_segments:
+            segment_path = self._segment_path(segment)
+            compressed_path = f"{segment_path}.gz"
 
-        # If CSV doesn't exist yet, nothing to load
-        if not os.path.exists(self.file_path):
-            return existing_urls
+            with open(segment_path, mode="rb") as source_file:
+                with gzip.open(compressed_path, mode="wb") as compressed_file:
+                    shutil.copyfileobj(source_file, compressed_file)
+
+            segment["name"] = os.path.basename(compressed_path)
+            segment["compressed"] = True
+
+            # Manifest must point at the .gz before the plain file disappears
+            segment["closed"] = True
+            self._write_manifest(self.manifest)
+
+            os.remove(segment_path)
+            return
+
+        segment["closed"] = True
+        self._write_manifest(self.manifest)
+
+    def _recover_active_segment(self):
+        """
+        Reconcile the active segment's uncommitted tail with the URL index.
+
+        Complete rows past the committed size are kept and indexed; a
+        partial last row is truncated. Manifests written before the
+        committed size was recorded are left as they are.
+        """
+
+        segments = self.manifest["segments"]
+
+        if not segments or segments[-1]["closed"] or "bytes" not in segments[-1]:
+            return
+
+        active_segment = segments[-1]
+        segment_path = self._segment_path(active_segment)
+        committed_bytes = active_segment["bytes"]
 
         try:
-            with open(self.file_path, mode="r", encoding="utf-8") as csv_file:
-                reader = csv.DictReader(csv_file)
+            if os.path.getsize(segment_path) <= committed_bytes:
+                return
+
+            with open(segment_path, mode="r+b") as csv_file:
+                csv_file.seek(committed_bytes)
+                tail = csv_file.read()
+
+                # csv writes records ending in \r\n; anything after the last one is torn
+                complete_length = tail.rfind(b"\r\n") + 2 if b"\r\n" in tail else 0
+
+                if complete_length < len(tail):
+                    csv_file.truncate(committed_bytes + complete_length)
+                    os.fsync(csv_file.fileno())
 
-                for row in reader:
-                    existing_urls.add(row.get("source_url"))
+            tail_rows = list(csv.DictReader(
+                io.StringIO(tail[:complete_length].decode("utf-8"), newline=""),
+                fieldnames=active_segment["fieldnames"]
+            ))
+
+            self.url_index.add_many(row.get("source_url") for row in tail_rows)
+
+            active_segment["rows"] += len(tail_rows)
+            active_segment["bytes"] = committed_bytes + complete_length
+            self._write_manifest(self.manifest)
+
+            print(f"Recovered {len(tail_rows)} uncommitted CSV rows in {active_segment['name']}")
+
+        except Exception as error:
+            print(f"Failed to recover CSV segment {active_segment['name']}: {error}")
+
+    # -------------------- URL index --------------------
+
+    def _rebuild_url_index(self):
+        """
+        Fill the URL index from every existing segment.
+        """
+
+        try:
+            self.url_index.add_many(
+                row.get("source_url") for row in self.iter_rows()
+            )
 
         except Exception as error:
-            print(f"Failed to read CSV file: {error}")
+            print(f"Failed to build CSV URL index: {error}")
 
-        return existing_urls
+    # -------------------- Public API --------------------
+
+    def iter_rows(self):
+        """
+        Stream rows from all segments in write order.
+
+        :return: Generator of row dictionaries
+        """
+
+        for segment in self.manifest["segments"]:
+            segment_path = self._segment_path(segment)
+
+            if segment["compressed"]:
+                csv_file = gzip.open(segment_path, mode="rt", newline="", encoding="utf-8")
+            else:
+                csv_file = open(segment_path, mode="r", newline="", encoding="utf-8")
+
+            with csv_file:
+                yield from csv.DictReader(csv_file)
 
     def save_structured_deals(self, structured_deals: list):
         """
-        Append structured deals into CSV file safely.
+        Append structured deals into the active CSV segment safely.
 
-        :param structured_deals: List of structured deal dictionaries
+        :param structured_deals: List of Deal records or deal dictionaries
+        :return: Dictionary with inserted and ignored row counts and failed_urls
         """
 
-        existing_urls = self._get_existing_urls()
+        deals = [coerce_deal(deal) for deal in structured_deals]
 
-        file_exists = os.path.exists(self.file_path)
+        inserted_urls = []
+        failed_urls = []
+        active_segment = None
 
         try:
-            with open(self.file_path, mode="a", newline="", encoding="utf-8") as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=self.fieldnames)
+            existing_urls = self.url_index.find_existing(deal.source_url for deal in deals)
+
+            active_segment = self._active_segment()
 
-                # Write header only when creating new file
-                if not file_exists:
-                    writer.writeheader()
+            with open(self._segment_path(active_segment), mode="a", newline="", encoding="utf-8") as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=self.fieldnames)
 
-                for deal in structured_deals:
-                    source_url = deal.get("source_url")
+                for deal in deals:
 
-                    # Skip duplicate entries
-                    if source_url in existing_urls:
+                    # Skip duplicate entries (stored earlier or earlier in this batch)
+                    if deal.source_url in existing_urls:
                         continue
 
-                    writer.writerow({
-                        "buyer": deal.get("buyer"),
-                        "seller": deal.get("seller"),
-                        "product": deal.get("product"),
-                        "quantity": deal.get("quantity"),
-                        "deal_value": deal.get("deal_value"),
-                        "currency": deal.get("currency"),
-                        "deal_date": deal.get("deal_date"),
-                        "source_url": source_url
-                    })
+                    writer.writerow(deal.to_row(self.fieldnames))
+
+                    existing_urls.add(deal.source_url)
+                    inserted_urls.append(deal.source_url)
+
+                # Index is updated only after rows are durably on disk
+                csv_file.flush()
+                os.fsync(csv_file.fileno())
+
+            self.url_index.add_many(inserted_urls)
 
         except Exception as error:
             print(f"Failed writing CSV: {error}")
+
+            # Rows are not confirmed until indexed, so the whole batch failed;
+            # drop whatever reached the segment so a retry does not duplicate it
+            if active_segment is not None and "bytes" in active_segment:
+                self._truncate_segment(active_segment)
+
+            inserted_urls = []
+            failed_urls = [deal.source_url for deal in deals]
+
+        else:
+            active_segment["rows"] += len(inserted_urls)
+            active_segment["bytes"] = os.path.getsize(self._segment_path(active_segment))
+
+            # Rows are indexed, so they count as stored; a stale manifest is
+            # reconciled from the segment tail on the next open
+            try:
+                self._write_manifest(self.manifest)
+            except Exception as error:
+                print(f"Failed writing CSV manifest: {error}")
+
+        return {
+            "inserted": len(inserted_urls),
+            "ignored": len(deals) - len(inserted_urls) - len(failed_urls),
+            "failed_urls": failed_urls
+        }
+
+    def _truncate_segment(self, segment: dict):
+        """
+        Cut a segment back to its committed size after a failed batch.
+
+        :param segment: manifest segment entry
+        """
+
+        try:
+            with open(self._segment_path(segment), mode="r+b") as csv_file:
+                csv_file.truncate(segment["bytes"])
+
+        except Exception as error:
+            print(f"Failed to truncate CSV segment {segment['name']}: {error}")
+
+    def close(self):
+        """
+        Close the URL index.
+        """
+
+        self.url_index.close()
@@ -0,0 +1,532 @@
+# This module holds the versioned SQLite schema for the deals database
+# The applied version is tracked in SQLite's built-in user_version header field
+
+from utils.confidence_scorer import ConfidenceScorer
+from utils.value_quantity_normalizer import ValueQuantityNormalizer
+from utils.product_categorizer import ProductCategorizer
+
+
+# Dimensions kept in deal_rollups, mapped to the deals column they group by
+ROLLUP_DIMENSIONS = {
+    "seller": "seller",
+    "buyer": "buyer",
+    "product_category": "product_category"
+}
+
+
+def _rollup_month_sql(row_alias: str) -> str:
+    """
+    SQL expression for the rollup month of a deal row.
+    Falls back to ingestion month when deal_date is not an ISO date.
+
+    :param row_alias: "new", "old" or a table name
+    :return: SQL expression
+    """
+
+    return (
+        f"COALESCE(strftime('%Y-%m', {row_alias}.deal_date), "
+        f"substr({row_alias}.ingestion_timestamp, 1, 7), 'unknown')"
+    )
+
+
+# -------------------- Helpers --------------------
+
+def _table_columns(connection, table_name: str) -> set:
+    """
+    Read column names of a table.
+
+    :param connection: sqlite3 connection
+    :param table_name: table to inspect
+    :return: set of column names
+    """
+
+    return {row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")}
+
+
+def _add_column_if_missing(connection, table_name: str, column_name: str, column_type: str):
+    """
+    Add a column unless a previous partial run already created it.
+
+    :param connection: sqlite3 connection
+    :param table_name: table to alter
+    :param column_name: new column name
+    :param column_type: SQLite column type
+    """
+
+    if column_name not in _table_columns(connection, table_name):
+        connection.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
+
+
+# -------------------- Migrations --------------------
+
+def _migration_001_base_schema(connection):
+    """
+    Original deals table and raw LLM output table.
+    """
+
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS deals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            buyer TEXT,
+            seller TEXT,
+            product TEXT,
+            quantity TEXT,
+            deal_value TEXT,
+            currency TEXT,
+            deal_date TEXT,
+            source_url TEXT UNIQUE
+        )
+    """)
+
+    # Raw LLM output per article, kept so deals can be
+    # re-derived without calling the model again
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS article_extractions (
+            source_url TEXT PRIMARY KEY,
+            article_title TEXT,
+            raw_llm_output TEXT,
+            model_name TEXT,
+            ingestion_timestamp TEXT
+        )
+    """)
+
+
+def _migration_002_typed_deal_columns(connection):
+    """
+    Add typed normalized columns and backfill them for existing rows.
+
+    Raw quantity and deal_value stay TEXT because they hold the
+    original wording (e.g. "€140 million"); the numeric forms live in
+    deal_value_normalized and quantity_normalized.
+    """
+
+    _add_column_if_missing(connection, "deals", "summary", "TEXT")
+    _add_column_if_missing(connection, "deals", "deal_value_normalized", "INTEGER")
+    _add_column_if_missing(connection, "deals", "quantity_normalized", "INTEGER")
+    _add_column_if_missing(connection, "deals", "confidence", "REAL")
+    _add_column_if_missing(connection, "deals", "ingestion_timestamp", "TEXT")
+
+    value_quantity_normalizer = ValueQuantityNormalizer()
+    confidence_scorer = ConfidenceScorer()
+
+    existing_rows = connection.execute("""
+        SELECT id, buyer, seller, product, quantity, deal_value, currency
+        FROM deals
+    """).fetchall()
+
+    backfill_rows = []
+
+    for deal_id, buyer, seller, product, quantity, deal_value, currency in existing_rows:
+        existing_deal = {
+            "buyer": buyer,
+            "seller": seller,
+            "product": product,
+            "quantity": quantity,
+            "deal_value": deal_value
+        }
+
+        backfill_rows.append((
+            value_quantity_normalizer.normalize_deal_value(deal_value, currency),
+            value_quantity_normalizer.normalize_quantity(quantity),
+            confidence_scorer.calculate_confidence(existing_deal),
+            deal_id
+        ))
+
+    connection.executemany("""
+        UPDATE deals
+        SET deal_value_normalized = ?, quantity_normalized = ?, confidence = ?
+        WHERE id = ?
+    """, backfill_rows)
+
+
+def _migration_003_deal_indexes(connection):
+    """
+    Indexes for analytical filters and "top deals by value" queries.
+    """
+
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_deals_seller ON deals (seller)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_deals_buyer ON deals (buyer)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_deals_deal_date ON deals (deal_date)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_deals_confidence ON deals (confidence)")
+
+    # Range on date then order by value, e.g. top deals this quarter
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS idx_deals_date_value
+        ON deals (deal_date, deal_value_normalized DESC)
+    """)
+
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS idx_deals_ingestion_value
+        ON deals (ingestion_timestamp, deal_value_normalized DESC)
+    """)
+
+
+def _migration_004_full_text_search(connection):
+    """
+    FTS5 index over deal fields and article text.
+
+    deals_fts rows share rowid with deals and are kept in sync by
+    triggers, so every writer (insert, upsert, delete) maintains it.
+    Article title and text come from article_extractions and are
+    attached whichever of the two rows is written first.
+    """
+
+    _add_column_if_missing(connection, "article_extractions", "article_text", "TEXT")
+
+    connection.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS deals_fts USING fts5(
+            buyer,
+            seller,
+            product,
+            summary,
+            article_title,
+            article_text,
+            tokenize = 'porter unicode61'
+        )
+    """)
+
+    # ---------------- Deal triggers ----------------
+
+    connection.execute("""
+        CREATE TRIGGER IF NOT EXISTS deals_fts_after_insert AFTER INSERT ON deals
+        BEGIN
+            INSERT INTO deals_fts (rowid, buyer, seller, product, summary, article_title, article_text)
+            SELECT new.id, new.buyer, new.seller, new.product, new.summary,
+                   (SELECT article_title FROM article_extractions WHERE source_url = new.source_url),
+                   (SELECT article_text FROM article_extractions WHERE source_url = new.source_url);
+        END
+    """)
+
+    connection.execute("""
+        CREATE TRIGGER IF NOT EXISTS deals_fts_after_update
+        AFTER UPDATE OF buyer, seller, product, summary, source_url ON deals
+        BEGIN
+            DELETE FROM deals_fts WHERE rowid = old.id;
+            INSERT INTO deals_fts (rowid, buyer, seller, product, summary, article_title, article_text)
+            SELECT new.id, new.buyer, new.seller, new.product, new.summary,
+                   (SELECT article_title FROM article_extractions WHERE source_url = new.source_url),
+                   (SELECT article_text FROM article_extractions WHERE source_url = new.source_url);
+        END
+    """)
+
+    connection.execute("""
+        CREATE TRIGGER IF NOT EXISTS deals_fts_after_delete AFTER DELETE ON deals
+        BEGIN
+            DELETE FROM deals_fts WHERE rowid = old.id;
+        END
+    """)
+
+    # ---------------- Article triggers ----------------
+
+    for trigger_event in ("INSERT", "UPDATE"):
+        connection.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS deals_fts_article_after_{trigger_event.lower()}
+            AFTER {trigger_event} ON article_extractions
+            BEGIN
+                UPDATE deals_fts
+                SET article_title = new.article_title, article_text = new.article_text
+                WHERE rowid IN (SELECT id FROM deals WHERE source_url = new.source_url);
+            END
+        """)
+
+    # ---------------- Backfill ----------------
+
+    connection.execute("DELETE FROM deals_fts")
+
+    connection.execute("""
+        INSERT INTO deals_fts (rowid, buyer, seller, product, summary, article_title, article_text)
+        SELECT deals.id, deals.buyer, deals.seller, deals.product, deals.summary,
+               article_extractions.article_title, article_extractions.article_text
+        FROM deals
+        LEFT JOIN article_extractions ON article_extractions.source_url = deals.source_url
+    """)
+
+
+def rebuild_rollups(connection):
+    """
+    Recompute deal_rollups from scratch.
+    Must run inside a transaction.
+
+    :param connection: sqlite3 connection
+    """
+
+    connection.execute("DELETE FROM deal_rollups")
+
+    for dimension, column_name in ROLLUP_DIMENSIONS.items():
+        connection.execute(f"""
+            INSERT INTO deal_rollups (
+                dimension, dimension_value, month, deal_count, total_value, valued_deal_count
+            )
+            SELECT
+                '{dimension}',
+                COALESCE(deals.{column_name}, ''),
+                {_rollup_month_sql("deals")},
+                COUNT(*),
+                COALESCE(SUM(deals.deal_value_normalized), 0),
+                COUNT(deals.deal_value_normalized)
+            FROM deals
+            GROUP BY 2, 3
+        """)
+
+
+def _migration_005_rollups(connection):
+    """
+    Rollup table of deal counts and values per seller, buyer and
+    product category per month, maintained by triggers in the same
+    transaction as each deals write.
+    """
+
+    _add_column_if_missing(connection, "deals", "product_category", "TEXT")
+
+    product_categorizer = ProductCategorizer()
+
+    connection.executemany(
+        "UPDATE deals SET product_category = ? WHERE id = ?",
+        [
+            (product_categorizer.categorize(product), deal_id)
+            for deal_id, product in connection.execute("SELECT id, product FROM deals").fetchall()
+        ]
+    )
+
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS deal_rollups (
+            dimension TEXT NOT NULL,
+            dimension_value TEXT NOT NULL,
+            month TEXT NOT NULL,
+            deal_count INTEGER NOT NULL,
+            total_value INTEGER NOT NULL,
+            valued_deal_count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, month, dimension_value)
+        ) WITHOUT ROWID
+    """)
+
+    # ---------------- Trigger bodies ----------------
+
+    add_statements = []
+    remove_statements = []
+
+    for dimension, column_name in ROLLUP_DIMENSIONS.items():
+        add_statements.append(f"""
+            INSERT INTO deal_rollups (
+                dimension, dimension_value, month, deal_count, total_value, valued_deal_count
+            )
+            VALUES (
+                '{dimension}',
+                COALESCE(new.{column_name}, ''),
+                {_rollup_month_sql("new")},
+                1,
+                COALESCE(new.deal_value_normalized, 0),
+                new.deal_value_normalized IS NOT NULL
+            )
+            ON CONFLICT (dimension, month, dimension_value) DO UPDATE SET
+                deal_count = deal_count + 1,
+                total_value = total_value + excluded.total_value,
+                valued_deal_count = valued_deal_count + excluded.valued_deal_count;
+        """)
+
+        rollup_key_sql = (
+            f"dimension = '{dimension}' "
+            f"AND month = {_rollup_month_sql('old')} "
+            f"AND dimension_value = COALESCE(old.{column_name}, '')"
+        )
+
+        remove_statements.append(f"""
+            UPDATE deal_rollups SET
+                deal_count = deal_count - 1,
+                total_value = total_value - COALESCE(old.deal_value_normalized, 0),
+                valued_deal_count = valued_deal_count - (old.deal_value_normalized IS NOT NULL)
+            WHERE {rollup_key_sql};
+
+            DELETE FROM deal_rollups WHERE {rollup_key_sql} AND deal_count <= 0;
+        """)
+
+    add_sql = "".join(add_statements)
+    remove_sql = "".join(remove_statements)
+
+    connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS deal_rollups_after_insert AFTER INSERT ON deals
+        BEGIN
+            {add_sql}
+        END
+    """)
+
+    connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS deal_rollups_after_delete AFTER DELETE ON deals
+        BEGIN
+            {remove_sql}
+        END
+    """)
+
+    connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS deal_rollups_after_update
+        AFTER UPDATE OF seller, buyer, product_category, deal_value_normalized,
+                        deal_date, ingestion_timestamp ON deals
+        BEGIN
+            {remove_sql}
+            {add_sql}
+        END
+    """)
+
+    rebuild_rollups(connection)
+
+
+def _migration_006_article_content_hash(connection):
+    """
+    Link extractions to the article archive by content hash.
+    """
+
+    _add_column_if_missing(connection, "article_extractions", "content_hash", "TEXT")
+
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS idx_article_extractions_content_hash
+        ON article_extractions (content_hash)
+    """)
+
+
+def _deal_json_sql(row_alias: str) -> str:
+    """
+    SQL expression serializing a deals row as JSON.
+
+    :param row_alias: "new" or "old"
+    :return: SQL expression
+    """
+
+    deal_columns = [
+        "id", "buyer", "seller", "product", "product_category", "quantity",
+        "deal_value", "currency", "deal_date", "summary", "deal_value_normalized",
+        "quantity_normalized", "confidence", "source_url", "ingestion_timestamp"
+    ]
+
+    return "json_object(" + ", ".join(
+        f"'{column_name}', {row_alias}.{column_name}" for column_name in deal_columns
+    ) + ")"
+
+
+def _migration_007_change_feed(connection):
+    """
+    Append-only journal of every insert, update and delete on deals,
+    plus per-consumer checkpoints.
+
+    AUTOINCREMENT keeps sequence numbers strictly increasing and never
+    reused, and SQLite's single writer makes them commit in order.
+    """
+
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS deal_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            operation TEXT NOT NULL,
+            deal_id INTEGER NOT NULL,
+            source_url TEXT,
+            changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+            payload TEXT
+        )
+    """)
+
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS change_feed_checkpoints (
+            consumer TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+
+    for operation, trigger_event, row_alias in (
+        ("insert", "INSERT", "new"),
+        ("update", "UPDATE", "new"),
+        ("delete", "DELETE", "old")
+    ):
+        connection.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS deal_changes_after_{operation}
+            AFTER {trigger_event} ON deals
+            BEGIN
+                INSERT INTO deal_changes (operation, deal_id, source_url, payload)
+                VALUES (
+                    '{operation}',
+                    {row_alias}.id,
+                    {row_alias}.source_url,
+                    {_deal_json_sql(row_alias)}
+                );
+            END
+        """)
+
+    # Existing deals become the first entries so consumers can start at 0
+    connection.execute(f"""
+        INSERT INTO deal_changes (operation, deal_id, source_url, payload)
+        SELECT 'insert', deals.id, deals.source_url, {_deal_json_sql("deals")}
+        FROM deals
+        ORDER BY deals.id
+    """)
+
+
+# Ordered list of (version, description, migration function)
+MIGRATIONS = [
+    (1, "base schema", _migration_001_base_schema),
+    (2, "typed normalized deal columns", _migration_002_typed_deal_columns),
+    (3, "deal indexes", _migration_003_deal_indexes),
+    (4, "full-text search", _migration_004_full_text_search),
+    (5, "deal rollups", _migration_005_rollups),
+    (6, "article content hash", _migration_006_article_content_hash),
+    (7, "deal change feed", _migration_007_change_feed),
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# -------------------- Runner --------------------
+
+def get_schema_version(connection) -> int:
+    """
+    Read applied schema version.
+
+    :param connection: sqlite3 connection
+    :return: schema version (0 for a fresh or pre-migration database)
+    """
+
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(connection) -> int:
+    """
+    Apply every pending migration, each in its own transaction.
+
+    The connection must be in autocommit mode (isolation_level=None).
+    A failed migration is rolled back and stops the run, leaving the
+    database at the last successful version.
+
+    :param connection: sqlite3 connection
+    :return: schema version after migrating
+    """
+
+    current_version = get_schema_version(connection)
+
+    for version, description, migration in MIGRATIONS:
+        if version <= current_version:
+            continue
+
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+
+            # Another process may have migrated while we waited for the lock
+            if get_schema_version(connection) >= version:
+                connection.execute("COMMIT")
+                current_version = version
+                continue
+
+            migration(connection)
+
+            # user_version is part of the database header and is
+            # committed atomically with the migration itself
+            connection.execute(f"PRAGMA user_version = {version}")
+            connection.execute("COMMIT")
+
+            print(f"Applied database migration {version}: {description}")
+            current_version = version
+
+        except Exception as error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+
+            print(f"Database migration {version} failed: {error}")
+            break
+
+    return current_version
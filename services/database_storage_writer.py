@@ -2,96 +2,497 @@
 # SQLite is built-in in Python and requires no external server
 
 import sqlite3
+import threading
+from itertools import islice
+
 from services.storage_base import StorageWriter
+from services.database_migrations import apply_migrations
+from models.deal import coerce_deal
+from utils.product_categorizer import ProductCategorizer
+
+
+# Position of source_url in the parameter tuples built by _deal_rows()
+DEAL_SOURCE_URL_INDEX = 11
+
+INSERT_DEAL_SQL = """
+    INSERT OR IGNORE INTO deals (
+        buyer,
+        seller,
+        product,
+        quantity,
+        deal_value,
+        currency,
+        deal_date,
+        summary,
+        deal_value_normalized,
+        quantity_normalized,
+        confidence,
+        source_url,
+        ingestion_timestamp,
+        product_category
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_DEAL_SQL = """
+    INSERT INTO deals (
+        buyer,
+        seller,
+        product,
+        quantity,
+        deal_value,
+        currency,
+        deal_date,
+        summary,
+        deal_value_normalized,
+        quantity_normalized,
+        confidence,
+        source_url,
+        ingestion_timestamp,
+        product_category
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(source_url) DO UPDATE SET
+        buyer = excluded.buyer,
+        seller = excluded.seller,
+        product = excluded.product,
+        quantity = excluded.quantity,
+        deal_value = excluded.deal_value,
+        currency = excluded.currency,
+        deal_date = excluded.deal_date,
+        summary = excluded.summary,
+        deal_value_normalized = excluded.deal_value_normalized,
+        quantity_normalized = excluded.quantity_normalized,
+        confidence = excluded.confidence,
+        ingestion_timestamp = excluded.ingestion_timestamp,
+        product_category = excluded.product_category
+    WHERE deals.buyer IS NOT excluded.buyer
+        OR deals.seller IS NOT excluded.seller
+        OR deals.product IS NOT excluded.product
+        OR deals.quantity IS NOT excluded.quantity
+        OR deals.deal_value IS NOT excluded.deal_value
+        OR deals.currency IS NOT excluded.currency
+        OR deals.deal_date IS NOT excluded.deal_date
+        OR deals.summary IS NOT excluded.summary
+        OR deals.deal_value_normalized IS NOT excluded.deal_value_normalized
+        OR deals.quantity_normalized IS NOT excluded.quantity_normalized
+        OR deals.confidence IS NOT excluded.confidence
+        OR deals.ingestion_timestamp IS NOT excluded.ingestion_timestamp
+        OR deals.product_category IS NOT excluded.product_category
+"""
+
+UPSERT_RAW_LLM_OUTPUT_SQL = """
+    INSERT INTO article_extractions (
+        source_url,
+        article_title,
+        raw_llm_output,
+        model_name,
+        ingestion_timestamp,
+        article_text,
+        content_hash
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(source_url) DO UPDATE SET
+        article_title = excluded.article_title,
+        raw_llm_output = excluded.raw_llm_output,
+        model_name = excluded.model_name,
+        ingestion_timestamp = excluded.ingestion_timestamp,
+        article_text = excluded.article_text,
+        content_hash = excluded.content_hash
+"""
 
 
 class DatabaseStorageWriter(StorageWriter):
     """
     SQLite based storage implementation.
+
+    Keeps one persistent WAL-mode connection and writes rows with
+    executemany inside explicit transactions of batch_size rows.
     """
 
-    def __init__(self, database_path: str):
+    def __init__(
+        self,
+        database_path: str,
+        batch_size: int = 5000,
+        synchronous: str = "NORMAL",
+        cache_size_kib: int = 65536
+    ):
         """
-        Initialize database and ensure table exists.
+        Open database connection and migrate schema to the latest version.
 
         :param database_path: SQLite database file path
+        :param batch_size: Rows written per transaction
+        :param synchronous: SQLite synchronous pragma (OFF, NORMAL, FULL)
+        :param cache_size_kib: Page cache size in KiB
         """
         self.database_path = database_path
+        self.batch_size = batch_size
+        self.synchronous = synchronous
+        self.cache_size_kib = cache_size_kib
+
+        # Category is stored per deal and keys the rollup tables
+        self.product_categorizer = ProductCategorizer()
 
-        # Create table if it does not already exist
+        # Writers may be driven from a background thread, so the
+        # connection is shared and guarded by a lock
+        self._lock = threading.Lock()
+        self.connection = self._connect()
+
+        # Create or migrate tables
         self._initialize_database()
 
+    def _connect(self):
+        """
+        Open a tuned connection in autocommit mode.
+        Transactions are started explicitly with BEGIN.
+
+        :return: sqlite3 connection
+        """
+
+        connection = sqlite3.connect(
+            self.database_path,
+            isolation_level=None,
+            check_same_thread=False,
+            timeout=30
+        )
+
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute(f"PRAGMA synchronous = {self.synchronous}")
+        connection.execute(f"PRAGMA cache_size = {-int(self.cache_size_kib)}")
+        connection.execute("PRAGMA temp_store = MEMORY")
+
+        return connection
+
     def _initialize_database(self):
         """
-        Create deals table for storing structured records.
+        Bring the schema up to the latest version.
+        Existing databases are migrated in place.
         """
 
         try:
-            connection = sqlite3.connect(self.database_path)
-            cursor = connection.cursor()
-
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS deals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    buyer TEXT,
-                    seller TEXT,
-                    product TEXT,
-                    quantity TEXT,
-                    deal_value TEXT,
-                    currency TEXT,
-                    deal_date TEXT,
-                    source_url TEXT UNIQUE
-                )
-            """)
-
-            connection.commit()
-            connection.close()
+            with self._lock:
+                apply_migrations(self.connection)
 
         except Exception as error:
+            self._rollback()
             print(f"Database initialization failed: {error}")
 
+    # -------------------- Batched writes --------------------
+
+    def _execute_in_batches(self, sql: str, rows, label: str, failed_rows: list = None) -> int:
+        """
+        Run executemany in explicit transactions of batch_size rows.
+
+        If a batch fails, it is rolled back and retried row by row so one
+        bad record does not drop the rest of the batch.
+
+        :param sql: parameterized statement
+        :param rows: iterable of parameter tuples
+        :param label: name used in error messages
+        :param failed_rows: optional list receiving rows that could not be written
+        :return: number of rows changed
+        """
+
+        rows_iterator = iter(rows)
+        changed_rows = 0
+
+        with self._lock:
+            while True:
+                batch_rows = list(islice(rows_iterator, self.batch_size))
+
+                if not batch_rows:
+                    break
+
+                try:
+                    self.connection.execute("BEGIN")
+
+                    # rowcount excludes changes made by triggers (FTS, rollups)
+                    cursor = self.connection.executemany(sql, batch_rows)
+                    self.connection.execute("COMMIT")
+
+                    changed_rows += cursor.rowcount
+
+                except Exception as batch_error:
+                    self._rollback()
+                    print(f"Batch {label} failed, retrying row by row: {batch_error}")
+
+                    changed_rows += self._execute_rows_individually(sql, batch_rows, label, failed_rows)
+
+        return changed_rows
+
+    def _execute_rows_individually(self, sql: str, batch_rows: list, label: str, failed_rows: list = None) -> int:
+        """
+        Fallback path: write rows one at a time inside one transaction.
+
+        :param sql: parameterized statement
+        :param batch_rows: list of parameter tuples
+        :param label: name used in error messages
+        :param failed_rows: optional list receiving rows that could not be written
+        :return: number of rows changed
+        """
+
+        changed_rows = 0
+        batch_failed_rows = []
+
+        try:
+            self.connection.execute("BEGIN")
+
+            for row in batch_rows:
+                try:
+                    changed_rows += self.connection.execute(sql, row).rowcount
+                except Exception as row_error:
+                    batch_failed_rows.append(row)
+                    print(f"Failed {label}: {row_error}")
+
+            self.connection.execute("COMMIT")
+
+        except Exception as error:
+            self._rollback()
+            print(f"Database write failed: {error}")
+
+            # Nothing from this batch was committed
+            changed_rows = 0
+            batch_failed_rows = list(batch_rows)
+
+        if failed_rows is not None:
+            failed_rows.extend(batch_failed_rows)
+
+        return changed_rows
+
+    def _rollback(self):
+        """
+        Roll back the open transaction, if any.
+        """
+
+        if self.connection.in_transaction:
+            self.connection.execute("ROLLBACK")
+
+    # -------------------- Deals --------------------
+
+    def _deal_rows(self, structured_deals: list):
+        """
+        Convert deals into parameter tuples for deal statements.
+
+        :param structured_deals: List of Deal records or deal dictionaries
+        :return: generator of tuples
+        """
+
+        for deal in structured_deals:
+            deal = coerce_deal(deal)
+
+            yield (
+                deal.buyer,
+                deal.seller,
+                deal.product,
+                deal.quantity,
+                deal.deal_value,
+                deal.currency,
+                deal.deal_date,
+                deal.summary,
+                deal.deal_value_normalized,
+                deal.quantity_normalized,
+                deal.confidence,
+                deal.source_url,
+                deal.ingestion_timestamp,
+                self.product_categorizer.categorize(deal.product)
+            )
+
     def save_structured_deals(self, structured_deals: list):
         """
         Insert structured deals into SQLite database.
         Duplicate entries are avoided using UNIQUE constraint on source_url.
 
-        :param structured_deals: List of structured deal dictionaries
+        :param structured_deals: List of Deal records or deal dictionaries
+        :return: Dictionary with inserted and ignored row counts and failed_urls
         """
 
+        failed_rows = []
+
+        inserted_rows = self._execute_in_batches(
+            INSERT_DEAL_SQL,
+            self._deal_rows(structured_deals),
+            "inserting deal",
+            failed_rows
+        )
+
+        return {
+            "inserted": inserted_rows,
+            "ignored": len(structured_deals) - inserted_rows - len(failed_rows),
+            "failed_urls": [row[DEAL_SOURCE_URL_INDEX] for row in failed_rows]
+        }
+
+    def upsert_structured_deals(self, structured_deals: list):
+        """
+        Insert structured deals, replacing fields of rows that already
+        exist for the same source_url (used when re-processing).
+        Rows whose fields are unchanged are left untouched, so they do
+        not produce change feed entries.
+
+        :param structured_deals: List of Deal records or deal dictionaries
+        :return: Dictionary with inserted-or-changed row count and failed_urls
+        """
+
+        failed_rows = []
+
+        upserted_rows = self._execute_in_batches(
+            UPSERT_DEAL_SQL,
+            self._deal_rows(structured_deals),
+            "upserting deal",
+            failed_rows
+        )
+
+        return {
+            "upserted": upserted_rows,
+            "failed_urls": [row[DEAL_SOURCE_URL_INDEX] for row in failed_rows]
+        }
+
+    def delete_deals_by_source_url(self, source_urls: list):
+        """
+        Delete deals by source_url (triggers keep search, rollups and
+        the change feed in sync).
+
+        :param source_urls: source URLs of deals to remove
+        :return: Dictionary with deleted row count
+        """
+
+        deleted_rows = self._execute_in_batches(
+            "DELETE FROM deals WHERE source_url = ?",
+            ((source_url,) for source_url in source_urls),
+            "deleting deal"
+        )
+
+        return {"deleted": deleted_rows}
+
+    # -------------------- Raw LLM outputs --------------------
+
+    def save_raw_llm_outputs(self, raw_llm_outputs: list):
+        """
+        Store raw LLM output and article text per article. The latest
+        output for a source_url replaces the previous one.
+
+        :param raw_llm_outputs: List of dictionaries with keys
+            source_url, article_title, raw_llm_output, model_name,
+            ingestion_timestamp, article_text, content_hash
+        :return: Dictionary with saved row count
+        """
+
+        raw_output_rows = (
+            (
+                raw_output.get("source_url"),
+                raw_output.get("article_title"),
+                raw_output.get("raw_llm_output"),
+                raw_output.get("model_name"),
+                raw_output.get("ingestion_timestamp"),
+                raw_output.get("article_text"),
+                raw_output.get("content_hash")
+            )
+            for raw_output in raw_llm_outputs
+        )
+
+        saved_rows = self._execute_in_batches(
+            UPSERT_RAW_LLM_OUTPUT_SQL,
+            raw_output_rows,
+            "inserting raw LLM output"
+        )
+
+        return {"saved": saved_rows}
+
+    def find_extracted_urls(self, source_urls: list) -> set:
+        """
+        Return the subset of source URLs that already have stored LLM output.
+
+        :param source_urls: candidate source URLs
+        :return: set of URLs already extracted
+        """
+
+        source_urls = [source_url for source_url in source_urls if source_url]
+        extracted_urls = set()
+
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(source_urls), 500):
+            chunk = source_urls[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+
+            with self._lock:
+                rows = self.connection.execute(
+                    f"SELECT source_url FROM article_extractions WHERE source_url IN ({placeholders})",
+                    chunk
+                ).fetchall()
+
+            extracted_urls.update(row[0] for row in rows)
+
+        return extracted_urls
+
+    def find_stored_deal_urls(self, source_urls: list) -> set:
+        """
+        Return the subset of source URLs that have a stored deal.
+
+        :param source_urls: candidate source URLs
+        :return: set of URLs present in the deals table
+        """
+
+        source_urls = [source_url for source_url in source_urls if source_url]
+        stored_urls = set()
+
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(source_urls), 500):
+            chunk = source_urls[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+
+            with self._lock:
+                rows = self.connection.execute(
+                    f"SELECT source_url FROM deals WHERE source_url IN ({placeholders})",
+                    chunk
+                ).fetchall()
+
+            stored_urls.update(row[0] for row in rows)
+
+        return stored_urls
+
+    def iter_raw_llm_outputs(self, batch_size: int = 1000):
+        """
+        Stream stored raw LLM outputs in batches.
+
+        Uses its own read connection: in WAL mode the stream does not
+        block writes made through the persistent connection meanwhile.
+
+        :param batch_size: Rows fetched per batch
+        :return: Generator of lists of dictionaries
+        """
+
+        connection = sqlite3.connect(self.database_path)
+        connection.row_factory = sqlite3.Row
+
         try:
-            connection = sqlite3.connect(self.database_path)
-            cursor = connection.cursor()
+            cursor = connection.execute("""
+                SELECT source_url, article_title, raw_llm_output, model_name, ingestion_timestamp, content_hash
+                FROM article_extractions
+                ORDER BY source_url
+            """)
 
-            for deal in structured_deals:
-                try:
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO deals (
-                            buyer,
-                            seller,
-                            product,
-                            quantity,
-                            deal_value,
-                            currency,
-                            deal_date,
-                            source_url
-                        )
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        deal.get("buyer"),
-                        deal.get("seller"),
-                        deal.get("product"),
-                        deal.get("quantity"),
-                        deal.get("deal_value"),
-                        deal.get("currency"),
-                        deal.get("deal_date"),
-                        deal.get("source_url")
-                    ))
-
-                except Exception as insert_error:
-                    print(f"Failed inserting deal: {insert_error}")
-
-            connection.commit()
+            while True:
+                rows = cursor.fetchmany(batch_size)
+
+                if not rows:
+                    break
+
+                yield [dict(row) for row in rows]
+
+        finally:
             connection.close()
 
-        except Exception as error:
-            print(f"Database write failed: {error}")
+    # -------------------- Lifecycle --------------------
+
+    def close(self):
+        """
+        Close the persistent connection.
+        """
+
+        with self._lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
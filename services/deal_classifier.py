@@ -1,5 +1,7 @@
 # This class evaluates how likely an article represents a real deal or contract
 
+from utils.metrics import metrics_registry
+
 
 class DealClassifier:
     """
@@ -52,6 +54,8 @@ class DealClassifier:
         # Determine if article is considered a deal
         is_deal = total_score >= self.score_threshold
 
+        metrics_registry.increment("classifier_articles_total", result="deal" if is_deal else "not_deal")
+
         return is_deal, total_score
 
     def filter_deal_articles(self, articles: list):
@@ -0,0 +1,153 @@
+# This class reads and rebuilds the incrementally maintained deal rollup table
+
+import argparse
+import sqlite3
+
+from services.database_migrations import ROLLUP_DIMENSIONS, rebuild_rollups
+
+
+class DealRollups:
+    """
+    Dashboard queries over deal_rollups.
+
+    Rollups are keyed by (dimension, month, dimension_value) and kept up
+    to date by triggers on the deals table, so reads cost O(groups)
+    instead of O(deals).
+    """
+
+    ORDER_COLUMNS = ("total_value", "deal_count", "valued_deal_count")
+
+    def __init__(self, database_path: str):
+        """
+        Open connection to a migrated deals database.
+
+        :param database_path: SQLite database file path
+        """
+        self.database_path = database_path
+
+        self.connection = sqlite3.connect(database_path, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+
+    def query(
+        self,
+        dimension: str,
+        start_month: str = None,
+        end_month: str = None,
+        by_month: bool = False,
+        order_by: str = "total_value",
+        limit: int = None
+    ) -> list:
+        """
+        Aggregate rollups for a dimension over a month range.
+
+        Examples:
+        total value by seller per month -> query("seller", by_month=True)
+        top product categories this quarter -> query("product_category", "2026-07", "2026-09", limit=10)
+
+        :param dimension: "seller", "buyer" or "product_category"
+        :param start_month: first month included (YYYY-MM)
+        :param end_month: last month included (YYYY-MM)
+        :param by_month: keep one row per month instead of summing the range
+        :param order_by: "total_value", "deal_count" or "valued_deal_count"
+        :param limit: maximum rows returned
+        :return: list of result dictionaries
+        """
+
+        if dimension not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown rollup dimension: {dimension}")
+
+        if order_by not in self.ORDER_COLUMNS:
+            raise ValueError(f"Unknown rollup order: {order_by}")
+
+        conditions = ["dimension = ?"]
+        parameters = [dimension]
+
+        if start_month:
+            conditions.append("month >= ?")
+            parameters.append(start_month)
+
+        if end_month:
+            conditions.append("month <= ?")
+            parameters.append(end_month)
+
+        month_column = "month, " if by_month else ""
+        ordering = f"month, {order_by} DESC" if by_month else f"{order_by} DESC"
+
+        limit_sql = ""
+        if limit:
+            limit_sql = "LIMIT ?"
+            parameters.append(limit)
+
+        rows = self.connection.execute(f"""
+            SELECT
+                {month_column}
+                dimension_value,
+                SUM(deal_count) AS deal_count,
+                SUM(total_value) AS total_value,
+                SUM(valued_deal_count) AS valued_deal_count
+            FROM deal_rollups
+            WHERE {" AND ".join(conditions)}
+            GROUP BY {month_column} dimension_value
+            ORDER BY {ordering}
+            {limit_sql}
+        """, parameters).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def rebuild(self):
+        """
+        Recompute all rollups from the deals table in one transaction.
+        """
+
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+            rebuild_rollups(self.connection)
+            self.connection.execute("COMMIT")
+
+        except Exception as error:
+            if self.connection.in_transaction:
+                self.connection.execute("ROLLBACK")
+
+            print(f"Rollup rebuild failed: {error}")
+
+    def close(self):
+        """
+        Close connection.
+        """
+
+        self.connection.close()
+
+
+# -------------------- Entry Point --------------------
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Rebuild or query deal rollups."
+    )
+
+    argument_parser.add_argument("command", choices=["rebuild", "top"])
+    argument_parser.add_argument("--database", default="deals_database.db")
+    argument_parser.add_argument("--dimension", default="seller", choices=sorted(ROLLUP_DIMENSIONS))
+    argument_parser.add_argument("--start-month", default=None)
+    argument_parser.add_argument("--end-month", default=None)
+    argument_parser.add_argument("--order-by", default="total_value", choices=DealRollups.ORDER_COLUMNS)
+    argument_parser.add_argument("--limit", type=int, default=20)
+
+    arguments = argument_parser.parse_args()
+
+    deal_rollups = DealRollups(arguments.database)
+
+    if arguments.command == "rebuild":
+        deal_rollups.rebuild()
+        print("Rollups rebuilt.")
+    else:
+        for rollup_row in deal_rollups.query(
+            dimension=arguments.dimension,
+            start_month=arguments.start_month,
+            end_month=arguments.end_month,
+            order_by=arguments.order_by,
+            limit=arguments.limit
+        ):
+            print(rollup_row)
+
+    deal_rollups.close()
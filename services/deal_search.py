@@ -0,0 +1,143 @@
+# This class runs ranked full-text search over stored deals (SQLite FTS5)
+
+import re
+import sqlite3
+
+
+class DealSearch:
+    """
+    BM25-ranked search over deal fields, summaries and article text.
+
+    Queries use FTS5 syntax, e.g. "counter-drone AND Poland",
+    "seller:Kongsberg", "radar NOT naval" or "\"air defence\"".
+    """
+
+    # Column weights for bm25(): buyer, seller, product, summary, title, text
+    COLUMN_WEIGHTS = (3.0, 3.0, 2.0, 1.5, 1.5, 1.0)
+
+    # Operators and grouping understood by FTS5 that must not be quoted
+    QUERY_OPERATORS = {"AND", "OR", "NOT", "NEAR"}
+
+    def __init__(self, database_path: str):
+        """
+        Open read connection to the deals database.
+
+        :param database_path: SQLite database file path (migrated by DatabaseStorageWriter)
+        """
+        self.database_path = database_path
+
+        self.connection = sqlite3.connect(database_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+
+    def _prepare_query(self, query_text: str) -> str:
+        """
+        Quote terms containing punctuation so FTS5 treats them as phrases.
+
+        "counter-drone AND Poland" -> "\"counter-drone\" AND Poland"
+
+        :param query_text: user query
+        :return: FTS5 MATCH expression
+        """
+
+        prepared_terms = []
+
+        # Keep quoted phrases intact, split everything else on whitespace
+        for quoted_phrase, bare_term in re.findall(r'("[^"]*")|(\S+)', query_text):
+            if quoted_phrase:
+                prepared_terms.append(quoted_phrase)
+                continue
+
+            leading = re.match(r"^\(*", bare_term).group()
+            trailing = re.search(r"\)*$", bare_term).group()
+            core_term = bare_term[len(leading):len(bare_term) - len(trailing)]
+
+            is_plain = re.fullmatch(r"(\w+:)?\w+\*?", core_term) is not None
+
+            if core_term in self.QUERY_OPERATORS or is_plain or not core_term:
+                prepared_terms.append(bare_term)
+            else:
+                prepared_terms.append(f'{leading}"{core_term}"{trailing}')
+
+        return " ".join(prepared_terms)
+
+    def search(
+        self,
+        query_text: str,
+        limit: int = 20,
+        offset: int = 0,
+        highlight_start: str = "[",
+        highlight_end: str = "]",
+        snippet_tokens: int = 16
+    ) -> list:
+        """
+        Search deals, best matches first.
+
+        :param query_text: FTS5 query
+        :param limit: maximum results
+        :param offset: results to skip (paging)
+        :param highlight_start: marker inserted before matched terms
+        :param highlight_end: marker inserted after matched terms
+        :param snippet_tokens: approximate snippet length in tokens
+        :return: list of result dictionaries with deal fields, score and snippet
+        """
+
+        weights = ", ".join(str(weight) for weight in self.COLUMN_WEIGHTS)
+
+        try:
+            rows = self.connection.execute(f"""
+                SELECT
+                    deals.id,
+                    deals.buyer,
+                    deals.seller,
+                    deals.product,
+                    deals.deal_value_normalized,
+                    deals.currency,
+                    deals.deal_date,
+                    deals.confidence,
+                    deals.source_url,
+                    bm25(deals_fts, {weights}) AS score,
+                    snippet(deals_fts, -1, ?, ?, '…', ?) AS snippet
+                FROM deals_fts
+                JOIN deals ON deals.id = deals_fts.rowid
+                WHERE deals_fts MATCH ?
+                ORDER BY score
+                LIMIT ? OFFSET ?
+            """, (
+                highlight_start,
+                highlight_end,
+                snippet_tokens,
+                self._prepare_query(query_text),
+                limit,
+                offset
+            )).fetchall()
+
+        except sqlite3.OperationalError as error:
+            print(f"Deal search failed: {error}")
+            return []
+
+        return [dict(row) for row in rows]
+
+    def count(self, query_text: str) -> int:
+        """
+        Count deals matching query.
+
+        :param query_text: FTS5 query
+        :return: number of matches
+        """
+
+        try:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM deals_fts WHERE deals_fts MATCH ?",
+                (self._prepare_query(query_text),)
+            ).fetchone()[0]
+
+        except sqlite3.OperationalError as error:
+            print(f"Deal search failed: {error}")
+            return 0
+
+    def close(self):
+        """
+        Close read connection.
+        """
+
+        self.connection.close()
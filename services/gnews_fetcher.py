@@ -2,33 +2,53 @@
 
 import requests
 
+from services.api_rate_limiter import QuotaExhaustedError
+from utils.metrics import metrics_registry
+
 
 class GNewsFetcher:
     """
     Fetches news articles with full content using GNews API.
     """
 
-    def __init__(self, api_key: str, language: str = "en"):
+    def __init__(
+        self,
+        api_key: str,
+        language: str = "en",
+        rate_limiter=None,
+        throttle_pause_seconds: float = 5,
+        base_url: str = "https://gnews.io/api/v4/search"
+    ):
         """
         Initialize GNews API client.
 
         :param api_key: GNews API token
         :param language: language filter (default English)
+        :param rate_limiter: shared ApiRateLimiter (None: calls are not throttled)
+        :param throttle_pause_seconds: pause after a 429 without Retry-After
+        :param base_url: search endpoint (e.g. a local fake server for load tests)
         """
         self.api_key = api_key
         self.language = language
-        self.base_url = "https://gnews.io/api/v4/search"
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        self.throttle_pause_seconds = throttle_pause_seconds
 
-    def fetch_articles(self, query: str, max_records: int = 10):
+    def fetch_articles(self, query: str, max_records: int = 10, priority: str = "normal"):
         """
         Fetch articles related to query.
 
         :param query: search keywords
         :param max_records: number of articles to fetch
+        :param priority: "normal", or "low" for queries that may be deferred near the daily quota
         :return: list of article dictionaries
         """
 
         try:
+            # Wait for a token; refuses once the daily quota is used up
+            if self.rate_limiter:
+                self.rate_limiter.acquire(priority)
+
             params = {
                 "q": query,
                 "lang": self.language,
@@ -36,19 +56,37 @@ class GNewsFetcher:
                 "token": self.api_key
             }
 
-            response = requests.get(
-                self.base_url,
-                params=params,
-                timeout=10
-            )
+            with metrics_registry.timer("fetch_request_seconds", api="gnews"):
+                response = requests.get(
+                    self.base_url,
+                    params=params,
+                    timeout=10
+                )
+
+            metrics_registry.increment("fetch_requests_total", api="gnews", status=response.status_code)
+
+            # Make every process sharing the limiter back off, not just this one
+            if response.status_code == 429 and self.rate_limiter:
+                retry_after = response.headers.get("Retry-After", "")
+                self.rate_limiter.pause(float(retry_after) if retry_after.isdigit() else self.throttle_pause_seconds)
 
             response.raise_for_status()
 
             data = response.json()
 
             # GNews returns articles inside "articles" key
-            return data.get("articles", [])
+            articles = data.get("articles", [])
+
+            metrics_registry.increment("fetch_articles_total", len(articles), api="gnews")
+
+            return articles
+
+        except QuotaExhaustedError as error:
+            print(f"GNews query deferred: {error}")
+            metrics_registry.increment("fetch_deferred_total", api="gnews")
+            return []
 
         except Exception as error:
             print(f"GNews fetch failed: {error}")
+            metrics_registry.increment("fetch_errors_total", api="gnews")
             return []
@@ -0,0 +1,225 @@
+# This class saves structured deals into a Google Sheet using batched appends
+
+import re
+import time
+
+from services.storage_base import StorageWriter
+from services.sheet_writer import SheetWriter
+from models.deal import DEAL_FIELDS, coerce_deal
+from utils.url_index import UrlIndex
+
+
+class GoogleSheetStorageWriter(StorageWriter):
+    """
+    Google Sheets storage implementation.
+
+    Rows are buffered locally and sent as a few large values.append calls
+    instead of one call per deal, keeping well inside Sheets quotas.
+    Duplicates are detected against a local URL index of rows already
+    appended, so the sheet is never read back for deduplication.
+
+    The buffer is also flushed once its oldest row has waited
+    max_buffer_seconds (checked on every save, and by StorageFanOut
+    through flush_if_due() while no deals arrive), so a slow daemon
+    does not leave the sheet hours behind.
+
+    Rows that fail to send stay buffered and are retried on the next
+    flush; close() flushes whatever is left. If an append failed after
+    the sheet had already applied it (e.g. a 5xx or a lost response),
+    that retry duplicates those rows; SheetWriter keeps this window small
+    by never retrying such appends on its own.
+    """
+
+    def __init__(
+        self,
+        spreadsheet_id: str,
+        access_token: str = None,
+        sheet_name: str = "Deals",
+        index_path: str = None,
+        rows_per_request: int = 500,
+        max_buffer_seconds: float = 30,
+        base_url: str = "https://sheets.googleapis.com/v4",
+        sheet_writer: SheetWriter = None
+    ):
+        """
+        Initialize sheet client, buffer and URL index.
+
+        :param spreadsheet_id: target spreadsheet id
+        :param access_token: OAuth bearer token
+        :param sheet_name: worksheet (tab) receiving the rows
+        :param index_path: local URL index of rows already in the sheet
+            (default: google_sheet_<spreadsheet_id>.urls.sqlite, one index per sheet)
+        :param rows_per_request: buffered rows that trigger a flush, and rows per append call
+        :param max_buffer_seconds: longest a buffered row waits before a flush (None: no limit)
+        :param base_url: API root, override to point at a local stand-in server
+        :param sheet_writer: preconfigured client (overrides the arguments above)
+        """
+        self.sheet_name = sheet_name
+        self.rows_per_request = rows_per_request
+        self.max_buffer_seconds = max_buffer_seconds
+
+        self.sheet_writer = sheet_writer or SheetWriter(
+            spreadsheet_id=spreadsheet_id,
+            access_token=access_token,
+            base_url=base_url
+        )
+
+        self.fieldnames = list(DEAL_FIELDS)
+
+        if index_path is None:
+            safe_spreadsheet_id = re.sub(r"[^A-Za-z0-9_-]", "_", spreadsheet_id)
+            index_path = f"google_sheet_{safe_spreadsheet_id}.urls.sqlite"
+
+        self.url_index = UrlIndex(index_path)
+
+        # Buffered rows waiting to be appended, with their source URLs
+        self.pending_rows = []
+        self.pending_urls = []
+
+        # When the buffer last went from empty to non-empty (or a flush last failed)
+        self._buffer_started_at = None
+
+        self._header_checked = False
+
+    def _deal_to_values(self, deal) -> list:
+        """
+        Convert deal into sheet cell values in column order.
+
+        :param deal: Deal record
+        :return: list of cell values
+        """
+
+        return ["" if value is None else value for value in deal.to_tuple()]
+
+    def _ensure_header(self):
+        """
+        Write the header row once if the sheet is empty.
+        """
+
+        if self._header_checked:
+            return
+
+        header_rows = self.sheet_writer.get_values(f"{self.sheet_name}!1:1")
+
+        if not header_rows:
+            self.sheet_writer.append_values(f"{self.sheet_name}!A1", [self.fieldnames])
+
+        self._header_checked = True
+
+    def save_structured_deals(self, structured_deals: list):
+        """
+        Buffer new deals, flushing when enough rows are waiting.
+
+        :param structured_deals: List of Deal records or deal dictionaries
+        :return: Dictionary with inserted (accepted) and ignored row counts and failed_urls
+        """
+
+        deals = [coerce_deal(deal) for deal in structured_deals]
+
+        try:
+            # Anything already in the sheet or waiting in the buffer is a duplicate
+            known_urls = self.url_index.find_existing(deal.source_url for deal in deals)
+
+        except Exception as error:
+            print(f"Failed buffering Google Sheet rows: {error}")
+
+            return {
+                "inserted": 0,
+                "ignored": 0,
+                "failed_urls": [deal.source_url for deal in deals]
+            }
+
+        known_urls.update(self.pending_urls)
+
+        accepted_count = 0
+
+        if not self.pending_rows:
+            self._buffer_started_at = time.monotonic()
+
+        for deal in deals:
+            if deal.source_url in known_urls:
+                continue
+
+            self.pending_rows.append(self._deal_to_values(deal))
+            self.pending_urls.append(deal.source_url)
+
+            known_urls.add(deal.source_url)
+            accepted_count += 1
+
+        # Rows that fail to send stay buffered, so they are not failures yet
+        if len(self.pending_rows) >= self.rows_per_request:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+        return {
+            "inserted": accepted_count,
+            "ignored": len(deals) - accepted_count,
+            "failed_urls": []
+        }
+
+    def flush_if_due(self) -> int:
+        """
+        Flush if the oldest buffered row has waited max_buffer_seconds.
+
+        :return: number of rows appended
+        """
+
+        if not self.pending_rows or self.max_buffer_seconds is None:
+            return 0
+
+        if time.monotonic() - self._buffer_started_at < self.max_buffer_seconds:
+            return 0
+
+        return self.flush()
+
+    def flush(self) -> int:
+        """
+        Send buffered rows as batched append calls.
+
+        :return: number of rows appended
+        """
+
+        appended_count = 0
+
+        try:
+            if self.pending_rows:
+                self._ensure_header()
+
+            while self.pending_rows:
+                batch_rows = self.pending_rows[:self.rows_per_request]
+                batch_urls = self.pending_urls[:self.rows_per_request]
+
+                self.sheet_writer.append_values(f"{self.sheet_name}!A1", batch_rows)
+
+                # Index only what the sheet has accepted
+                self.url_index.add_many(batch_urls)
+
+                del self.pending_rows[:len(batch_rows)]
+                del self.pending_urls[:len(batch_urls)]
+
+                appended_count += len(batch_rows)
+
+        except Exception as error:
+            print(f"Failed writing Google Sheet ({len(self.pending_rows)} rows kept for retry): {error}")
+
+            # Wait another max_buffer_seconds before the timed retry
+            self._buffer_started_at = time.monotonic()
+
+        return appended_count
+
+    def close(self):
+        """
+        Flush remaining rows and close client and index.
+
+        :return: Dictionary with failed_urls of rows that could not be flushed
+        """
+
+        self.flush()
+
+        failed_urls = list(self.pending_urls)
+
+        self.sheet_writer.close()
+        self.url_index.close()
+
+        return {"failed_urls": failed_urls}
@@ -1,5 +1,9 @@
 # This class handles keyword-based filtering of articles
 
+import time
+
+from utils.metrics import metrics_registry
+
 
 class KeywordEngine:
     """
@@ -52,6 +56,8 @@ class KeywordEngine:
         :return: Filtered relevant articles
         """
 
+        started_at = time.perf_counter()
+
         filtered_articles = []
 
         for article in articles:
@@ -71,4 +77,8 @@ class KeywordEngine:
             if has_product and has_deal and has_context:
                 filtered_articles.append(article)
 
+        metrics_registry.observe("keyword_filter_seconds", time.perf_counter() - started_at)
+        metrics_registry.increment("keyword_filter_articles_total", len(filtered_articles), result="kept")
+        metrics_registry.increment("keyword_filter_articles_total", len(articles) - len(filtered_articles), result="dropped")
+
         return filtered_articles
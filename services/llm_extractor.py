@@ -1,7 +1,5 @@
 # This class runs a pretrained HuggingFace LLM locally for structured extraction
 
-from transformers import pipeline
-
 
 class LocalLLMExtractor:
     """
@@ -15,6 +13,9 @@ class LocalLLMExtractor:
         :param model_name: HuggingFace model identifier
         """
 
+        # transformers takes seconds to import; load it only when a model is used
+        from transformers import pipeline
+
         # Create text generation pipeline
         self.generator = pipeline(
             "text-generation",
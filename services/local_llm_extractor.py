@@ -1,7 +1,5 @@
 # Offline LLM structured extraction using HuggingFace transformers
 
-from transformers import pipeline
-
 
 class LocalLLMExtractor:
     """
@@ -15,6 +13,9 @@ class LocalLLMExtractor:
         :param model_name: HuggingFace model identifier
         """
 
+        # transformers takes seconds to import; load it only when a model is used
+        from transformers import pipeline
+
         # Use supported pipeline type (works across versions)
         self.extractor = pipeline(
             "text-generation",
@@ -1,45 +1,79 @@
 # This service runs multiple search queries against GNews
 # and merges results into one deduplicated article list
 
+import threading
+
+from utils.bounded_set import BoundedSet
+
+
 class MultiQueryFetcher:
     """
     Fetches articles using multiple high-signal queries
     and removes duplicate URLs.
     """
 
-    def __init__(self, news_fetcher):
+    def __init__(self, news_fetcher, max_seen_urls: int = None):
         """
         :param news_fetcher: instance of GNewsFetcher
+        :param max_seen_urls: most recent URLs remembered (None: all)
         """
         self.news_fetcher = news_fetcher
 
-    def fetch_from_queries(self, queries, max_per_query=5):
+        # URLs already returned by this fetcher (shared by concurrent fetch_query calls)
+        self.seen_urls = BoundedSet(max_seen_urls)
+        self._seen_lock = threading.Lock()
+
+    def fetch_query(self, query, max_per_query=5, priority="normal"):
         """
-        Run multiple queries and merge unique articles.
+        Run one query and return only articles not returned before.
+        Safe to call from several threads.
 
-        :param queries: list of query strings
+        :param query: query string
         :param max_per_query: articles per query
-        :return: list of unique articles
+        :param priority: "normal", or "low" to let the rate limiter defer it near the daily quota
+        :return: list of new unique articles
         """
 
-        all_articles = []
-        seen_urls = set()
-
-        for query in queries:
+        articles = self.news_fetcher.fetch_articles(
+            query=query,
+            max_records=max_per_query,
+            priority=priority
+        )
 
-            articles = self.news_fetcher.fetch_articles(
-                query=query,
-                max_records=max_per_query
-            )
+        new_articles = []
 
+        with self._seen_lock:
             for article in articles:
                 url = article.get("url")
 
                 # Skip if already collected
-                if not url or url in seen_urls:
+                if not url or url in self.seen_urls:
                     continue
 
-                seen_urls.add(url)
-                all_articles.append(article)
+                self.seen_urls.add(url)
+                new_articles.append(article)
+
+        return new_articles
+
+    def iter_from_queries(self, queries, max_per_query=5):
+        """
+        Run queries one by one, yielding unique articles as soon as each query returns.
+
+        :param queries: iterable of query strings
+        :param max_per_query: articles per query
+        :return: generator of unique articles
+        """
+
+        for query in queries:
+            yield from self.fetch_query(query, max_per_query)
+
+    def fetch_from_queries(self, queries, max_per_query=5):
+        """
+        Run multiple queries and merge unique articles.
+
+        :param queries: list of query strings
+        :param max_per_query: articles per query
+        :return: list of unique articles
+        """
 
-        return all_articles
+        return list(self.iter_from_queries(queries, max_per_query))
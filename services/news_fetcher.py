@@ -1,30 +1,36 @@
 import requests
 import time
 
+from services.api_rate_limiter import QuotaExhaustedError
+from utils.metrics import metrics_registry
+
 
 class NewsFetcher:
     """
     Fetches news articles from GDELT with retry and response validation.
     """
 
-    def __init__(self, base_url: str, max_retries: int = 3, wait_seconds: int = 5):
+    def __init__(self, base_url: str, max_retries: int = 3, wait_seconds: int = 5, rate_limiter=None):
         """
         Initialize fetcher configuration.
 
         :param base_url: GDELT API base URL
         :param max_retries: Retry attempts on failure
         :param wait_seconds: Delay between retries
+        :param rate_limiter: shared ApiRateLimiter (None: calls are not throttled)
         """
         self.base_url = base_url
         self.max_retries = max_retries
         self.wait_seconds = wait_seconds
+        self.rate_limiter = rate_limiter
 
-    def fetch_articles(self, query: str, max_records: int = 50):
+    def fetch_articles(self, query: str, max_records: int = 50, priority: str = "normal"):
         """
         Fetch articles safely from GDELT.
 
         :param query: Search keywords
         :param max_records: Number of records requested
+        :param priority: "normal", or "low" for queries that may be deferred near the daily quota
         :return: List of article dictionaries
         """
 
@@ -40,14 +46,31 @@ class NewsFetcher:
 
         while attempt_count < self.max_retries:
             try:
-                response = requests.get(self.base_url, params=request_parameters, timeout=10)
+                # Every attempt is a call, so every attempt takes a token
+                if self.rate_limiter:
+                    self.rate_limiter.acquire(priority)
+
+                with metrics_registry.timer("fetch_request_seconds", api="gdelt"):
+                    response = requests.get(self.base_url, params=request_parameters, timeout=10)
+
+                metrics_registry.increment("fetch_requests_total", api="gdelt", status=response.status_code)
+
                 print("RAW GDELT RESPONSE:")
                 print(response.text[:1000])
 
                 # Handle rate limiting
                 if response.status_code == 429:
+                    retry_after = response.headers.get("Retry-After", "")
+                    wait_seconds = float(retry_after) if retry_after.isdigit() else self.wait_seconds
+
                     print("Rate limit hit. Waiting...")
-                    time.sleep(self.wait_seconds)
+
+                    # The shared limiter makes the next acquire() wait, for every process
+                    if self.rate_limiter:
+                        self.rate_limiter.pause(wait_seconds)
+                    else:
+                        time.sleep(wait_seconds)
+
                     attempt_count += 1
                     continue
 
@@ -70,10 +93,18 @@ class NewsFetcher:
                 # Extract articles cleanly
                 articles_list = response_data.get("articles", [])
 
+                metrics_registry.increment("fetch_articles_total", len(articles_list), api="gdelt")
+
                 return articles_list
 
+            except QuotaExhaustedError as error:
+                print(f"GDELT query deferred: {error}")
+                metrics_registry.increment("fetch_deferred_total", api="gdelt")
+                return []
+
             except requests.exceptions.RequestException as error:
                 print(f"Attempt {attempt_count + 1} failed: {error}")
+                metrics_registry.increment("fetch_errors_total", api="gdelt")
                 time.sleep(self.wait_seconds)
                 attempt_count += 1
 
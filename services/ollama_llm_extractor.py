@@ -1,9 +1,20 @@
-from langchain_ollama import OllamaLLM
+import time
+
+from utils.metrics import metrics_registry
 
 
 class OllamaLLMExtractor:
-    def __init__(self, model_name="llama3"):
-        self.llm = OllamaLLM(model=model_name)
+    def __init__(self, model_name="llama3", base_url=None):
+        self.model_name = model_name
+
+        # Imported here so importing this module (e.g. via main.py) stays cheap
+        from langchain_ollama import OllamaLLM
+
+        # base_url selects the Ollama server (default: local server)
+        if base_url:
+            self.llm = OllamaLLM(model=model_name, base_url=base_url)
+        else:
+            self.llm = OllamaLLM(model=model_name)
 
     def extract_json(self, article_text: str):
         prompt = f"""
@@ -14,4 +25,27 @@ buyer, seller, product, quantity, deal_value, currency, deal_date, summary
 Text:
 {article_text}
 """
-        return self.llm.invoke(prompt)
+        started_at = time.perf_counter()
+
+        try:
+            # generate() (rather than invoke()) exposes Ollama's token counts
+            generation = self.llm.generate([prompt]).generations[0][0]
+
+        except Exception:
+            metrics_registry.increment("llm_requests_total", model=self.model_name, outcome="error")
+            raise
+
+        finally:
+            metrics_registry.observe("llm_request_seconds", time.perf_counter() - started_at, model=self.model_name)
+
+        metrics_registry.increment("llm_requests_total", model=self.model_name, outcome="ok")
+
+        generation_info = generation.generation_info or {}
+
+        if generation_info.get("prompt_eval_count"):
+            metrics_registry.increment("llm_prompt_tokens_total", generation_info["prompt_eval_count"], model=self.model_name)
+
+        if generation_info.get("eval_count"):
+            metrics_registry.increment("llm_completion_tokens_total", generation_info["eval_count"], model=self.model_name)
+
+        return generation.text
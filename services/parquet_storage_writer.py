@@ -0,0 +1,441 @@
+# This class saves structured deals as Parquet files partitioned by ingestion date
+
+import fcntl
+import json
+import os
+import uuid
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from services.storage_base import StorageWriter
+from models.deal import coerce_deal
+from utils.url_index import UrlIndex
+
+
+# Low-cardinality text columns are dictionary-encoded in memory and on disk
+DEALS_PARQUET_SCHEMA = pa.schema([
+    ("buyer", pa.dictionary(pa.int32(), pa.string())),
+    ("seller", pa.dictionary(pa.int32(), pa.string())),
+    ("product", pa.string()),
+    ("quantity", pa.string()),
+    ("deal_value", pa.string()),
+    ("currency", pa.dictionary(pa.int32(), pa.string())),
+    ("deal_date", pa.string()),
+    ("summary", pa.string()),
+    ("deal_value_normalized", pa.int64()),
+    ("quantity_normalized", pa.int64()),
+    ("confidence", pa.float64()),
+    ("source_url", pa.string()),
+    ("ingestion_timestamp", pa.timestamp("us"))
+])
+
+PARTITION_COLUMN = "ingestion_date"
+
+# Per-partition record of an unfinished compaction: {"output": name, "inputs": [names]}
+COMPACTION_MARKER = "_compaction.json"
+
+
+class ParquetStorageWriter(StorageWriter):
+    """
+    Columnar storage implementation.
+
+    Each save appends new Parquet files under
+    <root>/ingestion_date=YYYY-MM-DD/ (hive layout), so readers can
+    select columns and prune partitions. compact() merges small files.
+
+    Compaction is crash-safe. The merged file is written under a hidden
+    name. A marker listing its inputs is then written, the merged file is
+    renamed into place, the inputs are deleted and the marker goes last.
+    While a marker exists, read_deals() skips inputs whose merged file
+    is already in place, so the rows are never read twice. The next
+    compact() finishes or rolls back whatever a crash interrupted. A lock
+    file keeps processes from compacting the same dataset at once.
+    """
+
+    def __init__(self, root_directory: str, compression: str = "zstd"):
+        """
+        Initialize dataset directory and URL index.
+
+        :param root_directory: Dataset root directory
+        :param compression: Parquet compression codec
+        """
+        self.root_directory = root_directory
+        self.compression = compression
+
+        os.makedirs(root_directory, exist_ok=True)
+
+        # Parquet files are immutable, so duplicates are filtered before writing
+        self.url_index = UrlIndex(os.path.join(root_directory, "_urls.sqlite"))
+
+    # -------------------- Helpers --------------------
+
+    def _partition_directory(self, ingestion_date: str) -> str:
+        """
+        Directory for one ingestion date.
+
+        :param ingestion_date: YYYY-MM-DD
+        :return: partition directory path
+        """
+
+        return os.path.join(self.root_directory, f"{PARTITION_COLUMN}={ingestion_date}")
+
+    def _parse_timestamp(self, timestamp_text):
+        """
+        Parse ISO timestamp text into datetime.
+
+        :param timestamp_text: ISO timestamp or None
+        :return: datetime or None
+        """
+
+        if not timestamp_text:
+            return None
+
+        try:
+            return datetime.fromisoformat(str(timestamp_text))
+        except ValueError:
+            return None
+
+    def _to_int(self, value):
+        """
+        Convert normalized numeric field into int, None if not numeric.
+
+        :param value: raw value
+        :return: int or None
+        """
+
+        try:
+            return None if value is None else int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _build_table(self, deals: list) -> pa.Table:
+        """
+        Build a typed Arrow table from deal records.
+
+        :param deals: list of Deal records
+        :return: Arrow table matching DEALS_PARQUET_SCHEMA
+        """
+
+        def text_column(field_name):
+            return [
+                None if getattr(deal, field_name) is None else str(getattr(deal, field_name))
+                for deal in deals
+            ]
+
+        columns = {
+            "buyer": text_column("buyer"),
+            "seller": text_column("seller"),
+            "product": text_column("product"),
+            "quantity": text_column("quantity"),
+            "deal_value": text_column("deal_value"),
+            "currency": text_column("currency"),
+            "deal_date": text_column("deal_date"),
+            "summary": text_column("summary"),
+            "deal_value_normalized": [self._to_int(deal.deal_value_normalized) for deal in deals],
+            "quantity_normalized": [self._to_int(deal.quantity_normalized) for deal in deals],
+            "confidence": [deal.confidence for deal in deals],
+            "source_url": text_column("source_url"),
+            "ingestion_timestamp": [self._parse_timestamp(deal.ingestion_timestamp) for deal in deals]
+        }
+
+        return pa.Table.from_pydict(columns, schema=DEALS_PARQUET_SCHEMA)
+
+    def _write_file(self, table: pa.Table, partition_directory: str) -> str:
+        """
+        Write table as a new immutable Parquet file.
+
+        The file is written under a temporary name first so readers
+        never see a half-written file.
+
+        :param table: Arrow table
+        :param partition_directory: target directory
+        :return: written file path
+        """
+
+        os.makedirs(partition_directory, exist_ok=True)
+
+        file_name = f"part-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        file_path = os.path.join(partition_directory, file_name)
+        temporary_path = os.path.join(partition_directory, f".{file_name}.tmp")
+
+        pq.write_table(
+            table,
+            temporary_path,
+            compression=self.compression,
+            use_dictionary=["buyer", "seller", "currency"]
+        )
+
+        os.replace(temporary_path, file_path)
+
+        return file_path
+
+    # -------------------- Public API --------------------
+
+    def save_structured_deals(self, structured_deals: list):
+        """
+        Append structured deals as Parquet files, one per ingestion date.
+
+        :param structured_deals: List of Deal records or deal dictionaries
+        :return: Dictionary with inserted and ignored row counts and failed_urls
+        """
+
+        deals = [coerce_deal(deal) for deal in structured_deals]
+        inserted_urls = []
+        new_urls = None
+
+        try:
+            existing_urls = self.url_index.find_existing(deal.source_url for deal in deals)
+
+            deals_by_date = {}
+            new_urls = []
+
+            for deal in deals:
+
+                # Skip duplicate entries (stored earlier or earlier in this batch)
+                if deal.source_url in existing_urls:
+                    continue
+
+                existing_urls.add(deal.source_url)
+                new_urls.append(deal.source_url)
+
+                ingestion_time = self._parse_timestamp(deal.ingestion_timestamp) or datetime.utcnow()
+                deals_by_date.setdefault(ingestion_time.date().isoformat(), []).append(deal)
+
+            for ingestion_date, partition_deals in deals_by_date.items():
+                self._write_file(
+                    self._build_table(partition_deals),
+                    self._partition_directory(ingestion_date)
+                )
+
+                partition_urls = [deal.source_url for deal in partition_deals]
+
+                # Index is updated only after the file is in place
+                self.url_index.add_many(partition_urls)
+                inserted_urls.extend(partition_urls)
+
+        except Exception as error:
+            print(f"Failed writing Parquet: {error}")
+
+        # New deals whose partition file was not written (all deals if the index lookup failed)
+        if new_urls is None:
+            failed_urls = [deal.source_url for deal in deals]
+        else:
+            written_urls = set(inserted_urls)
+            failed_urls = [source_url for source_url in new_urls if source_url not in written_urls]
+
+        return {
+            "inserted": len(inserted_urls),
+            "ignored": len(deals) - len(inserted_urls) - len(failed_urls),
+            "failed_urls": failed_urls
+        }
+
+    # -------------------- Compaction --------------------
+
+    def _partition_directories(self) -> list:
+        """
+        Every partition directory of the dataset, oldest first.
+
+        :return: list of directory paths
+        """
+
+        return [
+            os.path.join(self.root_directory, entry)
+            for entry in sorted(os.listdir(self.root_directory))
+            if entry.startswith(f"{PARTITION_COLUMN}=")
+        ]
+
+    def _read_compaction_marker(self, partition_directory: str):
+        """
+        :param partition_directory: partition path
+        :return: marker dictionary, or None if no compaction is pending
+        """
+
+        try:
+            with open(os.path.join(partition_directory, COMPACTION_MARKER), mode="r", encoding="utf-8") as marker_file:
+                return json.load(marker_file)
+
+        except FileNotFoundError:
+            return None
+
+    def _write_compaction_marker(self, partition_directory: str, compaction_marker: dict):
+        """
+        Atomically write (and fsync) a partition's compaction marker.
+
+        :param partition_directory: partition path
+        :param compaction_marker: {"output": name, "inputs": [names]}
+        """
+
+        marker_path = os.path.join(partition_directory, COMPACTION_MARKER)
+        temporary_path = f"{marker_path}.tmp"
+
+        with open(temporary_path, mode="w", encoding="utf-8") as marker_file:
+            json.dump(compaction_marker, marker_file)
+            marker_file.flush()
+            os.fsync(marker_file.fileno())
+
+        os.replace(temporary_path, marker_path)
+
+    def _live_files(self, partition_directory: str) -> list:
+        """
+        Parquet files a reader should see: inputs of a compaction whose
+        merged file is already in place are left out.
+
+        :param partition_directory: partition path
+        :return: sorted file names
+        """
+
+        file_names = sorted(entry for entry in os.listdir(partition_directory) if entry.endswith(".parquet") and not entry.startswith("."))
+
+        compaction_marker = self._read_compaction_marker(partition_directory)
+
+        if compaction_marker and compaction_marker["output"] in file_names:
+            replaced_files = set(compaction_marker["inputs"])
+            file_names = [file_name for file_name in file_names if file_name not in replaced_files]
+
+        return file_names
+
+    def _finish_compaction(self, partition_directory: str):
+        """
+        Complete or roll back a compaction interrupted by a crash.
+
+        Merged file in place: delete the remaining inputs. Otherwise the
+        inputs still hold every row, so the hidden merged file is dropped.
+
+        :param partition_directory: partition path
+        """
+
+        compaction_marker = self._read_compaction_marker(partition_directory)
+
+        if not compaction_marker:
+            return
+
+        if os.path.exists(os.path.join(partition_directory, compaction_marker["output"])):
+            for file_name in compaction_marker["inputs"]:
+                try:
+                    os.remove(os.path.join(partition_directory, file_name))
+                except FileNotFoundError:
+                    pass
+        else:
+            try:
+                os.remove(os.path.join(partition_directory, f".{compaction_marker['output']}.tmp"))
+            except FileNotFoundError:
+                pass
+
+        os.remove(os.path.join(partition_directory, COMPACTION_MARKER))
+
+    def compact(self, ingestion_date: str = None, small_file_bytes: int = 8 * 1024 * 1024, min_files: int = 2):
+        """
+        Merge small Parquet files inside each partition into one file.
+
+        :param ingestion_date: Compact only this partition (default: all)
+        :param small_file_bytes: Files below this size are merged
+        :param min_files: Minimum number of small files before merging
+        :return: Number of files removed
+        """
+
+        removed_files = 0
+
+        if ingestion_date:
+            partition_directories = [self._partition_directory(ingestion_date)]
+        else:
+            partition_directories = self._partition_directories()
+
+        # Held until the file closes, and released by the OS if the process dies
+        with open(os.path.join(self.root_directory, "_compaction.lock"), mode="w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            for partition_directory in partition_directories:
+                if not os.path.isdir(partition_directory):
+                    continue
+
+                try:
+                    self._finish_compaction(partition_directory)
+
+                    small_files = [
+                        file_name for file_name in self._live_files(partition_directory)
+                        if os.path.getsize(os.path.join(partition_directory, file_name)) < small_file_bytes
+                    ]
+
+                    if len(small_files) < min_files:
+                        continue
+
+                    merged_table = pa.concat_tables(
+                        [pq.read_table(os.path.join(partition_directory, file_name), schema=DEALS_PARQUET_SCHEMA) for file_name in small_files]
+                    )
+
+                    merged_name = f"part-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+                    merged_path = os.path.join(partition_directory, merged_name)
+                    temporary_path = os.path.join(partition_directory, f".{merged_name}.tmp")
+
+                    pq.write_table(
+                        merged_table,
+                        temporary_path,
+                        compression=self.compression,
+                        use_dictionary=["buyer", "seller", "currency"]
+                    )
+
+                    with open(temporary_path, mode="rb") as merged_file:
+                        os.fsync(merged_file.fileno())
+
+                    # From here on a crash is finished or rolled back by _finish_compaction
+                    self._write_compaction_marker(partition_directory, {"output": merged_name, "inputs": small_files})
+
+                    os.replace(temporary_path, merged_path)
+
+                    for file_name in small_files:
+                        os.remove(os.path.join(partition_directory, file_name))
+
+                    os.remove(os.path.join(partition_directory, COMPACTION_MARKER))
+
+                    removed_files += len(small_files) - 1
+
+                except Exception as error:
+                    print(f"Parquet compaction failed for {partition_directory}: {error}")
+
+        return removed_files
+
+    def read_deals(self, columns: list = None, start_date: str = None, end_date: str = None):
+        """
+        Read deals into a pandas DataFrame, pruning partitions by date.
+
+        :param columns: Columns to load (default: all)
+        :param start_date: First ingestion date to include (YYYY-MM-DD)
+        :param end_date: Last ingestion date to include (YYYY-MM-DD)
+        :return: pandas DataFrame
+        """
+
+        # Files listed explicitly, so inputs of an unfinished compaction are not read twice
+        file_paths = [
+            os.path.join(partition_directory, file_name)
+            for partition_directory in self._partition_directories()
+            for file_name in self._live_files(partition_directory)
+        ]
+
+        dataset = ds.dataset(
+            file_paths,
+            schema=DEALS_PARQUET_SCHEMA.append(pa.field(PARTITION_COLUMN, pa.string())),
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive"),
+            partition_base_dir=self.root_directory
+        )
+
+        date_filter = None
+
+        if start_date:
+            date_filter = ds.field(PARTITION_COLUMN) >= start_date
+
+        if end_date:
+            end_filter = ds.field(PARTITION_COLUMN) <= end_date
+            date_filter = end_filter if date_filter is None else date_filter & end_filter
+
+        return dataset.to_table(columns=columns, filter=date_filter).to_pandas()
+
+    def close(self):
+        """
+        Close the URL index.
+        """
+
+        self.url_index.close()
@@ -0,0 +1,127 @@
+# This class decides when each search query is polled again in daemon mode
+
+import heapq
+import threading
+import time
+
+
+class QueryScheduler:
+    """
+    Per-query polling schedule with adaptive backoff.
+
+    Every query starts at base_interval_seconds. A poll that finds new
+    articles resets the query to the base interval; a quiet poll
+    multiplies its interval by backoff_factor, up to
+    max_interval_seconds. Busy queries are therefore polled often and
+    quiet ones cost almost nothing.
+    """
+
+    def __init__(
+        self,
+        queries: list,
+        base_interval_seconds: float = 300,
+        max_interval_seconds: float = 3600,
+        backoff_factor: float = 2.0
+    ):
+        """
+        :param queries: query strings to poll (all are due immediately)
+        :param base_interval_seconds: interval after a poll that found new articles
+        :param max_interval_seconds: upper bound for quiet queries
+        :param backoff_factor: interval multiplier after a quiet poll
+        """
+        self.base_interval_seconds = base_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.backoff_factor = backoff_factor
+
+        self.intervals = {query: base_interval_seconds for query in queries}
+
+        # (due time, position, query); position keeps the original order for ties
+        now = time.monotonic()
+        self._due_heap = [(now, position, query) for position, query in enumerate(queries)]
+        heapq.heapify(self._due_heap)
+
+        self._positions = {query: position for position, query in enumerate(queries)}
+
+        # Queries handed out and not yet reported back
+        self._in_flight = set()
+
+        self._condition = threading.Condition()
+
+    def next_due_query(self, stop_event: threading.Event):
+        """
+        Block until a query is due (or stop is requested).
+
+        :param stop_event: set to stop waiting
+        :return: query string, or None when stopped
+        """
+
+        while not stop_event.is_set():
+            with self._condition:
+                if self._due_heap:
+                    due_time, _, query = self._due_heap[0]
+                    wait_seconds = due_time - time.monotonic()
+
+                    if wait_seconds <= 0:
+                        heapq.heappop(self._due_heap)
+                        self._in_flight.add(query)
+                        return query
+                else:
+                    # Every query is in flight; wait for a report
+                    wait_seconds = self.base_interval_seconds
+
+            # Wake up at least once a second to notice stop requests
+            stop_event.wait(min(wait_seconds, 1.0))
+
+        return None
+
+    def report_result(self, query: str, new_article_count: int):
+        """
+        Reschedule a polled query.
+
+        :param query: query that was polled
+        :param new_article_count: articles not seen before
+        """
+
+        with self._condition:
+            if query not in self._in_flight:
+                return
+
+            self._in_flight.discard(query)
+
+            if new_article_count > 0:
+                interval = self.base_interval_seconds
+            else:
+                interval = min(self.intervals[query] * self.backoff_factor, self.max_interval_seconds)
+
+            self.intervals[query] = interval
+
+            heapq.heappush(self._due_heap, (time.monotonic() + interval, self._positions[query], query))
+            self._condition.notify_all()
+
+    def priority(self, query: str) -> str:
+        """
+        Rate limiter priority of a query: quiet (backed-off) queries are
+        "low", so they are the first to be deferred near the daily quota.
+
+        :param query: query string
+        :return: "normal" or "low"
+        """
+
+        with self._condition:
+            return "low" if self.intervals[query] > self.base_interval_seconds else "normal"
+
+    def iter_due_queries(self, stop_event: threading.Event):
+        """
+        Endless stream of due queries, ending when stop is requested.
+
+        :param stop_event: set to end the stream
+        :return: generator of query strings
+        """
+
+        while True:
+            query = self.next_due_query(stop_event)
+
+            if query is None:
+                return
+
+            yield query
@@ -0,0 +1,330 @@
+# This class journals pipeline run progress per article so crashed runs can resume
+
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+
+class RunJournal:
+    """
+    SQLite journal of pipeline runs.
+
+    Every article is recorded when fetched (with its full content) and
+    its row is advanced as it passes classify, extract and store. The
+    raw LLM output is kept in the journal as soon as extraction returns,
+    so a resumed run never calls the LLM again for that article.
+
+    Item stages: fetch -> classify -> extract -> store, or fetch ->
+    classify -> enqueue when extraction is left to queue workers
+    (failures record the pipeline stage that raised)
+    Item statuses: in_progress, ok, failed, dropped
+
+    An item is finished when it reached stage "store" or "enqueue" with
+    status "ok", or was dropped (not a deal, nothing extracted, duplicate). Everything
+    else - failed or in-flight at the time of a crash - is resumable.
+    """
+
+    # Items in this state need no more work
+    _FINISHED_SQL = "((stage IN ('store', 'enqueue') AND status = 'ok') OR status = 'dropped')"
+
+    def __init__(self, journal_path: str):
+        """
+        Open (or create) the journal database.
+
+        :param journal_path: SQLite file path
+        """
+        self.journal_path = journal_path
+
+        # Stage threads record progress concurrently
+        self._lock = threading.Lock()
+
+        self.connection = sqlite3.connect(journal_path, isolation_level=None, check_same_thread=False, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+
+        self._create_tables()
+
+    def _create_tables(self):
+        """
+        Create journal tables if missing.
+        """
+
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS pipeline_runs (
+                run_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                ingestion_timestamp TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                finished_at TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS run_queries (
+                run_id TEXT NOT NULL,
+                query TEXT NOT NULL,
+                article_count INTEGER NOT NULL,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (run_id, query)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS run_items (
+                run_id TEXT NOT NULL,
+                source_url TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                article_json TEXT NOT NULL,
+                raw_llm_output TEXT,
+                error TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (run_id, source_url)
+            ) WITHOUT ROWID;
+        """)
+
+    def _now(self) -> str:
+        """
+        Current UTC time as ISO text.
+        """
+
+        return datetime.utcnow().isoformat()
+
+    # -------------------- Runs --------------------
+
+    def start_run(self, ingestion_timestamp: str) -> str:
+        """
+        Register a new run.
+
+        :param ingestion_timestamp: timestamp stamped on deals of this run
+        :return: run id
+        """
+
+        run_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        now = self._now()
+
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO pipeline_runs (run_id, status, ingestion_timestamp, started_at, updated_at) VALUES (?, 'running', ?, ?, ?)",
+                (run_id, ingestion_timestamp, now, now)
+            )
+
+        return run_id
+
+    def get_run(self, run_id: str = None) -> dict:
+        """
+        Load a run, or the latest unfinished run when run_id is None.
+
+        :param run_id: run id
+        :return: run dictionary, or None if not found
+        """
+
+        with self._lock:
+            if run_id:
+                row = self.connection.execute("SELECT * FROM pipeline_runs WHERE run_id = ?", (run_id,)).fetchone()
+            else:
+                row = self.connection.execute(
+                    "SELECT * FROM pipeline_runs WHERE status != 'completed' ORDER BY started_at DESC LIMIT 1"
+                ).fetchone()
+
+        return dict(row) if row else None
+
+    def resume_run(self, run_id: str):
+        """
+        Mark an unfinished run as running again.
+
+        :param run_id: run id
+        """
+
+        with self._lock:
+            self.connection.execute(
+                "UPDATE pipeline_runs SET status = 'running', updated_at = ?, finished_at = NULL WHERE run_id = ?",
+                (self._now(), run_id)
+            )
+
+    def finish_run(self, run_id: str) -> str:
+        """
+        Close a run: "completed" if every item finished, else "incomplete".
+
+        :param run_id: run id
+        :return: final run status
+        """
+
+        now = self._now()
+
+        with self._lock:
+            pending_count = self.connection.execute(f"""
+                SELECT COUNT(*) FROM run_items
+                WHERE run_id = ? AND NOT {self._FINISHED_SQL}
+            """, (run_id,)).fetchone()[0]
+
+            run_status = "completed" if pending_count == 0 else "incomplete"
+
+            self.connection.execute(
+                "UPDATE pipeline_runs SET status = ?, updated_at = ?, finished_at = ? WHERE run_id = ?",
+                (run_status, now, now, run_id)
+            )
+
+        return run_status
+
+    # -------------------- Items --------------------
+
+    def record_fetch(self, run_id: str, query: str, articles: list):
+        """
+        Record fetched articles and mark the query done, in one transaction.
+
+        :param run_id: run id
+        :param query: query that returned the articles
+        :param articles: new article dictionaries
+        """
+
+        now = self._now()
+
+        with self._lock:
+            self.connection.execute("BEGIN")
+
+            try:
+                self.connection.executemany("""
+                    INSERT OR IGNORE INTO run_items (run_id, source_url, stage, status, article_json, updated_at)
+                    VALUES (?, ?, 'fetch', 'ok', ?, ?)
+                """, [
+                    (run_id, article.get("url"), json.dumps(article), now)
+                    for article in articles
+                ])
+
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO run_queries (run_id, query, article_count, fetched_at) VALUES (?, ?, ?, ?)",
+                    (run_id, query, len(articles), now)
+                )
+
+                self.connection.execute("COMMIT")
+
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def update_item(self, run_id: str, source_url: str, stage: str, status: str, raw_llm_output: str = None, error: str = None):
+        """
+        Advance an item. raw_llm_output is kept once recorded.
+
+        :param run_id: run id
+        :param source_url: article URL
+        :param stage: fetch, classify, extract, store or the failing pipeline stage
+        :param status: in_progress, ok, failed or dropped
+        :param raw_llm_output: LLM response to store with the item
+        :param error: failure message
+        """
+
+        with self._lock:
+            self.connection.execute("""
+                UPDATE run_items
+                SET stage = ?, status = ?, raw_llm_output = COALESCE(?, raw_llm_output), error = ?, updated_at = ?
+                WHERE run_id = ? AND source_url = ?
+            """, (stage, status, raw_llm_output, error, self._now(), run_id, source_url))
+
+    def mark_stored(self, run_id: str, source_urls: list):
+        """
+        Mark items as durably stored.
+
+        :param run_id: run id
+        :param source_urls: article URLs
+        """
+
+        now = self._now()
+
+        with self._lock:
+            self.connection.execute("BEGIN")
+
+            try:
+                self.connection.executemany(
+                    "UPDATE run_items SET stage = 'store', status = 'ok', error = NULL, updated_at = ? WHERE run_id = ? AND source_url = ?",
+                    [(now, run_id, source_url) for source_url in source_urls]
+                )
+                self.connection.execute("COMMIT")
+
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def get_raw_llm_output(self, run_id: str, source_url: str):
+        """
+        Raw LLM output recorded for an item, if extraction already ran.
+
+        :param run_id: run id
+        :param source_url: article URL
+        :return: raw output or None
+        """
+
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT raw_llm_output FROM run_items WHERE run_id = ? AND source_url = ?",
+                (run_id, source_url)
+            ).fetchone()
+
+        return row["raw_llm_output"] if row else None
+
+    def fetched_queries(self, run_id: str) -> set:
+        """
+        Queries already fetched in a run.
+
+        :param run_id: run id
+        :return: set of query strings
+        """
+
+        with self._lock:
+            rows = self.connection.execute("SELECT query FROM run_queries WHERE run_id = ?", (run_id,)).fetchall()
+
+        return {row["query"] for row in rows}
+
+    def known_urls(self, run_id: str) -> set:
+        """
+        Every article URL recorded in a run.
+
+        :param run_id: run id
+        :return: set of URLs
+        """
+
+        with self._lock:
+            rows = self.connection.execute("SELECT source_url FROM run_items WHERE run_id = ?", (run_id,)).fetchall()
+
+        return {row["source_url"] for row in rows}
+
+    def iter_resumable_articles(self, run_id: str):
+        """
+        Articles of a run that failed or were in flight.
+
+        :param run_id: run id
+        :return: generator of article dictionaries
+        """
+
+        with self._lock:
+            rows = self.connection.execute(f"""
+                SELECT article_json FROM run_items
+                WHERE run_id = ? AND NOT {self._FINISHED_SQL}
+            """, (run_id,)).fetchall()
+
+        for row in rows:
+            yield json.loads(row["article_json"])
+
+    def item_counts(self, run_id: str) -> dict:
+        """
+        Item counts per stage and status.
+
+        :param run_id: run id
+        :return: dictionary like {"extract/failed": 2, "store/ok": 40}
+        """
+
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT stage, status, COUNT(*) AS item_count FROM run_items WHERE run_id = ? GROUP BY stage, status",
+                (run_id,)
+            ).fetchall()
+
+        return {f"{row['stage']}/{row['status']}": row["item_count"] for row in rows}
+
+    def close(self):
+        """
+        Close journal database.
+        """
+
+        self.connection.close()
@@ -0,0 +1,184 @@
+# This class is a minimal Google Sheets values API client with retry and backoff
+
+import random
+import time
+from urllib.parse import quote
+
+import requests
+
+
+class SheetsApiError(Exception):
+    """
+    Raised when a Sheets request fails after all retries.
+    """
+
+
+class SheetWriter:
+    """
+    Thin client for the Sheets v4 "values" endpoints.
+
+    Only the calls the storage writer needs are implemented. Rate limited
+    (429) and server error (5xx) responses, as well as connection errors,
+    are retried with exponential backoff and jitter; Retry-After is
+    honoured when the server sends it.
+
+    values.append is not idempotent: after a 5xx, a dropped connection or
+    a read timeout the rows may already have been appended, and sending
+    them again would duplicate them. Appends are therefore only retried
+    when the request certainly was not applied (429, or the connection
+    could not be opened); other failures are raised to the caller.
+    """
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        spreadsheet_id: str,
+        access_token: str = None,
+        base_url: str = "https://sheets.googleapis.com/v4",
+        max_retries: int = 5,
+        initial_backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 32.0,
+        timeout_seconds: float = 30.0
+    ):
+        """
+        Initialize Sheets client.
+
+        :param spreadsheet_id: target spreadsheet id
+        :param access_token: OAuth bearer token (not needed for the local stand-in)
+        :param base_url: API root, override to point at a local stand-in server
+        :param max_retries: retries after the first attempt
+        :param initial_backoff_seconds: first retry delay, doubled each retry
+        :param max_backoff_seconds: upper bound for a single retry delay
+        :param timeout_seconds: per-request timeout
+        """
+        self.spreadsheet_id = spreadsheet_id
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.initial_backoff_seconds = initial_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.timeout_seconds = timeout_seconds
+
+        # Reuse one HTTP connection for all calls
+        self.session = requests.Session()
+
+        if access_token:
+            self.session.headers["Authorization"] = f"Bearer {access_token}"
+
+        self.request_count = 0
+        self.retry_count = 0
+
+    def _values_url(self, range_name: str, suffix: str = "") -> str:
+        """
+        Build values endpoint URL for a range.
+
+        :param range_name: A1 range, e.g. "Deals!A1"
+        :param suffix: method suffix, e.g. ":append"
+        :return: request URL
+        """
+
+        return f"{self.base_url}/spreadsheets/{self.spreadsheet_id}/values/{quote(range_name, safe='!:')}{suffix}"
+
+    def _backoff_seconds(self, attempt: int, response=None) -> float:
+        """
+        Delay before the next retry.
+
+        :param attempt: retry number, starting at 0
+        :param response: failed response, if any
+        :return: seconds to sleep
+        """
+
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff_seconds)
+
+        backoff = min(self.initial_backoff_seconds * (2 ** attempt), self.max_backoff_seconds)
+
+        # Jitter spreads out retries from concurrent writers
+        return backoff * random.uniform(0.5, 1.0)
+
+    def _request(self, method: str, url: str, idempotent: bool = True, **kwargs) -> dict:
+        """
+        Send request, retrying throttled and transient failures.
+
+        :param method: HTTP method
+        :param url: request URL
+        :param idempotent: False limits retries to failures where the request was not applied
+        :return: decoded JSON response
+        """
+
+        retry_status_codes = self.RETRY_STATUS_CODES if idempotent else {429}
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+
+            try:
+                self.request_count += 1
+                response = self.session.request(method, url, timeout=self.timeout_seconds, **kwargs)
+
+                if response.status_code not in retry_status_codes:
+                    response.raise_for_status()
+                    return response.json() if response.content else {}
+
+                failure = f"HTTP {response.status_code}"
+
+            except requests.ConnectTimeout as error:
+                # Connection never opened, so nothing was sent
+                failure = str(error)
+
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if not idempotent:
+                    raise SheetsApiError(f"Sheets request outcome unknown, not retried: {error}") from error
+
+                failure = str(error)
+
+            except requests.HTTPError as error:
+                # Other 4xx errors will not succeed on retry (nor 5xx on non-idempotent calls)
+                raise SheetsApiError(f"Sheets request failed: {error}") from error
+
+            if attempt == self.max_retries:
+                break
+
+            self.retry_count += 1
+            time.sleep(self._backoff_seconds(attempt, response))
+
+        raise SheetsApiError(f"Sheets request failed after {self.max_retries + 1} attempts: {failure}")
+
+    def append_values(self, range_name: str, rows: list) -> dict:
+        """
+        Append rows after the last row of the table in range.
+
+        :param range_name: A1 range locating the table, e.g. "Deals!A1"
+        :param rows: list of row value lists
+        :return: API response (includes "updates")
+        """
+
+        return self._request(
+            "POST",
+            self._values_url(range_name, ":append"),
+            idempotent=False,
+            params={
+                "valueInputOption": "RAW",
+                "insertDataOption": "INSERT_ROWS"
+            },
+            json={"values": rows}
+        )
+
+    def get_values(self, range_name: str) -> list:
+        """
+        Read values in range.
+
+        :param range_name: A1 range
+        :return: list of row value lists
+        """
+
+        return self._request("GET", self._values_url(range_name)).get("values", [])
+
+    def close(self):
+        """
+        Close HTTP session.
+        """
+
+        self.session.close()
@@ -0,0 +1,225 @@
+# This module runs a local stand-in for the Google Sheets values API (offline testing)
+
+import argparse
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+
+class SheetsStubServer:
+    """
+    In-memory Sheets values API stand-in.
+
+    Supports values.get and values.append for any spreadsheet id, records
+    every append call, and can fail the next N requests with a chosen
+    status code to exercise retry and backoff.
+
+    Usage:
+    with SheetsStubServer() as stub:
+        writer = GoogleSheetStorageWriter("sheet-id", base_url=stub.base_url)
+        ...
+        stub.append_calls -> [("Deals", 500), ("Deals", 120)]
+    """
+
+    VALUES_PATH = re.compile(r"^/v4/spreadsheets/(?P<spreadsheet_id>[^/]+)/values/(?P<range>.+?)(?P<method>:append)?$")
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Create server (port 0 picks a free port).
+
+        :param host: bind address
+        :param port: bind port
+        """
+
+        self.sheets = {}
+        self.append_calls = []
+        self.request_count = 0
+
+        self._failures_remaining = 0
+        self._failure_status = 429
+        self._lock = threading.Lock()
+
+        self.http_server = ThreadingHTTPServer((host, port), self._build_handler())
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        API root to pass to SheetWriter / GoogleSheetStorageWriter.
+        """
+
+        host, port = self.http_server.server_address[:2]
+        return f"http://{host}:{port}/v4"
+
+    def fail_next(self, request_count: int, status_code: int = 429):
+        """
+        Make the next requests fail.
+
+        :param request_count: number of requests to fail
+        :param status_code: HTTP status returned
+        """
+
+        with self._lock:
+            self._failures_remaining = request_count
+            self._failure_status = status_code
+
+    def rows(self, sheet_name: str = "Deals") -> list:
+        """
+        All rows stored in a worksheet (across spreadsheets).
+
+        :param sheet_name: worksheet name
+        :return: list of row value lists
+        """
+
+        with self._lock:
+            return [
+                row
+                for (_, stored_sheet_name), sheet_rows in self.sheets.items()
+                if stored_sheet_name == sheet_name
+                for row in sheet_rows
+            ]
+
+    def _build_handler(self):
+        """
+        Build request handler class bound to this server state.
+        """
+
+        stub = self
+
+        class SheetsRequestHandler(BaseHTTPRequestHandler):
+
+            def _send_json(self, status_code: int, payload: dict):
+                body = json.dumps(payload).encode("utf-8")
+
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _route(self):
+                """
+                Parse path and apply injected failures.
+
+                :return: (spreadsheet_id, sheet_name, is_append) or None if already answered
+                """
+
+                with stub._lock:
+                    stub.request_count += 1
+
+                    if stub._failures_remaining > 0:
+                        stub._failures_remaining -= 1
+                        failure_status = stub._failure_status
+                    else:
+                        failure_status = None
+
+                if failure_status:
+                    self._send_json(failure_status, {"error": {"code": failure_status, "message": "Injected failure"}})
+                    return None
+
+                match = stub.VALUES_PATH.match(unquote(urlparse(self.path).path))
+
+                if not match:
+                    self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+                    return None
+
+                sheet_name = match.group("range").split("!")[0]
+
+                return match.group("spreadsheet_id"), sheet_name, bool(match.group("method"))
+
+            def do_GET(self):
+                route = self._route()
+
+                if route is None:
+                    return
+
+                spreadsheet_id, sheet_name, _ = route
+
+                with stub._lock:
+                    sheet_rows = list(stub.sheets.get((spreadsheet_id, sheet_name), []))
+
+                self._send_json(200, {"range": sheet_name, "values": sheet_rows[:1]} if sheet_rows else {"range": sheet_name})
+
+            def do_POST(self):
+                route = self._route()
+
+                if route is None:
+                    return
+
+                spreadsheet_id, sheet_name, is_append = route
+
+                if not is_append:
+                    self._send_json(400, {"error": {"code": 400, "message": "Only :append is supported"}})
+                    return
+
+                content_length = int(self.headers.get("Content-Length", 0))
+                request_body = json.loads(self.rfile.read(content_length) or b"{}")
+                appended_rows = request_body.get("values", [])
+
+                with stub._lock:
+                    sheet_rows = stub.sheets.setdefault((spreadsheet_id, sheet_name), [])
+                    start_row = len(sheet_rows) + 1
+                    sheet_rows.extend(appended_rows)
+                    stub.append_calls.append((sheet_name, len(appended_rows)))
+
+                self._send_json(200, {
+                    "spreadsheetId": spreadsheet_id,
+                    "updates": {
+                        "updatedRange": f"{sheet_name}!A{start_row}",
+                        "updatedRows": len(appended_rows)
+                    }
+                })
+
+            def log_message(self, format, *args):
+                # Keep test output quiet
+                pass
+
+        return SheetsRequestHandler
+
+    def start(self):
+        """
+        Serve requests in a background thread.
+        """
+
+        self.thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop serving and release the port.
+        """
+
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+# -------------------- Entry Point --------------------
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Run a local Google Sheets values API stand-in."
+    )
+
+    argument_parser.add_argument("--host", default="127.0.0.1")
+    argument_parser.add_argument("--port", type=int, default=8765)
+
+    arguments = argument_parser.parse_args()
+
+    stub_server = SheetsStubServer(arguments.host, arguments.port)
+    print(f"Sheets stand-in listening on {stub_server.base_url}")
+
+    try:
+        stub_server.http_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub_server.http_server.server_close()
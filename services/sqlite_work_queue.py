@@ -0,0 +1,291 @@
+# This class is the default work queue, stored in a SQLite file shared by all workers
+
+import json
+import sqlite3
+import threading
+import time
+
+from services.work_queue_base import WorkQueue
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    SQLite work queue implementation.
+
+    Every worker process opens the same database file. Leasing runs in a
+    BEGIN IMMEDIATE transaction, so two workers never lease the same
+    task. Lease deadlines are wall-clock timestamps, so hosts sharing the
+    file need reasonably synchronized clocks.
+
+    Each lease counts as an attempt. A failed task waits
+    retry_backoff_seconds (doubled per attempt) before it can be leased
+    again; after max_attempts it is marked dead and left for inspection.
+
+    WAL mode only works when all workers are on the same host. For
+    workers on several hosts sharing the file over a network file system,
+    use journal_mode="DELETE" (and a file system with working locks), or
+    implement WorkQueue on a server-based store.
+    """
+
+    def __init__(
+        self,
+        queue_path: str,
+        queue_name: str = "extract",
+        max_attempts: int = 5,
+        retry_backoff_seconds: float = 30,
+        journal_mode: str = "WAL"
+    ):
+        """
+        Open (or create) the queue database.
+
+        :param queue_path: SQLite file path
+        :param queue_name: logical queue within the file
+        :param max_attempts: leases before a task is marked dead
+        :param retry_backoff_seconds: delay before the first retry of a failed task
+        :param journal_mode: SQLite journal mode (WAL, or DELETE for network file systems)
+        """
+        self.queue_path = queue_path
+        self.queue_name = queue_name
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+        # Worker threads share one connection
+        self._lock = threading.Lock()
+
+        self.connection = sqlite3.connect(queue_path, isolation_level=None, check_same_thread=False, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute(f"PRAGMA journal_mode = {journal_mode}")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+
+        self._create_tables()
+
+    def _create_tables(self):
+        """
+        Create queue table if missing.
+        """
+
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS work_tasks (
+                queue_name TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                last_error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (queue_name, task_id)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_work_tasks_available
+            ON work_tasks (queue_name, status, available_at);
+        """)
+
+    def _transaction(self, work):
+        """
+        Run work(connection) in a write transaction.
+
+        :param work: callable receiving the connection
+        :return: work's return value
+        """
+
+        with self._lock:
+            # Take the write lock up front so concurrent leases serialize
+            self.connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                result = work(self.connection)
+                self.connection.execute("COMMIT")
+                return result
+
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    # -------------------- Producers --------------------
+
+    def enqueue(self, tasks: list) -> int:
+        """
+        Add tasks. Tasks whose task_id is already queued are ignored.
+
+        :param tasks: list of dictionaries with task_id and payload
+        :return: number of tasks added
+        """
+
+        now = time.time()
+
+        rows = [
+            (self.queue_name, task["task_id"], json.dumps(task["payload"]), now, now, now)
+            for task in tasks
+            if task.get("task_id")
+        ]
+
+        def insert(connection):
+            cursor = connection.executemany("""
+                INSERT OR IGNORE INTO work_tasks (queue_name, task_id, payload, status, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, 'pending', ?, ?, ?)
+            """, rows)
+
+            return cursor.rowcount
+
+        return self._transaction(insert) if rows else 0
+
+    # -------------------- Workers --------------------
+
+    def lease(self, worker_id: str, max_tasks: int = 1, lease_seconds: float = 300) -> list:
+        """
+        Take available tasks for exclusive processing.
+
+        Pending tasks that are due and leased tasks whose lease expired
+        are both available; an expired task that used up its attempts is
+        marked dead instead.
+
+        :param worker_id: unique id of the calling worker
+        :param max_tasks: maximum tasks to lease
+        :param lease_seconds: time until the lease expires without a heartbeat
+        :return: list of dictionaries with task_id, payload and attempts
+        """
+
+        def take(connection):
+            now = time.time()
+
+            connection.execute("""
+                UPDATE work_tasks
+                SET status = 'dead', last_error = COALESCE(last_error, 'lease expired'), lease_owner = NULL, updated_at = ?
+                WHERE queue_name = ? AND status = 'leased' AND lease_expires_at <= ? AND attempts >= ?
+            """, (now, self.queue_name, now, self.max_attempts))
+
+            rows = connection.execute("""
+                SELECT task_id, payload, attempts
+                FROM work_tasks
+                WHERE queue_name = ?
+                  AND ((status = 'pending' AND available_at <= ?) OR (status = 'leased' AND lease_expires_at <= ?))
+                ORDER BY available_at
+                LIMIT ?
+            """, (self.queue_name, now, now, max_tasks)).fetchall()
+
+            connection.executemany("""
+                UPDATE work_tasks
+                SET status = 'leased', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1, updated_at = ?
+                WHERE queue_name = ? AND task_id = ?
+            """, [
+                (worker_id, now + lease_seconds, now, self.queue_name, row["task_id"])
+                for row in rows
+            ])
+
+            return [
+                {"task_id": row["task_id"], "payload": json.loads(row["payload"]), "attempts": row["attempts"] + 1}
+                for row in rows
+            ]
+
+        return self._transaction(take)
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float = 300) -> bool:
+        """
+        Extend a lease held by worker_id.
+
+        :param task_id: leased task
+        :param worker_id: lease owner
+        :param lease_seconds: new time until the lease expires
+        :return: False if the lease was lost (expired and taken by another worker)
+        """
+
+        def extend(connection):
+            now = time.time()
+
+            cursor = connection.execute("""
+                UPDATE work_tasks
+                SET lease_expires_at = ?, updated_at = ?
+                WHERE queue_name = ? AND task_id = ? AND status = 'leased' AND lease_owner = ?
+            """, (now + lease_seconds, now, self.queue_name, task_id, worker_id))
+
+            return cursor.rowcount == 1
+
+        return self._transaction(extend)
+
+    def complete(self, task_id: str, worker_id: str, result: str = None) -> bool:
+        """
+        Mark task done. Idempotent: completing a task twice (e.g. after a
+        lost lease) is harmless, and a finished task is never reopened.
+
+        :param task_id: finished task
+        :param worker_id: worker reporting completion
+        :param result: optional short result description
+        :return: True if this call completed the task, False if it was already done
+        """
+
+        def finish(connection):
+            cursor = connection.execute("""
+                UPDATE work_tasks
+                SET status = 'done', result = ?, lease_owner = ?, lease_expires_at = NULL, updated_at = ?
+                WHERE queue_name = ? AND task_id = ? AND status != 'done'
+            """, (result, worker_id, time.time(), self.queue_name, task_id))
+
+            return cursor.rowcount == 1
+
+        return self._transaction(finish)
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> str:
+        """
+        Release a task after an error so it is retried later, or give up
+        once it reached the maximum number of attempts.
+
+        :param task_id: failed task
+        :param worker_id: lease owner
+        :param error: error description
+        :return: new task status ("pending" or "dead"), or None if the lease was lost
+        """
+
+        def release(connection):
+            row = connection.execute("""
+                SELECT attempts FROM work_tasks
+                WHERE queue_name = ? AND task_id = ? AND status = 'leased' AND lease_owner = ?
+            """, (self.queue_name, task_id, worker_id)).fetchone()
+
+            if row is None:
+                return None
+
+            now = time.time()
+            attempts = row["attempts"]
+
+            new_status = "dead" if attempts >= self.max_attempts else "pending"
+            available_at = now + self.retry_backoff_seconds * (2 ** (attempts - 1))
+
+            connection.execute("""
+                UPDATE work_tasks
+                SET status = ?, available_at = ?, lease_owner = NULL, lease_expires_at = NULL, last_error = ?, updated_at = ?
+                WHERE queue_name = ? AND task_id = ?
+            """, (new_status, available_at, error, now, self.queue_name, task_id))
+
+            return new_status
+
+        return self._transaction(release)
+
+    # -------------------- Inspection --------------------
+
+    def counts(self) -> dict:
+        """
+        Number of tasks per status.
+
+        :return: dictionary status -> count
+        """
+
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT status, COUNT(*) FROM work_tasks WHERE queue_name = ? GROUP BY status",
+                (self.queue_name,)
+            ).fetchall()
+
+        return {row[0]: row[1] for row in rows}
+
+    def close(self):
+        """
+        Close the connection.
+        """
+
+        with self._lock:
+            self.connection.close()
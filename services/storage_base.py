@@ -11,6 +11,13 @@ class StorageWriter:
         """
         Save structured deals to storage.
 
-        :param structured_deals: List of structured deal dictionaries
+        Failure contract: writers report errors instead of raising.
+        The returned dictionary holds integer counters (e.g. inserted,
+        ignored) and "failed_urls", the source URLs of deals that could
+        not be written. A writer that buffers may return the same kind of
+        dictionary from close() for rows it could not flush.
+
+        :param structured_deals: List of Deal records or deal dictionaries
+        :return: Dictionary with counters and failed_urls
         """
         raise NotImplementedError("Subclasses must implement save_structured_deals()")
@@ -0,0 +1,288 @@
+# This class persists deals to several storage backends concurrently in the background
+
+import atexit
+import queue
+import threading
+import time
+
+from services.storage_base import StorageWriter
+from utils.metrics import metrics_registry
+
+
+# Queue marker telling a backend worker to drain and stop
+_SHUTDOWN = object()
+
+
+class _BackendWorker:
+    """
+    Background writer thread for one storage backend.
+
+    Deals are taken from a bounded queue and written in micro-batches,
+    flushed when batch_size deals are collected or max_batch_delay_seconds
+    have passed since the first deal of the batch. While the queue is
+    idle, a buffering backend's flush_if_due() is called every
+    max_batch_delay_seconds, so its time limit holds without new deals.
+    """
+
+    def __init__(self, storage_writer: StorageWriter, queue_size: int, batch_size: int, max_batch_delay_seconds: float):
+        """
+        :param storage_writer: backend receiving the batches
+        :param queue_size: maximum deals waiting for this backend
+        :param batch_size: maximum deals per write
+        :param max_batch_delay_seconds: maximum time a deal waits for its batch to fill
+        """
+        self.storage_writer = storage_writer
+        self.name = type(storage_writer).__name__
+        self.batch_size = batch_size
+        self.max_batch_delay_seconds = max_batch_delay_seconds
+
+        self.deal_queue = queue.Queue(maxsize=queue_size)
+
+        self.written_deals = 0
+        self.failed_deals = 0
+        self.write_results = {}
+
+        # Source URLs this backend reported as not written
+        self.failed_urls = set()
+
+        self.thread = threading.Thread(target=self._run, name=f"storage-{self.name}", daemon=True)
+        self.thread.start()
+
+    def _collect_batch(self):
+        """
+        Block for the first deal, then gather more until size or time limit.
+
+        :return: (batch list, True if shutdown marker was received)
+        """
+
+        while True:
+            try:
+                first_item = self.deal_queue.get(timeout=self.max_batch_delay_seconds)
+                break
+
+            except queue.Empty:
+                self._flush_if_due()
+
+        if first_item is _SHUTDOWN:
+            return [], True
+
+        batch = [first_item]
+        batch_deadline = time.monotonic() + self.max_batch_delay_seconds
+
+        while len(batch) < self.batch_size:
+            remaining_seconds = batch_deadline - time.monotonic()
+
+            if remaining_seconds <= 0:
+                break
+
+            try:
+                next_item = self.deal_queue.get(timeout=remaining_seconds)
+            except queue.Empty:
+                break
+
+            if next_item is _SHUTDOWN:
+                return batch, True
+
+            batch.append(next_item)
+
+        return batch, False
+
+    def _flush_if_due(self):
+        """
+        Let a buffering backend send rows that have waited too long.
+        """
+
+        flush_if_due = getattr(self.storage_writer, "flush_if_due", None)
+
+        if not callable(flush_if_due):
+            return
+
+        try:
+            flush_if_due()
+        except Exception as error:
+            print(f"{self.name} timed flush failed: {error}")
+
+    def _record_failures(self, failed_urls: list):
+        """
+        Move deals reported by the writer from written to failed.
+
+        :param failed_urls: source URLs the writer could not write
+        """
+
+        self.written_deals -= len(failed_urls)
+        self.failed_deals += len(failed_urls)
+        self.failed_urls.update(failed_urls)
+
+        metrics_registry.increment("storage_failed_deals_total", len(failed_urls), backend=self.name)
+
+    def _write_batch(self, batch: list):
+        """
+        Write one batch, recording counts.
+
+        Writers report failed deals in "failed_urls" (see StorageWriter);
+        an exception counts the whole batch as failed.
+
+        :param batch: deals to write
+        """
+
+        started_at = time.perf_counter()
+
+        try:
+            write_result = self.storage_writer.save_structured_deals(batch)
+
+        except Exception as error:
+            print(f"{self.name} background write failed: {error}")
+            write_result = {"failed_urls": [deal.get("source_url") for deal in batch]}
+
+        metrics_registry.observe("storage_write_seconds", time.perf_counter() - started_at, backend=self.name)
+        metrics_registry.increment("storage_deals_total", len(batch), backend=self.name)
+        metrics_registry.set_gauge("storage_queue_depth", self.deal_queue.qsize(), backend=self.name)
+
+        self.written_deals += len(batch)
+
+        if isinstance(write_result, dict):
+            self._record_failures(write_result.get("failed_urls") or [])
+
+            # Sum inserted/ignored style counters returned by writers
+            for counter_name, counter_value in write_result.items():
+                if isinstance(counter_value, int):
+                    self.write_results[counter_name] = self.write_results.get(counter_name, 0) + counter_value
+
+        for _ in batch:
+            self.deal_queue.task_done()
+
+    def _run(self):
+        """
+        Worker loop: write batches until the shutdown marker arrives.
+        """
+
+        while True:
+            batch, shutdown_requested = self._collect_batch()
+
+            if batch:
+                self._write_batch(batch)
+
+            if shutdown_requested:
+                # Account for the marker itself
+                self.deal_queue.task_done()
+                break
+
+        # Backend is closed by the thread that used it
+        close_method = getattr(self.storage_writer, "close", None)
+
+        if callable(close_method):
+            try:
+                close_result = close_method()
+
+                # Buffering writers report rows they could not flush
+                if isinstance(close_result, dict):
+                    self._record_failures(close_result.get("failed_urls") or [])
+
+            except Exception as error:
+                print(f"{self.name} close failed: {error}")
+
+
+class StorageFanOut(StorageWriter):
+    """
+    Write-behind fan-out to any list of StorageWriter backends.
+
+    save_structured_deals() only enqueues; each backend has its own
+    bounded queue and writer thread, so backends write concurrently and
+    a slow backend does not delay the others. A full queue blocks the
+    caller (backpressure). close() - also registered at interpreter
+    exit - flushes every queued deal before returning.
+    """
+
+    def __init__(
+        self,
+        storage_writers: list,
+        queue_size: int = 1000,
+        batch_size: int = 200,
+        max_batch_delay_seconds: float = 1.0
+    ):
+        """
+        Start one background writer per backend.
+
+        :param storage_writers: list of StorageWriter instances
+        :param queue_size: maximum deals buffered per backend
+        :param batch_size: maximum deals per backend write
+        :param max_batch_delay_seconds: maximum time a deal waits before being written
+        """
+
+        self.backend_workers = [
+            _BackendWorker(storage_writer, queue_size, batch_size, max_batch_delay_seconds)
+            for storage_writer in storage_writers
+        ]
+
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+        atexit.register(self.close)
+
+    def save_structured_deals(self, structured_deals: list):
+        """
+        Enqueue deals for every backend. Blocks while a backend queue is full.
+
+        :param structured_deals: List of Deal records or deal dictionaries
+        """
+
+        if self._closed:
+            raise RuntimeError("StorageFanOut is closed")
+
+        for backend_worker in self.backend_workers:
+            for deal in structured_deals:
+                backend_worker.deal_queue.put(deal)
+
+    def flush(self):
+        """
+        Block until every deal enqueued so far has been written (or failed).
+        """
+
+        for backend_worker in self.backend_workers:
+            backend_worker.deal_queue.join()
+
+    def close(self):
+        """
+        Flush all queues, stop writer threads and close backends.
+        Safe to call more than once.
+        """
+
+        with self._close_lock:
+            if self._closed:
+                return
+
+            self._closed = True
+
+        for backend_worker in self.backend_workers:
+            backend_worker.deal_queue.put(_SHUTDOWN)
+
+        for backend_worker in self.backend_workers:
+            backend_worker.thread.join()
+
+        atexit.unregister(self.close)
+
+    def failed_urls(self) -> set:
+        """
+        Source URLs that at least one backend failed to write.
+
+        :return: set of source URLs
+        """
+
+        return set().union(*(backend_worker.failed_urls for backend_worker in self.backend_workers))
+
+    def stats(self) -> dict:
+        """
+        Per-backend write counters and current queue depth.
+
+        :return: dictionary keyed by backend class name
+        """
+
+        return {
+            backend_worker.name: {
+                "written": backend_worker.written_deals,
+                "failed": backend_worker.failed_deals,
+                "queued": backend_worker.deal_queue.qsize(),
+                **backend_worker.write_results
+            }
+            for backend_worker in self.backend_workers
+        }
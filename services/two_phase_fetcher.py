@@ -0,0 +1,195 @@
+# This service fetches article metadata first and full text only for likely deal articles
+
+import re
+
+from utils.metrics import metrics_registry
+
+
+# GNews cuts content on most plans and appends e.g. "... [2817 chars]"
+TRUNCATED_CONTENT_PATTERN = re.compile(r"\s*(\.\.\.|…)\s*\[\d+ chars\]\s*$")
+
+
+class TwoPhaseFetcher:
+    """
+    Two-phase article fetching.
+
+    Phase one (fetch_articles) lists lightweight metadata from GDELT
+    artlist or GNews search: title, description, URL, source, date.
+    Phase two (fetch_content) retrieves full text only for articles that
+    pass the keyword and classifier gates (is_candidate), with the
+    article scraper; GNews content is used as-is when it is complete.
+    Rejected articles never cost a page download, so bandwidth and
+    quota spend fall with the rejection rate.
+
+    Listed articles are normalized to the GNews shape and also carry
+    seendescription, the field KeywordEngine and DealClassifier read.
+    """
+
+    LISTING_SOURCES = ("gnews", "gdelt")
+
+    def __init__(
+        self,
+        listing_fetcher,
+        listing_source: str = "gnews",
+        article_scraper=None,
+        keyword_engine=None,
+        deal_classifier=None,
+        min_content_chars: int = 200
+    ):
+        """
+        :param listing_fetcher: GNewsFetcher or NewsFetcher (GDELT) for phase one
+        :param listing_source: "gnews" or "gdelt", the response shape of listing_fetcher
+        :param article_scraper: ArticleScraper for phase two (None: listing content only)
+        :param keyword_engine: KeywordEngine gate (None: no keyword gate)
+        :param deal_classifier: DealClassifier gate (None: no classifier gate)
+        :param min_content_chars: shorter listing content is treated as incomplete
+        """
+
+        if listing_source not in self.LISTING_SOURCES:
+            raise ValueError(f"Unknown listing source: {listing_source}")
+
+        self.listing_fetcher = listing_fetcher
+        self.listing_source = listing_source
+        self.article_scraper = article_scraper
+        self.keyword_engine = keyword_engine
+        self.deal_classifier = deal_classifier
+        self.min_content_chars = min_content_chars
+
+    # -------------------- Phase one: metadata --------------------
+
+    def _normalize(self, article: dict) -> dict:
+        """
+        Bring a listed article into the GNews shape.
+
+        :param article: GNews or GDELT article
+        :return: normalized article dictionary
+        """
+
+        if self.listing_source == "gdelt":
+            return {
+                "title": article.get("title", ""),
+                "description": article.get("seendescription", ""),
+                "seendescription": article.get("seendescription", ""),
+                "content": "",
+                "url": article.get("url"),
+                "image": article.get("socialimage"),
+                "publishedAt": article.get("seendate"),
+                "source": {"name": article.get("domain"), "url": article.get("domain")}
+            }
+
+        normalized_article = dict(article)
+        normalized_article["seendescription"] = article.get("description") or ""
+
+        return normalized_article
+
+    def fetch_articles(self, query: str, max_records: int = 10, priority: str = "normal"):
+        """
+        Phase one: list article metadata for a query.
+        Same signature as the fetchers, so MultiQueryFetcher can wrap it.
+
+        :param query: search keywords
+        :param max_records: number of articles to list
+        :param priority: passed to the listing fetcher's rate limiter
+        :return: list of normalized article dictionaries
+        """
+
+        listed_articles = self.listing_fetcher.fetch_articles(query, max_records=max_records, priority=priority)
+
+        return [self._normalize(article) for article in listed_articles]
+
+    def is_candidate(self, article: dict) -> bool:
+        """
+        Keyword and classifier gates on title and description.
+        Attaches deal_score when the classifier runs.
+
+        :param article: normalized article
+        :return: True if the article's full text should be fetched
+        """
+
+        if self.keyword_engine and not self.keyword_engine.filter_articles([article]):
+            metrics_registry.increment("two_phase_articles_total", result="rejected_keywords")
+            return False
+
+        if self.deal_classifier:
+            is_deal, deal_score = self.deal_classifier.classify_article(article)
+            article["deal_score"] = deal_score
+
+            if not is_deal:
+                metrics_registry.increment("two_phase_articles_total", result="rejected_classifier")
+                return False
+
+        metrics_registry.increment("two_phase_articles_total", result="candidate")
+
+        return True
+
+    # -------------------- Phase two: full text --------------------
+
+    def is_complete(self, content: str) -> bool:
+        """
+        Whether listing content can be used without scraping.
+
+        :param content: article content from the listing
+        :return: True if not truncated and long enough
+        """
+
+        return bool(content) and len(content) >= self.min_content_chars and not TRUNCATED_CONTENT_PATTERN.search(content)
+
+    def fetch_content(self, article: dict):
+        """
+        Phase two: make sure a candidate article carries its full text.
+
+        Order: complete listing content, scraped page, then the truncated
+        listing content or description as a last resort (marked with
+        content_truncated so it can be told apart later).
+
+        :param article: candidate article
+        :return: article with content, or None if no text is available
+        """
+
+        if self.is_complete(article.get("content")):
+            metrics_registry.increment("content_fetch_total", source="listing")
+            return article
+
+        if self.article_scraper and article.get("url"):
+            scraped_text = self.article_scraper.fetch_article_text(article["url"])
+
+            if scraped_text:
+                article["content"] = scraped_text
+                metrics_registry.increment("content_fetch_total", source="scraper")
+                return article
+
+        fallback_text = TRUNCATED_CONTENT_PATTERN.sub("", article.get("content") or "") or article.get("description")
+
+        if fallback_text:
+            article["content"] = fallback_text
+            article["content_truncated"] = True
+            metrics_registry.increment("content_fetch_total", source="fallback")
+            return article
+
+        metrics_registry.increment("content_fetch_total", source="failed")
+
+        return None
+
+    def fetch_candidates(self, query: str, max_records: int = 10, priority: str = "normal") -> list:
+        """
+        Both phases for one query, sequentially (for scripts; the main
+        pipeline runs them as separate stages).
+
+        :param query: search keywords
+        :param max_records: number of articles to list
+        :param priority: passed to the listing fetcher's rate limiter
+        :return: candidate articles with content
+        """
+
+        candidate_articles = []
+
+        for article in self.fetch_articles(query, max_records=max_records, priority=priority):
+            if not self.is_candidate(article):
+                continue
+
+            article = self.fetch_content(article)
+
+            if article:
+                candidate_articles.append(article)
+
+        return candidate_articles
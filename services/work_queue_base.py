@@ -0,0 +1,83 @@
+# This base class defines common interface for all work queue backends
+
+
+class WorkQueue:
+    """
+    Base work queue interface.
+
+    A task is a dictionary with "task_id" (unique, e.g. the article URL)
+    and a JSON-serializable "payload". Workers lease tasks for a limited
+    time, extend the lease with heartbeats while working and then
+    complete or fail them. A task whose lease expires (worker crashed or
+    hung) becomes available to other workers again.
+
+    Task statuses: pending, leased, done, dead (gave up after max attempts)
+    """
+
+    def enqueue(self, tasks: list) -> int:
+        """
+        Add tasks. Tasks whose task_id is already queued are ignored.
+
+        :param tasks: list of dictionaries with task_id and payload
+        :return: number of tasks added
+        """
+        raise NotImplementedError("Subclasses must implement enqueue()")
+
+    def lease(self, worker_id: str, max_tasks: int = 1, lease_seconds: float = 300) -> list:
+        """
+        Take available tasks for exclusive processing.
+
+        :param worker_id: unique id of the calling worker
+        :param max_tasks: maximum tasks to lease
+        :param lease_seconds: time until the lease expires without a heartbeat
+        :return: list of dictionaries with task_id, payload and attempts
+        """
+        raise NotImplementedError("Subclasses must implement lease()")
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float = 300) -> bool:
+        """
+        Extend a lease held by worker_id.
+
+        :param task_id: leased task
+        :param worker_id: lease owner
+        :param lease_seconds: new time until the lease expires
+        :return: False if the lease was lost (expired and taken by another worker)
+        """
+        raise NotImplementedError("Subclasses must implement heartbeat()")
+
+    def complete(self, task_id: str, worker_id: str, result: str = None) -> bool:
+        """
+        Mark task done. Idempotent: completing a task twice (e.g. after a
+        lost lease) is harmless.
+
+        :param task_id: finished task
+        :param worker_id: worker reporting completion
+        :param result: optional short result description
+        :return: True if this call completed the task, False if it was already done
+        """
+        raise NotImplementedError("Subclasses must implement complete()")
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> str:
+        """
+        Release a task after an error so it is retried later, or give up
+        once it reached the maximum number of attempts.
+
+        :param task_id: failed task
+        :param worker_id: lease owner
+        :param error: error description
+        :return: new task status ("pending" or "dead"), or None if the lease was lost
+        """
+        raise NotImplementedError("Subclasses must implement fail()")
+
+    def counts(self) -> dict:
+        """
+        Number of tasks per status.
+
+        :return: dictionary status -> count
+        """
+        raise NotImplementedError("Subclasses must implement counts()")
+
+    def close(self):
+        """
+        Release resources.
+        """
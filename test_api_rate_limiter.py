@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from services.api_rate_limiter import ApiRateLimiter, QuotaExhaustedError
+
+
+def make_limiter(tmp_path, **kwargs) -> ApiRateLimiter:
+    settings = {"api_name": "gnews", "requests_per_second": 20, "burst": 1}
+    settings.update(kwargs)
+
+    return ApiRateLimiter(str(tmp_path / "limits.db"), **settings)
+
+
+def test_bucket_is_shared_between_instances(tmp_path):
+    # Two instances stand in for two processes using the same state file
+    first_limiter = make_limiter(tmp_path)
+    second_limiter = make_limiter(tmp_path)
+
+    started_at = time.monotonic()
+
+    for _ in range(3):
+        first_limiter.acquire()
+        second_limiter.acquire()
+
+    # Six calls at 20/s with a burst of one take at least 5/20 s
+    assert time.monotonic() - started_at >= 0.24
+    assert first_limiter.remaining_quota()["used"] == 6
+
+
+def test_acquire_times_out_instead_of_waiting(tmp_path):
+    limiter = make_limiter(tmp_path, requests_per_second=0.5)
+
+    assert limiter.acquire(timeout_seconds=0.1)
+    assert not limiter.acquire(timeout_seconds=0.1)
+
+
+def test_low_priority_calls_are_refused_near_the_cap(tmp_path):
+    limiter = make_limiter(tmp_path, requests_per_second=1000, daily_quota=5, low_priority_reserve=2)
+
+    for _ in range(3):
+        limiter.acquire(priority="low")
+
+    with pytest.raises(QuotaExhaustedError):
+        limiter.acquire(priority="low")
+
+    # The reserve is still open to normal queries
+    limiter.acquire()
+    limiter.acquire()
+
+    with pytest.raises(QuotaExhaustedError):
+        limiter.acquire()
+
+    quota = limiter.remaining_quota()
+
+    assert quota["used"] == 5
+    assert quota["remaining"] == 0
+    assert quota["refused"] == 2
+
+
+def test_pause_blocks_every_instance(tmp_path):
+    first_limiter = make_limiter(tmp_path, requests_per_second=1000, burst=5)
+    second_limiter = make_limiter(tmp_path, requests_per_second=1000, burst=5)
+
+    first_limiter.pause(0.3)
+
+    started_at = time.monotonic()
+    second_limiter.acquire()
+
+    assert time.monotonic() - started_at >= 0.25
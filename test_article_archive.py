@@ -0,0 +1,70 @@
+import os
+import shutil
+
+from services.article_archive import PACK_RECORD_HEADER, PACK_RECORD_MAGIC, ArticleArchive
+
+
+def article(number):
+    return {"url": f"https://a/{number}", "title": f"Deal {number}", "content": f"Army orders {number} drones. " * 20}
+
+
+def test_torn_tail_is_truncated_before_new_appends(tmp_path):
+    archive = ArticleArchive(str(tmp_path))
+    content_hashes = [archive.put(article(number)) for number in range(3)]
+    archive.close()
+
+    pack_path = tmp_path / "pack-00000.pack"
+    intact_size = os.path.getsize(pack_path)
+
+    # Crash mid-append: a full header announcing 500 bytes, then only part of the payload
+    with open(pack_path, "ab") as pack_file:
+        pack_file.write(PACK_RECORD_HEADER.pack(PACK_RECORD_MAGIC, bytes(range(32)), 1, 500) + b"partial")
+
+    archive = ArticleArchive(str(tmp_path))
+
+    assert os.path.getsize(pack_path) == intact_size
+
+    content_hashes.append(archive.put(article(3)))
+
+    assert [content_hash for content_hash, _ in archive.iter_articles()] == content_hashes
+    assert archive.get(content_hashes[-1])["url"] == "https://a/3"
+
+    archive.close()
+
+
+def test_stale_index_is_rebuilt_and_scans_skip_damaged_bytes(tmp_path):
+    archive = ArticleArchive(str(tmp_path))
+    first_hash = archive.put(article(0))
+    archive.close()
+
+    shutil.copy(tmp_path / "index.bin", tmp_path / "index.old")
+
+    archive = ArticleArchive(str(tmp_path))
+    second_hash = archive.put(article(1))
+    archive.close()
+
+    # Index from before the second append, as after a crash that lost its pages
+    os.replace(tmp_path / "index.old", tmp_path / "index.bin")
+
+    archive = ArticleArchive(str(tmp_path))
+
+    assert archive.contains(first_hash) and archive.contains(second_hash)
+
+    archive.close()
+
+    # Garbage between records (left by an older version appending after a torn write)
+    pack_path = tmp_path / "pack-00000.pack"
+    pack_bytes = open(pack_path, "rb").read()
+    second_offset = pack_bytes.index(PACK_RECORD_MAGIC, 1)
+
+    with open(pack_path, "wb") as pack_file:
+        pack_file.write(pack_bytes[:second_offset] + b"\x00garbage" + pack_bytes[second_offset:])
+
+    os.remove(tmp_path / "index.bin")
+
+    archive = ArticleArchive(str(tmp_path))
+
+    assert [content_hash for content_hash, _ in archive.iter_articles()] == [first_hash, second_hash]
+    assert archive.get(second_hash)["url"] == "https://a/1"
+
+    archive.close()
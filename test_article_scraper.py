@@ -0,0 +1,149 @@
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.article_scraper import ArticleScraper, canonical_url
+
+
+ARTICLE_HTML = "<html><head><link rel='canonical' href='/news/deal'></head><body><p>" + "Army orders drones. " * 20 + "</p></body></html>"
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with SiteHandler.lock:
+            SiteHandler.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+            SiteHandler.in_flight += 1
+            SiteHandler.max_in_flight = max(SiteHandler.max_in_flight, SiteHandler.in_flight)
+
+        try:
+            if self.path == "/robots.txt":
+                self._send(200, b"User-agent: *\nDisallow: /private\n", "text/plain")
+            elif self.path.startswith("/paywall"):
+                self._send(403, b"subscribe")
+            elif self.path.startswith("/slow"):
+                time.sleep(0.05)
+                self._send(200, ARTICLE_HTML.encode())
+            elif self.path.startswith("/utf8"):
+                self._send(200, ("<html><body><p>" + "Général Dynamics wins €40 million order. " * 10 + "</p></body></html>").encode("utf-8"))
+            elif self.path.startswith("/huge"):
+                self._send(200, ARTICLE_HTML.encode() + b"x" * 100000)
+            elif self.headers.get("If-None-Match") == '"v1"':
+                self._send(304, b"")
+            else:
+                self._send(200, ARTICLE_HTML.encode(), headers={"ETag": '"v1"'})
+        finally:
+            with SiteHandler.lock:
+                SiteHandler.in_flight -= 1
+
+    def _send(self, status, body, content_type="text/html", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_site():
+    SiteHandler.requests_seen = []
+    SiteHandler.max_in_flight = 0
+
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+
+    return http_server, f"http://127.0.0.1:{http_server.server_address[1]}"
+
+
+def strip_tags(html):
+    return re.sub(r"<[^>]+>", "", html).strip()
+
+
+def build_scraper(tmp_path, **options):
+    return ArticleScraper(cache_path=str(tmp_path / "scrape_cache.db"), domain_delay_seconds=0, text_extractor=strip_tags, **options)
+
+
+def test_canonical_url_drops_tracking_and_fragment():
+    assert canonical_url("HTTPS://Example.com:443/news/deal/?utm_source=x&b=2&a=1#top") == "https://example.com/news/deal?a=1&b=2"
+
+
+def test_cached_text_is_revalidated_and_shared_by_canonical_variants(tmp_path):
+    http_server, site_url = start_site()
+    scraper = build_scraper(tmp_path, revalidate_after_seconds=0)
+
+    try:
+        first_text = scraper.fetch_article_text(site_url + "/news/deal?utm_source=feed")
+        second_text = scraper.fetch_article_text(site_url + "/news/deal")
+
+        assert first_text.startswith("Army orders drones.")
+        assert second_text == first_text
+
+        page_requests = [request for request in SiteHandler.requests_seen if request[0] != "/robots.txt"]
+
+        assert page_requests[0][1] is None
+        assert page_requests[1][1] == '"v1"'
+
+    finally:
+        scraper.close()
+        http_server.shutdown()
+
+
+def test_robots_and_paywall_failures_are_cached_negatively(tmp_path):
+    http_server, site_url = start_site()
+    scraper = build_scraper(tmp_path)
+
+    try:
+        for _ in range(2):
+            assert scraper.fetch_article_text(site_url + "/private/deal") is None
+            assert scraper.fetch_article_text(site_url + "/paywall/deal") is None
+
+        paths = [request[0] for request in SiteHandler.requests_seen]
+
+        assert paths.count("/robots.txt") == 1
+        assert paths.count("/paywall/deal") == 1
+        assert "/private/deal" not in paths
+
+    finally:
+        scraper.close()
+        http_server.shutdown()
+
+
+def test_batch_respects_per_domain_limit_and_size_cap(tmp_path):
+    http_server, site_url = start_site()
+    scraper = build_scraper(tmp_path, max_workers=8, max_per_domain=2, max_response_bytes=len(ARTICLE_HTML) + 100)
+
+    try:
+        urls = [f"{site_url}/slow/{number}" for number in range(6)] + [site_url + "/huge"]
+
+        texts = scraper.fetch_article_texts(urls)
+
+        assert all(texts[url].startswith("Army orders drones.") for url in urls[:6])
+        assert len(texts[site_url + "/huge"]) < 600
+        assert SiteHandler.max_in_flight <= 2
+
+    finally:
+        scraper.close()
+        http_server.shutdown()
+
+
+def test_utf8_page_without_declared_charset_is_decoded(tmp_path):
+    http_server, site_url = start_site()
+    scraper = build_scraper(tmp_path)
+
+    try:
+        assert scraper.fetch_article_text(site_url + "/utf8").startswith("Général Dynamics wins €40 million order.")
+
+    finally:
+        scraper.close()
+        http_server.shutdown()
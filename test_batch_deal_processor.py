@@ -0,0 +1,96 @@
+import random
+
+from utils.batch_deal_processor import BatchDealProcessor
+from utils.confidence_scorer import ConfidenceScorer
+from utils.value_quantity_normalizer import ValueQuantityNormalizer
+
+
+def random_deal(random_generator: random.Random) -> dict:
+    """
+    Build a deal with the kinds of messy values the LLM returns.
+    """
+
+    def maybe(value):
+        return random_generator.choice([value, None, ""])
+
+    number_text = random_generator.choice(["5", "1,200", "3.75", "0", "12.5", "700"])
+
+    deal_value = random_generator.choice([
+        f"${number_text} million",
+        f"€{number_text}bn",
+        f"£{number_text} billion",
+        f"{number_text}M",
+        f"₹{number_text} thousand",
+        f"{number_text}k",
+        f"about {number_text}",
+        "undisclosed",
+        random_generator.randint(0, 10 ** 9),
+        random_generator.uniform(0, 10 ** 6),
+        None,
+        ""
+    ])
+
+    quantity = random_generator.choice([
+        f"{number_text}+",
+        f"about {number_text} systems",
+        "several",
+        random_generator.randint(0, 1000),
+        None,
+        ""
+    ])
+
+    return {
+        "buyer": maybe("Polish Army"),
+        "seller": maybe("Kongsberg"),
+        "product": maybe("counter-drone system"),
+        "quantity": quantity,
+        "deal_value": deal_value,
+        "currency": maybe("USD"),
+        "deal_date": maybe("2026-07-01"),
+        "summary": random_generator.choice(["", "Order signed", "Order for 12 radars"]),
+        "source_url": f"https://example.com/{random_generator.random()}"
+    }
+
+
+def test_batch_matches_scalar_rules():
+    """
+    BatchDealProcessor must give the same results as the per-deal
+    normalizer and confidence scorer it replaces.
+    """
+
+    random_generator = random.Random(2026)
+    raw_deals = [random_deal(random_generator) for _ in range(5000)]
+
+    normalizer = ValueQuantityNormalizer()
+    confidence_scorer = ConfidenceScorer()
+
+    processed_deals = BatchDealProcessor().process_deals(raw_deals)
+
+    assert len(processed_deals) == len(raw_deals)
+
+    for raw_deal, processed_deal in zip(raw_deals, processed_deals):
+        expected_value = normalizer.normalize_deal_value(raw_deal["deal_value"], raw_deal["currency"])
+        expected_quantity = normalizer.normalize_quantity(raw_deal["quantity"])
+        expected_confidence = confidence_scorer.calculate_confidence(raw_deal)
+
+        assert processed_deal.deal_value_normalized == expected_value, raw_deal
+        assert processed_deal.quantity_normalized == expected_quantity, raw_deal
+        assert processed_deal.confidence == expected_confidence, raw_deal
+
+
+def test_single_deal_path_matches_batch():
+    random_generator = random.Random(7)
+    raw_deals = [random_deal(random_generator) for _ in range(2000)]
+    raw_deals.append({"buyer": "Army", "summary": None, "deal_value": "$5 million", "source_url": "https://example.com/none"})
+
+    batch_deal_processor = BatchDealProcessor()
+
+    batch_deals = batch_deal_processor.process_deals(raw_deals)
+    single_deals = [batch_deal_processor.process_deal(raw_deal) for raw_deal in raw_deals]
+
+    assert single_deals == batch_deals
+
+
+if __name__ == "__main__":
+    test_batch_matches_scalar_rules()
+    print("Batch and scalar rules agree.")
@@ -0,0 +1,27 @@
+from services.multi_query_fetcher import MultiQueryFetcher
+from utils.bounded_set import BoundedSet
+
+
+def test_oldest_members_are_evicted_beyond_max_size():
+    bounded_set = BoundedSet(max_size=2, members=["a", "b"])
+
+    bounded_set.add("a")
+    bounded_set.add("c")
+
+    assert list(bounded_set) == ["a", "c"]
+    assert "b" not in bounded_set
+    assert len(BoundedSet(members=range(1000))) == 1000
+
+
+def test_multi_query_fetcher_remembers_a_bounded_url_window():
+    class Fetcher:
+        def fetch_articles(self, query, max_records=5, priority="normal"):
+            return [{"url": f"https://a/{query}"}]
+
+    multi_fetcher = MultiQueryFetcher(Fetcher(), max_seen_urls=2)
+
+    for query in ["1", "2", "3", "1"]:
+        multi_fetcher.fetch_query(query)
+
+    assert len(multi_fetcher.seen_urls) == 2
+    assert "https://a/1" in multi_fetcher.seen_urls
@@ -0,0 +1,22 @@
+from benchmarks.corpus_generator import SyntheticCorpusGenerator
+
+
+def test_same_seed_same_corpus():
+    first = list(SyntheticCorpusGenerator(seed=7).iter_articles(200))
+    second = list(SyntheticCorpusGenerator(seed=7).iter_articles(200))
+    other = list(SyntheticCorpusGenerator(seed=8).iter_articles(200))
+
+    assert first == second
+    assert first != other
+
+
+def test_articles_are_gnews_shaped_with_syndicated_duplicates():
+    articles = list(SyntheticCorpusGenerator(seed=1, duplicate_ratio=0.3).iter_articles(500))
+
+    for article in articles:
+        assert {"title", "description", "content", "url", "publishedAt", "source"} <= set(article)
+        assert {"name", "url"} <= set(article["source"])
+
+    # Syndicated copies share the body but have their own URL
+    assert len({article["url"] for article in articles}) == 500
+    assert len({article["content"] for article in articles}) < 450
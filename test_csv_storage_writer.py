@@ -0,0 +1,84 @@
+import csv
+import os
+
+from services.csv_storage_writer import CSVStorageWriter
+
+
+def make_deals(count: int, prefix: str = "https://example.com/deal") -> list:
+    """
+    Build minimal deal dictionaries with distinct source URLs.
+    """
+
+    return [
+        {"buyer": "Polish Army", "seller": "Kongsberg", "source_url": f"{prefix}/{index}"}
+        for index in range(count)
+    ]
+
+
+def read_urls(csv_path: str) -> list:
+    with open(csv_path, mode="r", newline="", encoding="utf-8") as csv_file:
+        return [row["source_url"] for row in csv.DictReader(csv_file)]
+
+
+def test_rows_appended_before_a_crash_are_indexed_on_open(tmp_path):
+    csv_path = str(tmp_path / "deals.csv")
+
+    writer = CSVStorageWriter(csv_path)
+    writer.save_structured_deals(make_deals(2))
+    writer.close()
+
+    # Crash after the append, before the index update: two complete rows and a torn one
+    with open(csv_path, mode="a", newline="", encoding="utf-8") as csv_file:
+        row_writer = csv.DictWriter(csv_file, fieldnames=writer.fieldnames)
+
+        for deal in make_deals(2, prefix="https://example.com/crash"):
+            row_writer.writerow(deal)
+
+        csv_file.write("Polish Army,Kongs")
+
+    writer = CSVStorageWriter(csv_path)
+
+    try:
+        save_result = writer.save_structured_deals(make_deals(3, prefix="https://example.com/crash"))
+
+        assert save_result["inserted"] == 1
+        assert save_result["ignored"] == 2
+        assert read_urls(csv_path) == [
+            "https://example.com/deal/0",
+            "https://example.com/deal/1",
+            "https://example.com/crash/0",
+            "https://example.com/crash/1",
+            "https://example.com/crash/2",
+        ]
+        assert writer.manifest["segments"][-1]["rows"] == 5
+
+    finally:
+        writer.close()
+
+
+def test_failed_index_update_removes_the_appended_rows(tmp_path):
+    csv_path = str(tmp_path / "deals.csv")
+    writer = CSVStorageWriter(csv_path)
+
+    try:
+        writer.save_structured_deals(make_deals(1))
+        committed_size = os.path.getsize(csv_path)
+
+        def failing_add_many(urls):
+            raise OSError("disk full")
+
+        add_many = writer.url_index.add_many
+        writer.url_index.add_many = failing_add_many
+
+        save_result = writer.save_structured_deals(make_deals(2, prefix="https://example.com/retry"))
+
+        assert save_result["failed_urls"] == ["https://example.com/retry/0", "https://example.com/retry/1"]
+        assert os.path.getsize(csv_path) == committed_size
+
+        writer.url_index.add_many = add_many
+
+        assert writer.save_structured_deals(make_deals(2, prefix="https://example.com/retry"))["inserted"] == 2
+        assert len(read_urls(csv_path)) == 3
+
+    finally:
+        writer.close()
@@ -0,0 +1,41 @@
+from benchmarks.fake_news_server import FakeNewsServer, FaultProfile
+from services.gnews_fetcher import GNewsFetcher
+from services.news_fetcher import NewsFetcher
+
+
+def test_fetchers_page_through_the_fake_corpus():
+    fake_news_server = FakeNewsServer(corpus_size=100).start()
+
+    try:
+        gnews_fetcher = GNewsFetcher(api_key="test", base_url=fake_news_server.gnews_url)
+
+        first_page = gnews_fetcher.fetch_articles("drone contract", max_records=5)
+        second_page = gnews_fetcher.fetch_articles("drone contract", max_records=5)
+
+        assert len(first_page) == 5
+        assert {"title", "description", "content", "url", "source"} <= set(first_page[0])
+        assert not {article["url"] for article in first_page} & {article["url"] for article in second_page}
+
+        gdelt_articles = NewsFetcher(base_url=fake_news_server.gdelt_url).fetch_articles("drone contract", max_records=3)
+
+        assert len(gdelt_articles) == 3
+        assert "seendescription" in gdelt_articles[0]
+
+    finally:
+        fake_news_server.stop()
+
+
+def test_injected_faults_are_served():
+    fake_news_server = FakeNewsServer(corpus_size=50, faults=FaultProfile(throttle_rate=1.0, retry_after_seconds=7)).start()
+
+    try:
+        assert GNewsFetcher(api_key="test", base_url=fake_news_server.gnews_url).fetch_articles("drone") == []
+        assert fake_news_server.served_counts["throttled"] == 1
+
+        fake_news_server.faults = FaultProfile(malformed_rate=1.0)
+
+        assert GNewsFetcher(api_key="test", base_url=fake_news_server.gnews_url).fetch_articles("drone") == []
+        assert fake_news_server.served_counts["malformed"] == 1
+
+    finally:
+        fake_news_server.stop()
@@ -0,0 +1,152 @@
+import os
+import tempfile
+import time
+
+from services.google_sheet_storage_writer import GoogleSheetStorageWriter
+from services.sheets_stub_server import SheetsStubServer
+
+
+def make_deals(count: int, prefix: str = "https://example.com/deal") -> list:
+    """
+    Build minimal deal dictionaries with distinct source URLs.
+    """
+
+    return [
+        {"buyer": "Polish Army", "seller": "Kongsberg", "source_url": f"{prefix}/{index}"}
+        for index in range(count)
+    ]
+
+
+def make_writer(stub: SheetsStubServer, index_directory: str, rows_per_request: int = 500) -> GoogleSheetStorageWriter:
+    """
+    Writer pointed at the stand-in, with fast retries.
+    """
+
+    writer = GoogleSheetStorageWriter(
+        "test-sheet",
+        base_url=stub.base_url,
+        index_path=os.path.join(index_directory, "urls.sqlite"),
+        rows_per_request=rows_per_request
+    )
+
+    writer.sheet_writer.initial_backoff_seconds = 0.01
+
+    return writer
+
+
+def test_rows_are_sent_in_batches():
+    with SheetsStubServer() as stub, tempfile.TemporaryDirectory() as index_directory:
+        writer = make_writer(stub, index_directory)
+
+        writer.save_structured_deals(make_deals(700))
+        writer.save_structured_deals(make_deals(500, prefix="https://example.com/other"))
+        writer.close()
+
+        # Header row; a full buffer flushes in calls of at most 500 rows
+        assert stub.append_calls == [("Deals", 1), ("Deals", 500), ("Deals", 200), ("Deals", 500)]
+        assert len(stub.rows()) == 1 + 1200
+        assert stub.rows()[0][0] == "buyer"
+
+
+def test_duplicates_are_skipped_across_runs():
+    with SheetsStubServer() as stub, tempfile.TemporaryDirectory() as index_directory:
+        writer = make_writer(stub, index_directory)
+        writer.save_structured_deals(make_deals(10))
+        writer.close()
+
+        writer = make_writer(stub, index_directory)
+        save_result = writer.save_structured_deals(make_deals(12))
+        writer.close()
+
+        assert save_result["inserted"] == 2
+        assert save_result["ignored"] == 10
+        assert len(stub.rows()) == 1 + 12
+
+
+def test_throttled_append_is_retried():
+    with SheetsStubServer() as stub, tempfile.TemporaryDirectory() as index_directory:
+        writer = make_writer(stub, index_directory)
+        writer.save_structured_deals(make_deals(5))
+
+        # Header check succeeds, the append is throttled twice
+        writer.flush()
+        writer.save_structured_deals(make_deals(5, prefix="https://example.com/more"))
+        stub.fail_next(2, 429)
+
+        assert writer.flush() == 5
+        assert writer.sheet_writer.retry_count == 2
+
+        writer.close()
+        assert len(stub.rows()) == 1 + 10
+
+
+def test_server_error_on_append_is_not_retried_automatically():
+    with SheetsStubServer() as stub, tempfile.TemporaryDirectory() as index_directory:
+        writer = make_writer(stub, index_directory)
+        writer.save_structured_deals(make_deals(3))
+        writer.flush()
+
+        writer.save_structured_deals(make_deals(4, prefix="https://example.com/more"))
+        stub.fail_next(1, 500)
+
+        # The failed append may have been applied, so it is kept buffered, not resent
+        assert writer.flush() == 0
+        assert len(writer.pending_rows) == 4
+        assert writer.sheet_writer.retry_count == 0
+
+        close_result = writer.close()
+        assert close_result["failed_urls"] == []
+        assert len(stub.rows()) == 1 + 7
+
+
+def test_unflushed_rows_are_reported_at_close():
+    with SheetsStubServer() as stub, tempfile.TemporaryDirectory() as index_directory:
+        writer = make_writer(stub, index_directory)
+        writer.sheet_writer.max_retries = 1
+
+        writer.save_structured_deals(make_deals(3))
+        stub.fail_next(10, 503)
+
+        close_result = writer.close()
+
+        assert sorted(close_result["failed_urls"]) == sorted(deal["source_url"] for deal in make_deals(3))
+
+
+def test_default_index_is_per_spreadsheet(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    with SheetsStubServer() as stub:
+        for spreadsheet_id in ("sheet-a", "sheet-b"):
+            writer = GoogleSheetStorageWriter(spreadsheet_id, base_url=stub.base_url)
+            writer.save_structured_deals(make_deals(3))
+            writer.close()
+
+        # Each spreadsheet got its own rows and its own index file
+        assert len(stub.rows()) == 2 * (1 + 3)
+        assert (tmp_path / "google_sheet_sheet-a.urls.sqlite").exists()
+        assert (tmp_path / "google_sheet_sheet-b.urls.sqlite").exists()
+
+
+def test_small_buffer_is_flushed_by_fanout_after_time_limit():
+    from services.storage_fanout import StorageFanOut
+
+    with SheetsStubServer() as stub, tempfile.TemporaryDirectory() as index_directory:
+        writer = make_writer(stub, index_directory)
+        writer.max_buffer_seconds = 0.2
+
+        storage_fanout = StorageFanOut([writer], max_batch_delay_seconds=0.05)
+        storage_fanout.save_structured_deals(make_deals(3))
+        storage_fanout.flush()
+
+        # Far below rows_per_request, and no further deals arrive
+        assert len(stub.rows()) <= 1
+
+        deadline = time.monotonic() + 5
+
+        while len(stub.rows()) < 1 + 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert len(stub.rows()) == 1 + 3
+        assert writer.pending_rows == []
+
+        storage_fanout.close()
@@ -0,0 +1,56 @@
+import json
+
+from utils.metrics import MetricsRegistry
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    registry.describe("llm_requests_total", "LLM calls by outcome")
+
+    registry.increment("llm_requests_total", model="llama3", outcome="ok")
+    registry.increment("llm_requests_total", 2, model="llama3", outcome="ok")
+    registry.set_gauge("pipeline_queue_depth", 7, stage="extract")
+    registry.observe("llm_request_seconds", 0.05)
+    registry.observe("llm_request_seconds", 0.5)
+    registry.observe("llm_request_seconds", 5)
+
+    lines = registry.to_prometheus().splitlines()
+
+    assert "# HELP llm_requests_total LLM calls by outcome" in lines
+    assert 'llm_requests_total{model="llama3",outcome="ok"} 3' in lines
+    assert 'pipeline_queue_depth{stage="extract"} 7' in lines
+
+    # Buckets are cumulative
+    assert 'llm_request_seconds_bucket{le="0.1"} 1' in lines
+    assert 'llm_request_seconds_bucket{le="1"} 2' in lines
+    assert 'llm_request_seconds_bucket{le="+Inf"} 3' in lines
+    assert "llm_request_seconds_count 3" in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.increment("fetch_errors_total", query='say "hi"\\now')
+
+    assert 'fetch_errors_total{query="say \\"hi\\"\\\\now"} 1' in registry.to_prometheus()
+
+
+def test_json_summary_has_derived_rates(tmp_path):
+    registry = MetricsRegistry()
+
+    registry.increment("pipeline_items_emitted_total", 10, stage="fetch")
+    registry.increment("llm_completion_tokens_total", 300, model="llama3")
+    registry.observe("llm_request_seconds", 2.0, model="llama3")
+    registry.observe("llm_request_seconds", 1.0, model="llama3")
+    registry.increment("cache_requests_total", 3, cache="llm_output", result="hit")
+    registry.increment("cache_requests_total", 1, cache="llm_output", result="miss")
+
+    summary_path = tmp_path / "run.json"
+    registry.write_json_summary(str(summary_path), extra={"run_id": "r1"})
+
+    run_summary = json.loads(summary_path.read_text())
+
+    assert run_summary["run_id"] == "r1"
+    assert run_summary["rates"]["llm_tokens_per_second"] == 100
+    assert run_summary["rates"]["cache_hit_rates"] == {"llm_output": 0.75}
+    assert run_summary["rates"]["articles_per_second"] > 0
+    assert run_summary["metrics"]["counters"]['pipeline_items_emitted_total{stage="fetch"}'] == 10
@@ -0,0 +1,62 @@
+import json
+import os
+import shutil
+
+from models.deal import Deal
+from services.parquet_storage_writer import COMPACTION_MARKER, ParquetStorageWriter
+
+
+def write_small_files(parquet_storage_writer, file_count):
+    for number in range(file_count):
+        parquet_storage_writer.save_structured_deals([
+            Deal(buyer="Army", seller="Saab", source_url=f"https://a/{number}", ingestion_timestamp="2026-07-01T10:00:00")
+        ])
+
+    return os.path.join(parquet_storage_writer.root_directory, "ingestion_date=2026-07-01")
+
+
+def test_compact_merges_small_files(tmp_path):
+    parquet_storage_writer = ParquetStorageWriter(str(tmp_path / "deals"))
+    partition_directory = write_small_files(parquet_storage_writer, 4)
+
+    assert parquet_storage_writer.compact() == 3
+    assert len([name for name in os.listdir(partition_directory) if name.endswith(".parquet")]) == 1
+    assert sorted(parquet_storage_writer.read_deals(columns=["source_url"])["source_url"]) == [f"https://a/{number}" for number in range(4)]
+
+    parquet_storage_writer.close()
+
+
+def test_interrupted_compaction_is_never_read_twice_and_is_finished(tmp_path):
+    parquet_storage_writer = ParquetStorageWriter(str(tmp_path / "deals"))
+    partition_directory = write_small_files(parquet_storage_writer, 3)
+    input_names = sorted(os.listdir(partition_directory))
+
+    # Crash after the merged file was renamed into place, before the inputs were deleted
+    shutil.copy(os.path.join(partition_directory, input_names[0]), os.path.join(partition_directory, "part-merged.parquet"))
+
+    with open(os.path.join(partition_directory, COMPACTION_MARKER), "w") as marker_file:
+        json.dump({"output": "part-merged.parquet", "inputs": input_names[:1]}, marker_file)
+
+    assert len(parquet_storage_writer.read_deals()) == 3
+
+    parquet_storage_writer.compact()
+
+    assert not os.path.exists(os.path.join(partition_directory, COMPACTION_MARKER))
+    assert len(parquet_storage_writer.read_deals()) == 3
+
+    # Crash before the rename: the inputs are kept, the hidden merged file is dropped
+    input_names = sorted(os.listdir(partition_directory))
+
+    with open(os.path.join(partition_directory, ".part-lost.parquet.tmp"), "w") as merged_file:
+        merged_file.write("partial")
+    with open(os.path.join(partition_directory, COMPACTION_MARKER), "w") as marker_file:
+        json.dump({"output": "part-lost.parquet", "inputs": input_names}, marker_file)
+
+    assert len(parquet_storage_writer.read_deals()) == 3
+
+    parquet_storage_writer.compact()
+
+    assert not os.path.exists(os.path.join(partition_directory, ".part-lost.parquet.tmp"))
+    assert len(parquet_storage_writer.read_deals()) == 3
+
+    parquet_storage_writer.close()
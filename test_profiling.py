@@ -0,0 +1,62 @@
+import pstats
+import time
+
+from utils.pipeline import Pipeline, Stage
+from utils.profiling import StageProfiler, profiling_mode_from_environment
+
+
+def build_stages():
+    def parse(item):
+        return [str(number) for number in range(item * 100)]
+
+    def wait(item):
+        time.sleep(0.05)
+        return item
+
+    return [
+        Stage("parse", parse, workers=2),
+        Stage("wait", wait),
+    ]
+
+
+def test_deterministic_mode_writes_pstats_and_allocations(tmp_path):
+    stages = build_stages()
+    profiler = StageProfiler(str(tmp_path), mode="deterministic")
+    profiler.instrument(stages)
+
+    profiler.start()
+    Pipeline(stages).run(range(5))
+    profiler.stop()
+
+    parse_stats = pstats.Stats(str(tmp_path / "parse.pstats"))
+    profiled_functions = {function_name for _, _, function_name in parse_stats.stats}
+
+    assert "parse" in profiled_functions
+    assert (tmp_path / "wait.txt").exists()
+    assert "Stage parse" in (tmp_path / "allocations.txt").read_text()
+
+
+def test_sampling_mode_writes_folded_stacks(tmp_path):
+    stages = build_stages()
+    profiler = StageProfiler(str(tmp_path), mode="sampling", sample_interval_seconds=0.005)
+    profiler.instrument(stages)
+
+    profiler.start()
+    Pipeline(stages).run(range(5))
+    profiler.stop()
+
+    folded_lines = (tmp_path / "wait.folded").read_text().splitlines()
+
+    assert any("test_profiling.py:wait" in line for line in folded_lines)
+    assert "Stage wait" in (tmp_path / "sampling_summary.txt").read_text()
+
+
+def test_environment_switch(monkeypatch):
+    monkeypatch.setenv("DDI_PROFILE", "1")
+    assert profiling_mode_from_environment() == "deterministic"
+
+    monkeypatch.setenv("DDI_PROFILE", "sampling")
+    assert profiling_mode_from_environment() == "sampling"
+
+    monkeypatch.delenv("DDI_PROFILE")
+    assert profiling_mode_from_environment() is None
@@ -0,0 +1,35 @@
+import heapq
+import threading
+
+from services.query_scheduler import QueryScheduler
+
+
+def test_quiet_queries_back_off_and_busy_queries_reset():
+    scheduler = QueryScheduler(["quiet", "busy"], base_interval_seconds=10, max_interval_seconds=35, backoff_factor=2)
+    stop_event = threading.Event()
+
+    for _ in range(4):
+        assert scheduler.next_due_query(stop_event) == "quiet"
+        assert scheduler.next_due_query(stop_event) == "busy"
+
+        scheduler.report_result("quiet", 0)
+        scheduler.report_result("busy", 3)
+
+        # Make both queries due again without waiting
+        scheduler._due_heap = [(0, position, query) for _, position, query in scheduler._due_heap]
+        heapq.heapify(scheduler._due_heap)
+
+    assert scheduler.intervals["quiet"] == 35
+    assert scheduler.intervals["busy"] == 10
+
+
+def test_stop_ends_the_stream():
+    scheduler = QueryScheduler(["only"], base_interval_seconds=60)
+    stop_event = threading.Event()
+
+    due_queries = scheduler.iter_due_queries(stop_event)
+    assert next(due_queries) == "only"
+
+    # Nothing is due for a minute; stopping wakes the waiting generator
+    threading.Timer(0.2, stop_event.set).start()
+    assert list(due_queries) == []
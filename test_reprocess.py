@@ -0,0 +1,48 @@
+import json
+import sqlite3
+
+from reprocess import reprocess
+from services.database_storage_writer import DatabaseStorageWriter
+
+
+def raw_output(source_url: str, deal: dict = None) -> dict:
+    return {
+        "source_url": source_url,
+        "article_title": "Deal",
+        "raw_llm_output": json.dumps(deal) if deal else "no deal here",
+        "model_name": "test",
+        "ingestion_timestamp": "2026-01-01T00:00:00"
+    }
+
+
+def stored_deals(database_path: str) -> dict:
+    with sqlite3.connect(database_path) as connection:
+        return dict(connection.execute("SELECT source_url, product FROM deals").fetchall())
+
+
+def test_reprocess_updates_kept_duplicates_and_deletes_only_unparseable_rows(tmp_path):
+    database_path = str(tmp_path / "deals.db")
+
+    deal = {"buyer": "Polish Army", "seller": "Kongsberg", "deal_value": "$5 million", "product": "radar"}
+
+    # Two runs each kept the same deal under a different URL; c no longer parses;
+    # d was dropped as a duplicate when it was extracted; e has no raw output
+    with DatabaseStorageWriter(database_path) as database_storage_writer:
+        database_storage_writer.save_structured_deals([
+            dict(deal, source_url=source_url, product="old")
+            for source_url in ["https://a", "https://b", "https://c", "https://e"]
+        ])
+        database_storage_writer.save_raw_llm_outputs([
+            raw_output("https://a", deal),
+            raw_output("https://b", deal),
+            raw_output("https://c"),
+            raw_output("https://d", deal)
+        ])
+
+    reprocess(database_path, chunk_size=1, max_workers=1)
+
+    assert stored_deals(database_path) == {
+        "https://a": "radar",
+        "https://b": "radar",
+        "https://e": "old"
+    }
@@ -0,0 +1,63 @@
+import time
+
+from services.sqlite_work_queue import SQLiteWorkQueue
+
+
+def make_queue(tmp_path, **kwargs) -> SQLiteWorkQueue:
+    return SQLiteWorkQueue(str(tmp_path / "queue.db"), **kwargs)
+
+
+def test_enqueue_ignores_known_task_ids(tmp_path):
+    work_queue = make_queue(tmp_path)
+
+    assert work_queue.enqueue([{"task_id": "a", "payload": {"n": 1}}, {"task_id": "b", "payload": {}}]) == 2
+    assert work_queue.enqueue([{"task_id": "a", "payload": {"n": 2}}]) == 0
+
+    tasks = work_queue.lease("w1", max_tasks=5)
+
+    assert [task["task_id"] for task in tasks] == ["a", "b"]
+    assert tasks[0]["payload"] == {"n": 1}
+
+
+def test_leased_tasks_are_exclusive_until_the_lease_expires(tmp_path):
+    first_queue = make_queue(tmp_path)
+    second_queue = make_queue(tmp_path)
+
+    first_queue.enqueue([{"task_id": "a", "payload": {}}])
+
+    assert len(first_queue.lease("w1", lease_seconds=0.2)) == 1
+    assert second_queue.lease("w2") == []
+
+    time.sleep(0.3)
+
+    # The crashed worker's lease expired, so another worker takes over
+    assert [task["attempts"] for task in second_queue.lease("w2")] == [2]
+    assert not first_queue.heartbeat("a", "w1")
+    assert second_queue.heartbeat("a", "w2")
+
+
+def test_complete_is_idempotent(tmp_path):
+    work_queue = make_queue(tmp_path)
+    work_queue.enqueue([{"task_id": "a", "payload": {}}])
+    work_queue.lease("w1")
+
+    assert work_queue.complete("a", "w1", "stored")
+    assert not work_queue.complete("a", "w2", "stored")
+    assert work_queue.counts() == {"done": 1}
+    assert work_queue.lease("w1") == []
+
+
+def test_failed_tasks_are_retried_then_marked_dead(tmp_path):
+    work_queue = make_queue(tmp_path, max_attempts=2, retry_backoff_seconds=0.1)
+    work_queue.enqueue([{"task_id": "a", "payload": {}}])
+
+    work_queue.lease("w1")
+    assert work_queue.fail("a", "w1", "boom") == "pending"
+
+    # Backoff before the retry
+    assert work_queue.lease("w1") == []
+    time.sleep(0.15)
+
+    work_queue.lease("w1")
+    assert work_queue.fail("a", "w1", "boom") == "dead"
+    assert work_queue.counts() == {"dead": 1}
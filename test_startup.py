@@ -0,0 +1,11 @@
+from benchmarks.startup_benchmark import FAST_COMMANDS, LAZY_IMPORTS, command_heavy_modules, loaded_heavy_modules
+
+
+def test_entry_points_do_not_import_llm_backends_or_scraper():
+    for module_name, allowed_modules in LAZY_IMPORTS.items():
+        assert set(loaded_heavy_modules(module_name)) <= set(allowed_modules), module_name
+
+
+def test_short_cli_commands_stay_lightweight():
+    for command_name, (arguments, allowed_modules) in FAST_COMMANDS.items():
+        assert set(command_heavy_modules(arguments)) <= set(allowed_modules), command_name
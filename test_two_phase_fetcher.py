@@ -0,0 +1,63 @@
+from services.deal_classifier import DealClassifier
+from services.keyword_engine import KeywordEngine
+from services.two_phase_fetcher import TwoPhaseFetcher
+
+
+class ListingFetcher:
+    def __init__(self, articles):
+        self.articles = articles
+
+    def fetch_articles(self, query, max_records=10, priority="normal"):
+        return self.articles[:max_records]
+
+
+class RecordingScraper:
+    def __init__(self, text=None):
+        self.text = text
+        self.urls = []
+
+    def fetch_article_text(self, source_url):
+        self.urls.append(source_url)
+        return self.text
+
+
+def build_fetcher(articles, scraper):
+    return TwoPhaseFetcher(
+        ListingFetcher(articles),
+        article_scraper=scraper,
+        keyword_engine=KeywordEngine(["drone"], ["contract"], ["army"]),
+        deal_classifier=DealClassifier(score_threshold=3),
+        min_content_chars=50
+    )
+
+
+def test_only_candidates_are_scraped_and_description_is_mapped():
+    articles = [
+        {"url": "https://a/deal", "title": "Army drone contract", "description": "Deal worth $40 million", "content": "Short text... [2817 chars]"},
+        {"url": "https://a/noise", "title": "Army exercise", "description": "Drone demonstration", "content": "Nothing to see... [900 chars]"},
+    ]
+    scraper = RecordingScraper("Full article text. " * 10)
+
+    candidates = build_fetcher(articles, scraper).fetch_candidates("drone contract")
+
+    assert scraper.urls == ["https://a/deal"]
+    assert [article["url"] for article in candidates] == ["https://a/deal"]
+    assert candidates[0]["seendescription"] == "Deal worth $40 million"
+    assert candidates[0]["content"].startswith("Full article text.")
+
+
+def test_complete_content_skips_scraper_and_failures_fall_back():
+    complete_article = {"url": "https://a/1", "title": "t", "description": "d", "content": "Complete text. " * 10}
+    truncated_article = {"url": "https://a/2", "title": "t", "description": "d", "content": "Partial text ... [500 chars]"}
+    scraper = RecordingScraper(None)
+
+    two_phase_fetcher = build_fetcher([], scraper)
+
+    assert two_phase_fetcher.fetch_content(complete_article)["content"].startswith("Complete text.")
+    assert scraper.urls == []
+
+    fallback_article = two_phase_fetcher.fetch_content(truncated_article)
+
+    assert scraper.urls == ["https://a/2"]
+    assert fallback_article["content"] == "Partial text"
+    assert fallback_article["content_truncated"] is True
@@ -0,0 +1,59 @@
+# This class is an in-memory set that forgets its oldest members beyond a size limit
+
+from collections import OrderedDict
+
+
+class BoundedSet:
+    """
+    Insertion-ordered set holding at most max_size members.
+
+    Adding to a full set evicts the oldest member, so long-running
+    processes (daemon mode) keep a recent window instead of growing
+    without bound. max_size=None makes it an ordinary unbounded set.
+    Not thread-safe; callers lock around it as they would a set.
+    """
+
+    def __init__(self, max_size: int = None, members=()):
+        """
+        :param max_size: members kept (None: unbounded)
+        :param members: initial members
+        """
+        self.max_size = max_size
+        self._members = OrderedDict()
+
+        self.update(members)
+
+    def add(self, member):
+        """
+        Add a member (refreshing its age if already present).
+
+        :param member: hashable value
+        """
+
+        self._members[member] = None
+        self._members.move_to_end(member)
+
+        if self.max_size is not None and len(self._members) > self.max_size:
+            self._members.popitem(last=False)
+
+    def update(self, members):
+        """
+        Add several members.
+
+        :param members: iterable of hashable values
+        """
+
+        for member in members:
+            self.add(member)
+
+    def discard(self, member):
+        self._members.pop(member, None)
+
+    def __contains__(self, member) -> bool:
+        return member in self._members
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(self._members)
@@ -2,12 +2,51 @@
 
 from typing import List, Dict
 
+from utils.bounded_set import BoundedSet
+from utils.metrics import metrics_registry
+
 
 class DealDeduplicator:
     """
     Deduplicates structured deals using strong business keys.
     """
 
+    def __init__(self, max_signatures: int = None):
+        """
+        Initialize signature memory used by streaming deduplication.
+
+        :param max_signatures: most recent signatures remembered (None: all)
+        """
+
+        # Signatures seen across calls to filter_new_deals
+        self.seen_signatures = BoundedSet(max_signatures)
+
+    def filter_new_deals(self, structured_deals: List[Dict]) -> List[Dict]:
+        """
+        Streaming variant of deduplicate_deals: drops deals whose
+        signature was already seen in this call or any earlier call.
+
+        :param structured_deals: newly extracted deals
+        :return: deals not seen before
+        """
+
+        new_deals = []
+
+        for structured_deal in structured_deals:
+
+            deal_signature = self._build_signature(structured_deal)
+
+            if deal_signature in self.seen_signatures:
+                continue
+
+            self.seen_signatures.add(deal_signature)
+            new_deals.append(structured_deal)
+
+        metrics_registry.increment("dedup_deals_total", len(new_deals), result="new")
+        metrics_registry.increment("dedup_deals_total", len(structured_deals) - len(new_deals), result="duplicate")
+
+        return new_deals
+
     def deduplicate_deals(self, structured_deals: List[Dict]) -> List[Dict]:
         """
         Merge duplicate deals based on buyer, seller, and deal value.
@@ -31,6 +70,9 @@ class DealDeduplicator:
             seen_signatures.add(deal_signature)
             unique_deals.append(structured_deal)
 
+        metrics_registry.increment("dedup_deals_total", len(unique_deals), result="new")
+        metrics_registry.increment("dedup_deals_total", len(structured_deals) - len(unique_deals), result="duplicate")
+
         return unique_deals
 
     # ------------------------------------------------------
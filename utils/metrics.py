@@ -0,0 +1,345 @@
+# This module collects counters, gauges and latency histograms and exports them
+# as a Prometheus text file and a JSON run summary
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Latency buckets (seconds) spanning a cache lookup to a slow LLM call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _escape_label_value(value: str) -> str:
+    """
+    Escape a label value for the Prometheus text format.
+
+    :param value: raw label value
+    :return: escaped value
+    """
+
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process metrics store.
+
+    Metrics are created on first use and identified by name plus labels,
+    e.g. increment("llm_requests_total", model="llama3", outcome="ok").
+    Names follow Prometheus conventions: counters end in _total,
+    durations are in seconds.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        :param buckets: histogram upper bounds in ascending order
+        """
+        self.buckets = tuple(buckets)
+
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.descriptions = {}
+
+        self.started_at = time.time()
+
+        self._lock = threading.Lock()
+
+    def _key(self, name: str, labels: dict) -> tuple:
+        """
+        Series key: metric name plus sorted label pairs.
+
+        :param name: metric name
+        :param labels: label values
+        :return: hashable key
+        """
+
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def reset(self):
+        """
+        Drop all recorded values and restart the wall clock (e.g. at run start).
+        """
+
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.started_at = time.time()
+
+    # -------------------- Recording --------------------
+
+    def describe(self, name: str, help_text: str):
+        """
+        Set the HELP text written for a metric.
+
+        :param name: metric name
+        :param help_text: one-line description
+        """
+
+        self.descriptions[name] = help_text
+
+    def increment(self, name: str, value: float = 1, **labels):
+        """
+        Add to a counter.
+
+        :param name: counter name (ends in _total)
+        :param value: amount to add
+        :param labels: label values
+        """
+
+        key = self._key(name, labels)
+
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """
+        Set a gauge to its current value.
+
+        :param name: gauge name
+        :param value: current value
+        :param labels: label values
+        """
+
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Record one observation in a histogram.
+
+        :param name: histogram name
+        :param value: observed value (seconds for latencies)
+        :param labels: label values
+        """
+
+        key = self._key(name, labels)
+
+        with self._lock:
+            histogram = self.histograms.get(key)
+
+            if histogram is None:
+                histogram = {"bucket_counts": [0] * (len(self.buckets) + 1), "count": 0, "sum": 0.0}
+                self.histograms[key] = histogram
+
+            # Last slot is the +Inf bucket
+            histogram["bucket_counts"][bisect.bisect_left(self.buckets, value)] += 1
+            histogram["count"] += 1
+            histogram["sum"] += value
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """
+        Observe the duration of a with-block in a histogram.
+
+        :param name: histogram name (ends in _seconds)
+        :param labels: label values
+        """
+
+        started_at = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at, **labels)
+
+    # -------------------- Reading --------------------
+
+    def counter_value(self, name: str, **labels) -> float:
+        """
+        Sum of a counter over all series matching the given labels.
+
+        :param name: counter name
+        :param labels: labels to match (others are summed over)
+        :return: counter total
+        """
+
+        wanted_labels = {(label, str(value)) for label, value in labels.items()}
+
+        with self._lock:
+            return sum(
+                value for (metric_name, series_labels), value in self.counters.items()
+                if metric_name == name and wanted_labels.issubset(series_labels)
+            )
+
+    def histogram_totals(self, name: str, **labels) -> dict:
+        """
+        Count and sum of a histogram over all series matching the given labels.
+
+        :param name: histogram name
+        :param labels: labels to match (others are summed over)
+        :return: dictionary with count and sum
+        """
+
+        wanted_labels = {(label, str(value)) for label, value in labels.items()}
+        totals = {"count": 0, "sum": 0.0}
+
+        with self._lock:
+            for (metric_name, series_labels), histogram in self.histograms.items():
+                if metric_name == name and wanted_labels.issubset(series_labels):
+                    totals["count"] += histogram["count"]
+                    totals["sum"] += histogram["sum"]
+
+        return totals
+
+    # -------------------- Export --------------------
+
+    def _format_labels(self, label_pairs, extra_pairs=()) -> str:
+        """
+        Render labels in Prometheus syntax.
+
+        :param label_pairs: (label, value) pairs
+        :param extra_pairs: additional pairs (e.g. le for buckets)
+        :return: "{a="1",b="2"}" or ""
+        """
+
+        pairs = list(label_pairs) + list(extra_pairs)
+
+        if not pairs:
+            return ""
+
+        rendered = ",".join(f'{label}="{_escape_label_value(value)}"' for label, value in pairs)
+
+        return "{" + rendered + "}"
+
+    def to_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        :return: exposition text
+        """
+
+        lines = []
+
+        with self._lock:
+            sections = (
+                ("counter", self.counters),
+                ("gauge", self.gauges),
+                ("histogram", self.histograms)
+            )
+
+            for metric_type, series in sections:
+                for name in sorted({metric_name for metric_name, _ in series}):
+                    if name in self.descriptions:
+                        lines.append(f"# HELP {name} {self.descriptions[name]}")
+
+                    lines.append(f"# TYPE {name} {metric_type}")
+
+                    for (metric_name, label_pairs), value in sorted(series.items()):
+                        if metric_name != name:
+                            continue
+
+                        if metric_type != "histogram":
+                            lines.append(f"{name}{self._format_labels(label_pairs)} {value}")
+                            continue
+
+                        cumulative_count = 0
+
+                        for upper_bound, bucket_count in zip(self.buckets + ("+Inf",), value["bucket_counts"]):
+                            cumulative_count += bucket_count
+                            lines.append(f"{name}_bucket{self._format_labels(label_pairs, [('le', str(upper_bound))])} {cumulative_count}")
+
+                        lines.append(f"{name}_sum{self._format_labels(label_pairs)} {value['sum']}")
+                        lines.append(f"{name}_count{self._format_labels(label_pairs)} {value['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path: str):
+        """
+        Write the exposition text atomically, for the node_exporter
+        textfile collector (which may read the file at any time).
+
+        :param file_path: target .prom file
+        """
+
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+
+        temporary_path = f"{file_path}.tmp"
+
+        with open(temporary_path, "w", encoding="utf-8") as prometheus_file:
+            prometheus_file.write(self.to_prometheus())
+
+        os.replace(temporary_path, file_path)
+
+    def summary(self) -> dict:
+        """
+        All metrics as a JSON-serializable dictionary.
+
+        :return: dictionary with counters, gauges and histograms
+        """
+
+        def series_name(metric_name, label_pairs):
+            return metric_name + self._format_labels(label_pairs)
+
+        with self._lock:
+            return {
+                "counters": {series_name(*key): value for key, value in sorted(self.counters.items())},
+                "gauges": {series_name(*key): value for key, value in sorted(self.gauges.items())},
+                "histograms": {
+                    series_name(*key): {"count": histogram["count"], "sum": round(histogram["sum"], 6)}
+                    for key, histogram in sorted(self.histograms.items())
+                }
+            }
+
+    def write_json_summary(self, file_path: str, extra: dict = None):
+        """
+        Write the run summary: derived rates, all metrics and any extra fields.
+
+        :param file_path: target .json file
+        :param extra: additional top-level fields (e.g. run id, stage stats)
+        """
+
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+
+        run_summary = dict(extra or {})
+        run_summary["rates"] = self.derived_rates()
+        run_summary["metrics"] = self.summary()
+
+        with open(file_path, "w", encoding="utf-8") as summary_file:
+            json.dump(run_summary, summary_file, indent=2, default=str)
+
+    def derived_rates(self) -> dict:
+        """
+        Headline throughput figures computed from the standard metrics.
+
+        Articles/sec counts articles leaving the pipeline's fetch stage
+        over wall time; LLM tokens/sec is completion tokens over time
+        spent in LLM calls (per-call generation speed).
+
+        :return: dictionary with wall time, articles/sec, LLM tokens/sec
+            and hit rate per cache
+        """
+
+        wall_seconds = max(time.time() - self.started_at, 1e-9)
+
+        llm_totals = self.histogram_totals("llm_request_seconds")
+        completion_tokens = self.counter_value("llm_completion_tokens_total")
+
+        cache_names = sorted({
+            dict(label_pairs).get("cache")
+            for metric_name, label_pairs in list(self.counters)
+            if metric_name == "cache_requests_total"
+        })
+
+        cache_hit_rates = {}
+
+        for cache_name in cache_names:
+            hits = self.counter_value("cache_requests_total", cache=cache_name, result="hit")
+            lookups = self.counter_value("cache_requests_total", cache=cache_name)
+            cache_hit_rates[cache_name] = round(hits / lookups, 4) if lookups else None
+
+        return {
+            "wall_seconds": round(wall_seconds, 3),
+            "articles_per_second": round(self.counter_value("pipeline_items_emitted_total", stage="fetch") / wall_seconds, 4),
+            "llm_tokens_per_second": round(completion_tokens / llm_totals["sum"], 2) if llm_totals["sum"] else None,
+            "cache_hit_rates": cache_hit_rates
+        }
+
+
+# Process-wide registry used by all instrumented components
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,253 @@
+# This module runs processing stages concurrently, connected by bounded queues
+
+import queue
+import threading
+import time
+
+from utils.metrics import metrics_registry
+
+
+# Queue marker meaning "no more items from upstream"
+_END_OF_STREAM = object()
+
+
+class Stage:
+    """
+    One pipeline step.
+
+    kind decides what happens with the value returned by func:
+    - "map": result is passed downstream (None drops the item)
+    - "filter": item is passed downstream if result is truthy
+    - "flat_map": every element of the returned iterable is passed downstream
+    """
+
+    KINDS = ("map", "filter", "flat_map")
+
+    def __init__(self, name: str, func, workers: int = 1, queue_size: int = 100, kind: str = "map"):
+        """
+        :param name: stage name used in stats
+        :param func: callable applied to every input item
+        :param workers: threads running func concurrently
+        :param queue_size: maximum items waiting in front of this stage
+        :param kind: "map", "filter" or "flat_map"
+        """
+
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown stage kind: {kind}")
+
+        if workers < 1:
+            raise ValueError("Stage needs at least one worker")
+
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.kind = kind
+
+        self.input_queue = queue.Queue(maxsize=queue_size)
+
+        self.processed_count = 0
+        self.emitted_count = 0
+        self.error_count = 0
+        self.busy_seconds = 0.0
+
+        self._stats_lock = threading.Lock()
+
+    def _outputs(self, item) -> list:
+        """
+        Apply func and turn the result into items for the next stage.
+
+        :param item: input item
+        :return: list of output items
+        """
+
+        result = self.func(item)
+
+        if self.kind == "map":
+            return [] if result is None else [result]
+
+        if self.kind == "filter":
+            return [item] if result else []
+
+        return list(result or [])
+
+
+class Pipeline:
+    """
+    Streaming pipeline: source -> stage 1 -> stage 2 -> ... -> stage N.
+
+    Every stage runs its own worker threads and reads from a bounded
+    queue, so stages overlap (the LLM extracts while the network fetches)
+    and a slow stage blocks its producers instead of letting work pile
+    up in memory. Items that raise are reported and dropped; the rest of
+    the stream keeps flowing. Outputs of the last stage are discarded,
+    so the last stage should do its work as a side effect (e.g. storage).
+    """
+
+    def __init__(self, stages: list, report_interval_seconds: float = None, error_handler=None):
+        """
+        :param stages: ordered list of Stage objects
+        :param report_interval_seconds: print queue depths this often while running (None disables)
+        :param error_handler: optional callable(stage_name, item, error) run when an item fails
+        """
+
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+
+        self.stages = stages
+        self.report_interval_seconds = report_interval_seconds
+        self.error_handler = error_handler
+
+        self.source_count = 0
+
+    def _feed_source(self, source):
+        """
+        Push source items into the first stage, then end the stream.
+
+        :param source: iterable of input items
+        """
+
+        first_stage = self.stages[0]
+
+        try:
+            for item in source:
+                first_stage.input_queue.put(item)
+                self.source_count += 1
+
+        except Exception as error:
+            print(f"Pipeline source failed: {error}")
+
+        finally:
+            for _ in range(first_stage.workers):
+                first_stage.input_queue.put(_END_OF_STREAM)
+
+    def _run_worker(self, stage_index: int, finished_workers: list, finished_lock: threading.Lock):
+        """
+        Worker loop for one stage thread.
+
+        :param stage_index: position of the stage
+        :param finished_workers: one-element counter shared by the stage's workers
+        :param finished_lock: guards finished_workers
+        """
+
+        stage = self.stages[stage_index]
+        next_stage = self.stages[stage_index + 1] if stage_index + 1 < len(self.stages) else None
+
+        while True:
+            item = stage.input_queue.get()
+
+            if item is _END_OF_STREAM:
+                break
+
+            metrics_registry.set_gauge("pipeline_queue_depth", stage.input_queue.qsize(), stage=stage.name)
+
+            started_at = time.perf_counter()
+
+            try:
+                outputs = stage._outputs(item)
+                failed = False
+
+            except Exception as error:
+                outputs = []
+                failed = True
+                print(f"Pipeline stage '{stage.name}' failed: {error}")
+
+                if self.error_handler is not None:
+                    try:
+                        self.error_handler(stage.name, item, error)
+                    except Exception as handler_error:
+                        print(f"Pipeline error handler failed: {handler_error}")
+
+            elapsed_seconds = time.perf_counter() - started_at
+
+            with stage._stats_lock:
+                stage.processed_count += 1
+                stage.emitted_count += len(outputs)
+                stage.error_count += failed
+                stage.busy_seconds += elapsed_seconds
+
+            metrics_registry.observe("pipeline_stage_seconds", elapsed_seconds, stage=stage.name)
+            metrics_registry.increment("pipeline_items_processed_total", stage=stage.name)
+            metrics_registry.increment("pipeline_items_emitted_total", len(outputs), stage=stage.name)
+
+            if failed:
+                metrics_registry.increment("pipeline_item_errors_total", stage=stage.name)
+
+            if next_stage is not None:
+                for output in outputs:
+                    next_stage.input_queue.put(output)
+
+        # The last worker of a stage to finish ends the stream downstream
+        with finished_lock:
+            finished_workers[0] += 1
+            is_last_worker = finished_workers[0] == stage.workers
+
+        if is_last_worker and next_stage is not None:
+            for _ in range(next_stage.workers):
+                next_stage.input_queue.put(_END_OF_STREAM)
+
+    def queue_depths(self) -> dict:
+        """
+        Items currently waiting in front of each stage.
+
+        :return: dictionary keyed by stage name
+        """
+
+        return {stage.name: stage.input_queue.qsize() for stage in self.stages}
+
+    def stats(self) -> dict:
+        """
+        Per-stage counters.
+
+        :return: dictionary keyed by stage name
+        """
+
+        return {
+            stage.name: {
+                "workers": stage.workers,
+                "processed": stage.processed_count,
+                "emitted": stage.emitted_count,
+                "errors": stage.error_count,
+                "busy_seconds": round(stage.busy_seconds, 3),
+                "queued": stage.input_queue.qsize()
+            }
+            for stage in self.stages
+        }
+
+    def run(self, source) -> dict:
+        """
+        Stream source through all stages and wait until everything is processed.
+
+        :param source: iterable (e.g. generator) of input items
+        :return: per-stage stats
+        """
+
+        worker_threads = []
+
+        for stage_index, stage in enumerate(self.stages):
+            finished_workers = [0]
+            finished_lock = threading.Lock()
+
+            for worker_number in range(stage.workers):
+                worker_thread = threading.Thread(
+                    target=self._run_worker,
+                    args=(stage_index, finished_workers, finished_lock),
+                    name=f"pipeline-{stage.name}-{worker_number}",
+                    daemon=True
+                )
+                worker_thread.start()
+                worker_threads.append(worker_thread)
+
+        source_thread = threading.Thread(target=self._feed_source, args=(source,), name="pipeline-source", daemon=True)
+        source_thread.start()
+
+        # Report depths while the stream drains
+        for worker_thread in worker_threads:
+            while worker_thread.is_alive():
+                worker_thread.join(timeout=self.report_interval_seconds)
+
+                if self.report_interval_seconds and worker_thread.is_alive():
+                    print(f"Pipeline queue depths: {self.queue_depths()}")
+
+        source_thread.join()
+
+        return self.stats()
@@ -0,0 +1,54 @@
+# This module maps free-text product names into coarse defence product categories
+
+import re
+
+
+class ProductCategorizer:
+    """
+    Assigns a product category using ordered keyword rules.
+    The first matching rule wins, so narrower categories come first.
+    """
+
+    def __init__(self):
+        """
+        Compile category rules.
+        """
+
+        category_keywords = [
+            ("counter-uas", ["counter drone", "counter-drone", "anti-drone", "c-uas", "cuas", "counter-uas"]),
+            ("uas", ["drone", "drones", "uav", "uavs", "uas", "unmanned aerial", "loitering munition"]),
+            ("air-defence", ["air defense", "air defence", "interceptor", "interceptors", "patriot", "sam"]),
+            ("missiles", ["missile", "missiles", "rocket", "rockets"]),
+            ("aircraft", ["aircraft", "fighter", "fighters", "jet", "jets", "helicopter", "helicopters"]),
+            ("naval", ["ship", "ships", "frigate", "frigates", "submarine", "submarines", "vessel", "corvette", "naval"]),
+            ("land-vehicles", ["tank", "tanks", "armored", "armoured", "vehicle", "vehicles", "apc"]),
+            ("artillery", ["artillery", "howitzer", "howitzers", "mortar", "mortars"]),
+            ("munitions", ["ammunition", "munition", "munitions", "shells"]),
+            ("sensors", ["radar", "radars", "sensor", "sensors", "surveillance"]),
+            ("training", ["simulator", "simulators", "training"]),
+            ("communications", ["radio", "radios", "communication", "communications", "electronic warfare"]),
+        ]
+
+        self.category_patterns = [
+            (category, re.compile(r"\b(" + "|".join(re.escape(keyword) for keyword in keywords) + r")\b"))
+            for category, keywords in category_keywords
+        ]
+
+    def categorize(self, product_text) -> str:
+        """
+        Map product text into a category.
+
+        :param product_text: product name from extraction
+        :return: category name, "other" if no rule matched, "unknown" if empty
+        """
+
+        if not product_text:
+            return "unknown"
+
+        text_lower = str(product_text).lower()
+
+        for category, pattern in self.category_patterns:
+            if pattern.search(text_lower):
+                return category
+
+        return "other"
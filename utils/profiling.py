@@ -0,0 +1,387 @@
+# This module profiles CPU time and memory per pipeline stage and writes the reports to disk
+
+import cProfile
+import collections
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+
+
+class StageProfiler:
+    """
+    Per-stage profiling for the streaming pipeline.
+
+    Modes:
+    - "deterministic": every stage call runs under cProfile (one profile
+      per worker thread, merged per stage into <stage>.pstats) and
+      tracemalloc records allocations; allocations still held at the end
+      are attributed to the stages whose code made them. Accurate, but
+      slows the run noticeably.
+    - "sampling": a background thread samples every pipeline thread's
+      stack (sys._current_frames) at a fixed interval and writes collapsed
+      stacks per stage (<stage>.folded, flamegraph-compatible) plus a
+      summary of the hottest functions. Overhead is small enough for
+      production runs; no memory tracing.
+
+    On Python 3.12+ only one cProfile profiler can be active at a time,
+    so in deterministic mode concurrent calls of other threads run
+    unprofiled and are counted as skipped in the report.
+    """
+
+    MODES = ("deterministic", "sampling")
+
+    def __init__(
+        self,
+        output_directory: str,
+        mode: str = "deterministic",
+        sample_interval_seconds: float = 0.01,
+        top_count: int = 30,
+        traceback_depth: int = 25
+    ):
+        """
+        :param output_directory: directory receiving the reports
+        :param mode: "deterministic" or "sampling"
+        :param sample_interval_seconds: time between stack samples (sampling mode)
+        :param top_count: entries per report
+        :param traceback_depth: frames kept per allocation (deterministic mode)
+        """
+
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+
+        self.output_directory = output_directory
+        self.mode = mode
+        self.sample_interval_seconds = sample_interval_seconds
+        self.top_count = top_count
+        self.traceback_depth = traceback_depth
+
+        # (stage name, thread id) -> cProfile.Profile
+        self.profiles = {}
+        self.skipped_calls = collections.Counter()
+
+        # stage name -> code object of its function, for allocation attribution
+        self.stage_codes = {}
+        self._stage_line_ranges = {}
+
+        # stage name -> Counter of collapsed stacks
+        self.stack_samples = collections.defaultdict(collections.Counter)
+        self.sample_count = 0
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sampler_thread = None
+
+    # -------------------- Setup --------------------
+
+    def instrument(self, stages: list):
+        """
+        Wrap stage functions for deterministic profiling (no-op in sampling mode).
+
+        :param stages: Stage objects, modified in place
+        """
+
+        for stage in stages:
+            self.stage_codes[stage.name] = getattr(stage.func, "__code__", None)
+
+            if self.mode == "deterministic":
+                stage.func = self._profiled(stage.name, stage.func)
+
+    def _profiled(self, stage_name: str, func):
+        """
+        Run func under this thread's profile for the stage.
+
+        :param stage_name: stage name
+        :param func: stage function
+        :return: wrapped function
+        """
+
+        def profiled_call(item):
+            profile_key = (stage_name, threading.get_ident())
+
+            with self._lock:
+                profile = self.profiles.get(profile_key)
+
+                if profile is None:
+                    profile = cProfile.Profile()
+                    self.profiles[profile_key] = profile
+
+            try:
+                profile.enable()
+
+            except ValueError:
+                # Another thread's profiler is active (Python 3.12+)
+                with self._lock:
+                    self.skipped_calls[stage_name] += 1
+
+                return func(item)
+
+            try:
+                return func(item)
+            finally:
+                profile.disable()
+
+        return profiled_call
+
+    def start(self):
+        """
+        Start memory tracing (deterministic) or the stack sampler (sampling).
+        """
+
+        os.makedirs(self.output_directory, exist_ok=True)
+
+        if self.mode == "deterministic":
+            tracemalloc.start(self.traceback_depth)
+        else:
+            self._sampler_thread = threading.Thread(target=self._sample_stacks, name="profiler-sampler", daemon=True)
+            self._sampler_thread.start()
+
+    # -------------------- Sampling --------------------
+
+    def _sample_stacks(self):
+        """
+        Sampler loop: record the stack of every pipeline stage thread.
+        """
+
+        while not self._stop_event.wait(self.sample_interval_seconds):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for thread_id, frame in sys._current_frames().items():
+                thread_name = thread_names.get(thread_id, "")
+
+                # Stage threads are named pipeline-<stage>-<worker number>
+                if not thread_name.startswith("pipeline-") or thread_name == "pipeline-source":
+                    continue
+
+                stage_name = thread_name[len("pipeline-"):].rsplit("-", 1)[0]
+
+                stack = []
+
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+
+                self.stack_samples[stage_name][";".join(reversed(stack))] += 1
+
+            self.sample_count += 1
+
+    # -------------------- Reports --------------------
+
+    def stop(self) -> list:
+        """
+        Stop profiling and write all reports.
+
+        :return: list of written file paths
+        """
+
+        if self.mode == "deterministic":
+            # Snapshot memory before building the CPU reports allocates more
+            written_paths = self._write_allocation_report()
+            tracemalloc.stop()
+
+            written_paths.extend(self._write_cpu_reports())
+        else:
+            self._stop_event.set()
+
+            if self._sampler_thread is not None:
+                self._sampler_thread.join()
+
+            written_paths = self._write_sampling_reports()
+
+        return written_paths
+
+    def _write_cpu_reports(self) -> list:
+        """
+        Merge per-thread profiles per stage; write .pstats and a text top list.
+
+        :return: written file paths
+        """
+
+        written_paths = []
+
+        stage_names = sorted({stage_name for stage_name, _ in self.profiles})
+
+        for stage_name in stage_names:
+            stats = None
+
+            for (profile_stage, _), profile in self.profiles.items():
+                if profile_stage != stage_name:
+                    continue
+
+                try:
+                    if stats is None:
+                        stats = pstats.Stats(profile)
+                    else:
+                        stats.add(profile)
+
+                except TypeError:
+                    # Profile that never ran (all its calls were skipped)
+                    continue
+
+            if stats is None:
+                continue
+
+            pstats_path = os.path.join(self.output_directory, f"{stage_name}.pstats")
+            stats.dump_stats(pstats_path)
+
+            report_stream = io.StringIO()
+
+            if self.skipped_calls[stage_name]:
+                report_stream.write(f"Calls not profiled (another profiler active): {self.skipped_calls[stage_name]}\n\n")
+
+            pstats.Stats(pstats_path, stream=report_stream).sort_stats("cumulative").print_stats(self.top_count)
+
+            report_path = os.path.join(self.output_directory, f"{stage_name}.txt")
+
+            with open(report_path, "w", encoding="utf-8") as report_file:
+                report_file.write(report_stream.getvalue())
+
+            written_paths.extend([pstats_path, report_path])
+
+        return written_paths
+
+    def _stage_for_traceback(self, allocation_traceback) -> str:
+        """
+        First stage whose function appears in an allocation traceback.
+
+        :param allocation_traceback: tracemalloc Traceback
+        :return: stage name, or None
+        """
+
+        for frame in allocation_traceback:
+            for stage_name, (filename, first_line, last_line) in self._stage_line_ranges.items():
+                if frame.filename == filename and first_line <= frame.lineno <= last_line:
+                    return stage_name
+
+        return None
+
+    def _write_allocation_report(self) -> list:
+        """
+        Top allocations still held, overall and per stage.
+
+        :return: written file paths
+        """
+
+        if not tracemalloc.is_tracing():
+            return []
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ])
+
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+
+        # Source line range of each stage function
+        self._stage_line_ranges = {}
+
+        for stage_name, code in self.stage_codes.items():
+            if code is None:
+                continue
+
+            line_numbers = [line for _, _, line in code.co_lines() if line]
+            self._stage_line_ranges[stage_name] = (code.co_filename, code.co_firstlineno, max(line_numbers, default=code.co_firstlineno))
+
+        stage_allocations = collections.defaultdict(collections.Counter)
+
+        for trace in snapshot.traces:
+            stage_name = self._stage_for_traceback(trace.traceback)
+
+            if stage_name is not None:
+                # Frames run oldest to most recent; the last one allocated
+                allocating_frame = trace.traceback[-1]
+                stage_allocations[stage_name][f"{allocating_frame.filename}:{allocating_frame.lineno}"] += trace.size
+
+        lines = [
+            f"Traced memory: current {current_bytes / 1024:.1f} KiB, peak {peak_bytes / 1024:.1f} KiB",
+            "",
+            f"Top {self.top_count} allocations still held (all code):"
+        ]
+
+        for statistic in snapshot.statistics("lineno")[:self.top_count]:
+            lines.append(f"  {statistic}")
+
+        for stage_name in sorted(stage_allocations):
+            lines.append("")
+            lines.append(f"Stage {stage_name}: top allocations still held")
+
+            for location, size in stage_allocations[stage_name].most_common(self.top_count):
+                lines.append(f"  {location}: {size / 1024:.1f} KiB")
+
+        report_path = os.path.join(self.output_directory, "allocations.txt")
+
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            report_file.write("\n".join(lines) + "\n")
+
+        return [report_path]
+
+    def _write_sampling_reports(self) -> list:
+        """
+        Write collapsed stacks per stage and a hottest-functions summary.
+
+        :return: written file paths
+        """
+
+        written_paths = []
+
+        lines = [f"Samples taken: {self.sample_count} (every {self.sample_interval_seconds * 1000:.0f} ms)"]
+
+        for stage_name in sorted(self.stack_samples):
+            stack_counts = self.stack_samples[stage_name]
+
+            folded_path = os.path.join(self.output_directory, f"{stage_name}.folded")
+
+            with open(folded_path, "w", encoding="utf-8") as folded_file:
+                for stack, count in stack_counts.most_common():
+                    folded_file.write(f"{stack} {count}\n")
+
+            written_paths.append(folded_path)
+
+            # Self samples: the innermost function of each stack
+            leaf_counts = collections.Counter()
+
+            for stack, count in stack_counts.items():
+                leaf_counts[stack.rsplit(";", 1)[-1]] += count
+
+            stage_samples = sum(stack_counts.values())
+
+            lines.append("")
+            lines.append(f"Stage {stage_name}: {stage_samples} samples")
+
+            for function_name, count in leaf_counts.most_common(self.top_count):
+                lines.append(f"  {count / stage_samples:6.1%}  {function_name}")
+
+        summary_path = os.path.join(self.output_directory, "sampling_summary.txt")
+
+        with open(summary_path, "w", encoding="utf-8") as summary_file:
+            summary_file.write("\n".join(lines) + "\n")
+
+        written_paths.append(summary_path)
+
+        return written_paths
+
+
+def profiling_mode_from_environment(default: str = None) -> str:
+    """
+    Read DDI_PROFILE: "1"/"deterministic" or "sampling"; unset, "0" or empty disables.
+
+    :param default: mode used when the variable is unset
+    :return: profiling mode, or None when disabled
+    """
+
+    value = os.getenv("DDI_PROFILE", "").strip().lower()
+
+    if not value:
+        return default
+
+    if value in ("0", "false", "off"):
+        return None
+
+    if value in ("1", "true", "on", "cpu"):
+        return "deterministic"
+
+    return value
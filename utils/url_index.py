@@ -0,0 +1,131 @@
+# This module keeps an on-disk set of already stored source URLs
+
+import hashlib
+import sqlite3
+from itertools import islice
+
+
+class UrlIndex:
+    """
+    Persistent hashed URL set backed by a small SQLite file.
+
+    URLs are stored as fixed-size BLAKE2b digests in a WITHOUT ROWID
+    table, so lookups and inserts cost O(log n) page reads and the index
+    never has to be loaded into memory.
+    """
+
+    # SQLite limits bound parameters per statement, so IN() lookups are chunked
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(self, index_path: str):
+        """
+        Open (or create) the URL index.
+
+        :param index_path: sidecar index file path
+        """
+        self.index_path = index_path
+
+        self.connection = sqlite3.connect(index_path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS url_index (
+                url_hash BLOB PRIMARY KEY
+            ) WITHOUT ROWID
+        """)
+
+    def _hash_url(self, url: str) -> bytes:
+        """
+        Hash URL into a compact 16-byte key.
+
+        :param url: source URL
+        :return: digest bytes
+        """
+
+        return hashlib.blake2b((url or "").encode("utf-8"), digest_size=16).digest()
+
+    def contains(self, url: str) -> bool:
+        """
+        Check whether URL is already indexed.
+
+        :param url: source URL
+        :return: True if present
+        """
+
+        row = self.connection.execute(
+            "SELECT 1 FROM url_index WHERE url_hash = ?",
+            (self._hash_url(url),)
+        ).fetchone()
+
+        return row is not None
+
+    def find_existing(self, urls) -> set:
+        """
+        Return the subset of URLs already present in the index.
+
+        :param urls: iterable of source URLs
+        :return: set of indexed URLs
+        """
+
+        urls_by_hash = {self._hash_url(url): url for url in urls}
+        existing_urls = set()
+
+        hash_iterator = iter(urls_by_hash)
+
+        while True:
+            hash_chunk = list(islice(hash_iterator, self.LOOKUP_CHUNK_SIZE))
+
+            if not hash_chunk:
+                break
+
+            placeholders = ", ".join("?" * len(hash_chunk))
+
+            for (url_hash,) in self.connection.execute(
+                f"SELECT url_hash FROM url_index WHERE url_hash IN ({placeholders})",
+                hash_chunk
+            ):
+                existing_urls.add(urls_by_hash[url_hash])
+
+        return existing_urls
+
+    def add_many(self, urls) -> int:
+        """
+        Add URLs to the index in one transaction.
+
+        :param urls: iterable of source URLs
+        :return: number of URLs that were not indexed before
+        """
+
+        changes_before = self.connection.total_changes
+
+        self.connection.execute("BEGIN")
+
+        try:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO url_index (url_hash) VALUES (?)",
+                ((self._hash_url(url),) for url in urls)
+            )
+            self.connection.execute("COMMIT")
+
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+
+        return self.connection.total_changes - changes_before
+
+    def count(self) -> int:
+        """
+        Number of indexed URLs.
+
+        :return: row count
+        """
+
+        return self.connection.execute("SELECT COUNT(*) FROM url_index").fetchone()[0]
+
+    def close(self):
+        """
+        Close index file.
+        """
+
+        self.connection.close()
@@ -6,8 +6,25 @@ import re
 class ValueQuantityNormalizer:
     """
     Converts textual money values and quantities into numeric formats.
+
+    The rule tables below are shared with BatchDealProcessor, which
+    applies the same rules column-wise; change them here only.
     """
 
+    # Currency symbols stripped before parsing
+    CURRENCY_SYMBOL_PATTERN = r"[€$£₹]"
+
+    # Amount with optional decimals, and whole-number fallback
+    DECIMAL_NUMBER_PATTERN = r"\d+(?:\.\d+)?"
+    INTEGER_PATTERN = r"\d+"
+
+    # Magnitude words checked in order; the first match sets the multiplier
+    MAGNITUDE_RULES = (
+        ("billion|bn", 1_000_000_000),
+        ("million|m", 1_000_000),
+        ("thousand|k", 1_000)
+    )
+
     # -------------------- MONEY NORMALIZATION --------------------
 
     def normalize_deal_value(self, deal_value_raw, currency_raw):
@@ -34,32 +51,19 @@ class ValueQuantityNormalizer:
 
         # Remove currency symbols and commas
         text_value = text_value.replace(",", "")
-        text_value = re.sub(r"[€$£₹]", "", text_value)
-
-        # ---------------- Handle billion ----------------
-
-        if "billion" in text_value or "bn" in text_value:
-            number_match = re.search(r"\d+(\.\d+)?", text_value)
-            if number_match:
-                return int(float(number_match.group()) * 1_000_000_000)
-
-        # ---------------- Handle million ----------------
-
-        if "million" in text_value or "m" in text_value:
-            number_match = re.search(r"\d+(\.\d+)?", text_value)
-            if number_match:
-                return int(float(number_match.group()) * 1_000_000)
+        text_value = re.sub(self.CURRENCY_SYMBOL_PATTERN, "", text_value)
 
-        # ---------------- Handle thousand ----------------
+        # ---------------- Handle billion / million / thousand ----------------
 
-        if "thousand" in text_value or "k" in text_value:
-            number_match = re.search(r"\d+(\.\d+)?", text_value)
-            if number_match:
-                return int(float(number_match.group()) * 1_000)
+        for magnitude_pattern, multiplier in self.MAGNITUDE_RULES:
+            if re.search(magnitude_pattern, text_value):
+                number_match = re.search(self.DECIMAL_NUMBER_PATTERN, text_value)
+                if number_match:
+                    return int(float(number_match.group()) * multiplier)
 
         # ---------------- Plain number ----------------
 
-        number_match = re.search(r"\d+", text_value)
+        number_match = re.search(self.INTEGER_PATTERN, text_value)
         if number_match:
             return int(number_match.group())
 
@@ -88,7 +92,7 @@ class ValueQuantityNormalizer:
         text_quantity = text_quantity.replace(",", "")
 
         # Extract first number found
-        number_match = re.search(r"\d+", text_quantity)
+        number_match = re.search(self.INTEGER_PATTERN, text_quantity)
 
         if number_match:
             return int(number_match.group())
@@ -0,0 +1,347 @@
+# -------------------- Imports --------------------
+import argparse
+import os
+import signal
+import socket
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+
+from services.ollama_llm_extractor import OllamaLLMExtractor
+from services.database_storage_writer import DatabaseStorageWriter
+from services.csv_storage_writer import CSVStorageWriter
+from services.parquet_storage_writer import ParquetStorageWriter
+from services.google_sheet_storage_writer import GoogleSheetStorageWriter
+from services.storage_fanout import StorageFanOut
+from services.sqlite_work_queue import SQLiteWorkQueue
+from utils.json_parser import parse_llm_json
+from utils.batch_deal_processor import BatchDealProcessor
+from utils.deal_deduplicator import DealDeduplicator
+from utils.pipeline import Pipeline, Stage
+from utils.metrics import metrics_registry
+
+from config.settings import (
+    PIPELINE_EXTRACT_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_REPORT_INTERVAL_SECONDS,
+    GOOGLE_SHEET_FLUSH_INTERVAL_SECONDS
+)
+
+
+# Same optional Google Sheet export as main.py
+load_dotenv()
+
+GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
+GOOGLE_SHEETS_ACCESS_TOKEN = os.getenv("GOOGLE_SHEETS_ACCESS_TOKEN")
+
+# Export backends a worker can feed besides the database
+EXPORT_BACKENDS = ("csv", "parquet", "sheets")
+
+
+# -------------------- Extraction Worker --------------------
+
+def run_worker(
+    queue_path: str = "work_queue.db",
+    database_path: str = "deals_database.db",
+    worker_id: str = None,
+    model_name: str = "llama3",
+    ollama_base_url: str = None,
+    extract_workers: int = PIPELINE_EXTRACT_WORKERS,
+    lease_seconds: float = 300,
+    poll_interval_seconds: float = 5,
+    exit_when_idle: bool = False,
+    exports: tuple = ("parquet", "sheets"),
+    csv_path: str = "deals_database.csv",
+    parquet_directory: str = "deals_parquet"
+):
+    """
+    Pull extraction tasks queued by `main.py --enqueue`, extract deals
+    with the LLM and store them in the SQLite database and the exports.
+
+    Start one worker per model server, on any host that can open the
+    queue and database files. A task is leased while it is processed and
+    its lease is renewed by heartbeats; it is completed once its deal is
+    written (or found to be no deal / a duplicate), and released for a
+    retry if anything raises.
+
+    The database is the record: a task completes once its deal is in
+    SQLite. The exports (main.py's CSV, Parquet and Sheets backends) are
+    fed write-behind through a StorageFanOut and flushed on shutdown; a
+    deal an export missed is still in SQLite and comes back with
+    `cli.py export`. The CSV writer keeps its manifest in memory, so
+    only one process may write a CSV export: add "csv" to exports for a
+    single worker only. Parquet files and Sheets appends are safe from
+    many workers.
+
+    :param queue_path: work queue SQLite file
+    :param database_path: deals SQLite database
+    :param worker_id: unique worker id (default: host name and process id)
+    :param model_name: Ollama model
+    :param ollama_base_url: Ollama server (default: local server)
+    :param extract_workers: concurrent LLM calls
+    :param lease_seconds: lease length, renewed every third of it
+    :param poll_interval_seconds: wait between polls of an empty queue
+    :param exit_when_idle: stop once the queue is empty instead of polling
+    :param exports: export backends fed besides the database, from EXPORT_BACKENDS
+    :param csv_path: first CSV segment (exports with "csv")
+    :param parquet_directory: Parquet dataset root (exports with "parquet")
+    :return: pipeline stats
+    """
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    work_queue = SQLiteWorkQueue(queue_path)
+
+    database_storage_writer = DatabaseStorageWriter(
+        database_path=database_path
+    )
+
+    unknown_exports = set(exports) - set(EXPORT_BACKENDS)
+
+    if unknown_exports:
+        raise ValueError(f"Unknown export backends: {sorted(unknown_exports)}")
+
+    export_writers = []
+
+    if "csv" in exports:
+        export_writers.append(CSVStorageWriter(file_path=csv_path))
+
+    if "parquet" in exports:
+        export_writers.append(ParquetStorageWriter(root_directory=parquet_directory))
+
+    if "sheets" in exports and GOOGLE_SHEET_ID:
+        export_writers.append(
+            GoogleSheetStorageWriter(
+                spreadsheet_id=GOOGLE_SHEET_ID,
+                access_token=GOOGLE_SHEETS_ACCESS_TOKEN,
+                max_buffer_seconds=GOOGLE_SHEET_FLUSH_INTERVAL_SECONDS
+            )
+        )
+
+    # Exports are written in the background; the database write below stays synchronous
+    export_fanout = StorageFanOut(storage_writers=export_writers) if export_writers else None
+
+    llm_extractor = OllamaLLMExtractor(
+        model_name=model_name,
+        base_url=ollama_base_url
+    )
+
+    batch_deal_processor = BatchDealProcessor()
+    deal_deduplicator = DealDeduplicator()
+
+    stop_event = threading.Event()
+
+    # Task ids currently leased by this worker, kept alive by heartbeats
+    leased_task_ids = set()
+    leased_lock = threading.Lock()
+
+    def finish_task(task_id, result):
+        work_queue.complete(task_id, worker_id, result)
+
+        with leased_lock:
+            leased_task_ids.discard(task_id)
+
+    # ---------- Heartbeats ----------
+
+    def renew_leases():
+        while not stop_event.wait(lease_seconds / 3):
+            with leased_lock:
+                task_ids = list(leased_task_ids)
+
+            for task_id in task_ids:
+                try:
+                    if not work_queue.heartbeat(task_id, worker_id, lease_seconds):
+                        print(f"Lease lost for {task_id}")
+
+                        with leased_lock:
+                            leased_task_ids.discard(task_id)
+
+                except Exception as error:
+                    print(f"Heartbeat failed for {task_id}: {error}")
+
+    heartbeat_thread = threading.Thread(target=renew_leases, name="work-queue-heartbeat", daemon=True)
+    heartbeat_thread.start()
+
+    # ---------- Task source ----------
+
+    def lease_tasks():
+        while not stop_event.is_set():
+            tasks = work_queue.lease(worker_id, max_tasks=extract_workers, lease_seconds=lease_seconds)
+
+            if not tasks:
+                if exit_when_idle:
+                    return
+
+                stop_event.wait(poll_interval_seconds)
+                continue
+
+            with leased_lock:
+                leased_task_ids.update(task["task_id"] for task in tasks)
+
+            yield from tasks
+
+    # ---------- Stages ----------
+
+    def extract_deal(task):
+        article = task["payload"]
+        ingestion_timestamp = datetime.utcnow().isoformat()
+
+        raw_llm_output = llm_extractor.extract_json(
+            article["content"]
+        )
+
+        # Keep raw output so deals can be re-derived later without the LLM
+        database_storage_writer.save_raw_llm_outputs([{
+            "source_url": task["task_id"],
+            "article_title": article.get("title"),
+            "article_text": article["content"],
+            "content_hash": article.get("content_hash"),
+            "raw_llm_output": raw_llm_output,
+            "model_name": llm_extractor.model_name,
+            "ingestion_timestamp": ingestion_timestamp
+        }])
+
+        structured_deal = parse_llm_json(raw_llm_output)
+
+        if not structured_deal:
+            finish_task(task["task_id"], "no deal")
+            return None
+
+        structured_deal["source_url"] = task["task_id"]
+        structured_deal["ingestion_timestamp"] = ingestion_timestamp
+
+        return structured_deal
+
+    def normalize_deal(structured_deal):
+        structured_deals = [batch_deal_processor.process_deal(structured_deal)]
+
+        # Duplicates within this worker; the database skips URLs stored by other workers
+        new_deals = deal_deduplicator.filter_new_deals(structured_deals)
+
+        if not new_deals:
+            finish_task(structured_deal["source_url"], "duplicate")
+
+        return new_deals
+
+    def store_deal(deal):
+        # Written synchronously, so a task is only completed once its deal is stored
+        save_result = database_storage_writer.save_structured_deals([deal])
+
+        if save_result["failed_urls"]:
+            raise RuntimeError("database write failed")
+
+        if export_fanout:
+            export_fanout.save_structured_deals([deal])
+
+        finish_task(deal.source_url, "stored")
+        return deal
+
+    def release_task(stage_name, item, error):
+        if isinstance(item, dict):
+            task_id = item.get("task_id") or item.get("source_url")
+        else:
+            task_id = item.source_url
+
+        task_status = work_queue.fail(task_id, worker_id, f"{stage_name}: {error}")
+
+        with leased_lock:
+            leased_task_ids.discard(task_id)
+
+        print(f"Task {task_id} failed in {stage_name} ({task_status}): {error}")
+
+    extraction_pipeline = Pipeline(
+        stages=[
+            # A short queue keeps this worker from leasing far more than it is working on
+            Stage("extract", extract_deal, workers=extract_workers, queue_size=extract_workers),
+            Stage("normalize", normalize_deal, queue_size=PIPELINE_QUEUE_SIZE, kind="flat_map"),
+            Stage("store", store_deal, queue_size=PIPELINE_QUEUE_SIZE),
+        ],
+        report_interval_seconds=PIPELINE_REPORT_INTERVAL_SECONDS,
+        error_handler=release_task
+    )
+
+    # ---------- Run ----------
+
+    def request_shutdown(signal_number, frame):
+        if stop_event.is_set():
+            raise KeyboardInterrupt
+
+        print(f"Received signal {signal_number}, finishing leased tasks...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
+
+    print(f"Worker {worker_id} pulling from {queue_path}")
+
+    try:
+        pipeline_stats = extraction_pipeline.run(lease_tasks())
+
+    finally:
+        stop_event.set()
+        heartbeat_thread.join()
+
+        print(f"Queue: {work_queue.counts()}")
+
+        for task_status, task_count in work_queue.counts().items():
+            metrics_registry.set_gauge("work_queue_tasks", task_count, status=task_status)
+
+        try:
+            metrics_registry.write_prometheus(f"metrics/worker_{worker_id}.prom")
+        except Exception as error:
+            print(f"Metrics export failed: {error}")
+
+        if export_fanout:
+            # Flush every queued export row before the process exits
+            export_fanout.close()
+
+            print(f"Exports: {export_fanout.stats()}")
+
+            missed_urls = export_fanout.failed_urls()
+
+            if missed_urls:
+                print(f"{len(missed_urls)} deals missing from an export (stored in SQLite; rerun cli.py export)")
+
+        database_storage_writer.close()
+        work_queue.close()
+
+    for stage_name, stage_stats in pipeline_stats.items():
+        print(f"Stage {stage_name}: {stage_stats}")
+
+    return pipeline_stats
+
+
+# -------------------- Entry Point --------------------
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Run an extraction worker on the shared work queue."
+    )
+
+    argument_parser.add_argument("--queue", default="work_queue.db")
+    argument_parser.add_argument("--database", default="deals_database.db")
+    argument_parser.add_argument("--worker-id", default=None)
+    argument_parser.add_argument("--model", default="llama3")
+    argument_parser.add_argument("--ollama-url", default=None, help="Ollama server used by this worker")
+    argument_parser.add_argument("--workers", type=int, default=PIPELINE_EXTRACT_WORKERS, help="concurrent LLM calls")
+    argument_parser.add_argument("--lease-seconds", type=float, default=300)
+    argument_parser.add_argument("--exit-when-idle", action="store_true", help="stop once the queue is empty")
+    argument_parser.add_argument(
+        "--exports",
+        default="parquet,sheets",
+        help="comma-separated export backends besides SQLite: csv,parquet,sheets (csv with a single worker only; '' for none)"
+    )
+
+    arguments = argument_parser.parse_args()
+
+    run_worker(
+        queue_path=arguments.queue,
+        database_path=arguments.database,
+        worker_id=arguments.worker_id,
+        model_name=arguments.model,
+        ollama_base_url=arguments.ollama_url,
+        extract_workers=arguments.workers,
+        lease_seconds=arguments.lease_seconds,
+        exit_when_idle=arguments.exit_when_idle,
+        exports=tuple(name.strip() for name in arguments.exports.split(",") if name.strip())
+    )